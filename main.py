@@ -11,6 +11,8 @@ sys.path.append(parent_dir)
 
 try:
     import utils.handle_sql as handle_sql
+    import utils.debug_panel as debug_panel
+    import utils.trace as trace
 except ImportError:
     st.error("handle_sql.py 파일을 찾을 수 없습니다.")
 
@@ -114,33 +116,15 @@ def main():
     st.markdown("---")
 
     # --- [3. 데이터 분석 로직] ---
-    df_negative = handle_sql.get_data(SQL="""
-                                            SELECT reason, SUM(cost) AS total_cost
-                                            FROM card
-                                            WHERE date >= DATE_FORMAT(CURDATE(), '%Y-%m-01')
-                                            AND reason IN (
-                                                '배달/야식', '카페/간식', '술/유흥', '패션/미용', 
-                                                '가전/가구', '택시/호출', '데이트/모임', '영화/공연', '여행'
-                                            )
-                                            GROUP BY reason
-                                     """)
-    
-    df_all = handle_sql.get_data(SQL="""
-                                            SELECT reason, SUM(cost) AS total_cost
-                                            FROM card
-                                            WHERE date >= DATE_FORMAT(CURDATE(), '%Y-%m-01')
-                                            GROUP BY reason
-                                     """)
-
+    # 이번 달 요약: 총 소비 / 낭비 소비를 한 번의 쿼리로 (데이터가 그대로면 캐시에서)
     negative_sum = 0
     total_sum = 0
     
     try:
-        if not df_negative.empty:
-            negative_sum = df_negative['total_cost'].sum()
-            
-        if not df_all.empty:
-            total_sum = df_all['total_cost'].sum()
+        with trace.span('summary.month'):
+            summary = handle_sql.get_month_summary()
+        negative_sum = summary['waste']
+        total_sum = summary['total']
 
     except (IndexError, KeyError, Exception) as e:
         st.error(f"데이터 처리 오류: {e}")
@@ -299,4 +283,6 @@ def main():
             ), unsafe_allow_html=True)
 
 if __name__ == "__main__":
+    debug_panel.begin("main")
     main()
+    debug_panel.render()
@@ -11,10 +11,13 @@ sys.path.append(parent_dir)
 
 st.set_page_config(page_title="텅장 훈련소", page_icon="💸🪖", layout="wide")
 
-try:
-    import utils.handle_sql as handle_sql
-except ImportError:
-    st.error("handle_sql.py 파일을 찾을 수 없습니다.")
+import utils.calendar_view as calendar_view
+import utils.expenses as expenses
+import utils.reinterpret as reinterpret
+import utils.debug_panel as debug_panel
+import utils.trace as trace
+
+debug_panel.begin("소비 기록")
 
 # 페이지 전체 배경색 설정
 page_bg_color = "#fcfcfb"
@@ -42,18 +45,8 @@ st.markdown(f"""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 카테고리 구조 정의 ---
-CATEGORY_STRUCTURE = {
-    "식비": ["식자재/장보기", "외식", "배달/야식", "카페/간식", "술/유흥"],
-    "주거/통신": ["월세/관리비", "공과금", "통신비", "구독/OTT"],
-    "생활/쇼핑": ["생활용품", "패션/미용", "가전/가구", "반려동물"],
-    "교통/차량": ["대중교통", "택시/호출", "자차/주유"],
-    "건강/운동": ["병원/약국", "운동/헬스"],
-    "교육/계발": ["도서/문구", "강의/수강"],
-    "관계": ["경조사/선물", "데이트/모임"],
-    "문화/취미": ["영화/공연", "여행"],
-    "금융": ["보험/세금", "저축/투자"]
-}
+# --- 카테고리 구조 정의 (utils/reinterpret.py) ---
+CATEGORY_STRUCTURE = reinterpret.CATEGORY_STRUCTURE
 
 # ==========================================
 # [DB 함수] 추가 / 수정 / 삭제
@@ -61,47 +54,29 @@ CATEGORY_STRUCTURE = {
 
 def add_expense(date, time, category, reason, cost, memo):
     try:
-        query = """
-        INSERT INTO card (date, time, category, reason, cost, memo)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        handle_sql.execute_query(query, (date, time, category, reason, cost, memo))
+        # 같은 내역(날짜, 시간, 분류, 금액, 메모)이 이미 있으면 0 (중복 제출 방지)
+        if not expenses.add_expense(date, time, category, reason, cost, memo):
+            st.warning("⚠️ 같은 내역이 이미 기록되어 있어 저장하지 않았습니다.")
+            return False
         return True
     except Exception as e:
         st.error(f"데이터 저장 오류: {e}")
         return False
 
-def update_expense(date, time, category, reason, cost, memo, original_date, original_time, original_category, original_reason):
+def update_expense(date, time, category, reason, cost, memo, original_date, original_time, original_category, original_reason, expense_id=None):
     try:
-        # 시간 형식 보정 (HH:MM -> HH:MM:SS)
-        if original_time and len(str(original_time).split(':')) == 2:
-            original_time = f"{original_time}:00"
-        
-        query = """
-        UPDATE card 
-        SET date = %s, time = %s, category = %s, reason = %s, cost = %s, memo = %s
-        WHERE date = %s AND TIME(time) = TIME(%s) AND category = %s AND reason = %s
-        LIMIT 1
-        """
-        handle_sql.execute_query(query, (date, time, category, reason, cost, memo, 
-                                         original_date, original_time, original_category, original_reason))
+        # card 수정과 롤업 갱신을 한 트랜잭션으로 처리 (expense_id 가 있으면 기본 키로 수정)
+        expenses.update_expense(date, time, category, reason, cost, memo,
+                                original_date, original_time, original_category, original_reason,
+                                expense_id=expense_id)
         return True
     except Exception as e:
         st.error(f"데이터 수정 오류: {e}")
         return False
 
-def delete_expense(original_date, original_time, category, reason, cost, memo):
+def delete_expense(original_date, original_time, category, reason, cost, memo, expense_id=None):
     try:
-        # 시간 형식 보정
-        if original_time and len(str(original_time).split(':')) == 2:
-            original_time = f"{original_time}:00"
-
-        query = """
-        DELETE FROM card 
-        WHERE date = %s AND TIME(time) = TIME(%s) AND category = %s AND reason = %s AND cost = %s
-        LIMIT 1
-        """
-        handle_sql.execute_query(query, (original_date, original_time, category, reason, cost))
+        expenses.delete_expense(original_date, original_time, category, reason, cost, expense_id=expense_id)
         return True
     except Exception as e:
         st.error(f"데이터 삭제 오류: {e}")
@@ -127,27 +102,35 @@ if 'edit_item' not in st.session_state:
     st.session_state.edit_item = None
 if 'selected_date' not in st.session_state:
     st.session_state.selected_date = datetime.now().date()
+# 캘린더에 보이는 달 (1일). 폼의 날짜(current_date)와 따로 두어 달을 옮겨도 입력 중인 날짜가 바뀌지 않음
+if 'calendar_month' not in st.session_state:
+    st.session_state.calendar_month = datetime.now().date().replace(day=1)
 
 # ==========================================
 # [콜백 함수] 버튼 클릭 시 로직 처리
 # ==========================================
 
-# 0. 월 이동 콜백 (수정된 부분)
+# 0. 월 이동 콜백
 def change_month_callback(amount):
     """
     amount: -1 (이전 달), 1 (다음 달)
     """
-    curr = st.session_state.current_date
-    # 월 계산 로직
-    new_year = curr.year + (curr.month + amount - 1) // 12
-    new_month = (curr.month + amount - 1) % 12 + 1
-    
-    # 날짜를 1일로 설정하여 '31일' 같은 날짜 오류 방지
-    try:
-        st.session_state.current_date = curr.replace(year=new_year, month=new_month, day=1)
-    except ValueError:
-        # 혹시라도 날짜 문제 발생 시 1일로 강제 설정
-        st.session_state.current_date = curr.replace(year=new_year, month=new_month, day=1)
+    curr = st.session_state.calendar_month
+    new_year, new_month = calendar_view.shift_month(curr.year, curr.month, amount)
+    st.session_state.calendar_month = curr.replace(year=new_year, month=new_month, day=1)
+
+# 부분 재실행(fragment)에서 페이지 전체 재실행이 필요할 때:
+# 콜백에서 표시해 두면 그 fragment 가 다시 실행될 때 st.rerun() 으로 페이지 전체를 다시 그린다.
+# (저장/수정/삭제로 DB 가 바뀌었거나 ✏️ 로 다른 구역인 입력 폼을 채운 경우)
+# fragment 재실행 중 콜백에서 그린 요소는 페이지 맨 위를 덮어쓰므로 토스트는 전체 재실행 때 띄운다.
+def request_page_rerun(toast=None):
+    st.session_state.page_rerun = True
+    if toast:
+        st.session_state.pending_toast = toast
+
+def page_rerun_if_requested():
+    if st.session_state.pop('page_rerun', False):
+        st.rerun()
 
 # 1. 폼 초기화 콜백
 def reset_form_callback():
@@ -161,6 +144,12 @@ def reset_form_callback():
     st.session_state.edit_mode = False
     st.session_state.edit_item = None
 
+# 저장/수정한 날짜의 달과 그날 내역을 캘린더에 보여 줌 (폼 초기화 전에 호출)
+def show_saved_date():
+    saved = st.session_state.current_date
+    st.session_state.calendar_month = saved.replace(day=1)
+    st.session_state.selected_date = saved
+
 # 2. 저장(Insert) 콜백
 def submit_add_callback():
     success = add_expense(
@@ -172,9 +161,9 @@ def submit_add_callback():
         st.session_state.current_memo
     )
     if success:
-        st.toast("✅ 저장 완료!", icon="💾")
-        st.cache_data.clear()
+        show_saved_date()
         reset_form_callback()
+        request_page_rerun(toast=("✅ 저장 완료!", "💾"))
 
 # 3. 수정(Update) 콜백
 def submit_update_callback():
@@ -189,11 +178,13 @@ def submit_update_callback():
         item['original_date'],
         item['original_time'],
         item['category'],
-        item['reason']
+        item['reason'],
+        expense_id=item.get('id')
     )
     if success:
-        st.toast("✅ 수정 완료!", icon="✏️")
+        show_saved_date()
         reset_form_callback()
+        request_page_rerun(toast=("✅ 수정 완료!", "✏️"))
 
 # 4. 삭제(Delete) 콜백
 def delete_expense_callback(item):
@@ -203,12 +194,13 @@ def delete_expense_callback(item):
         item['category'],
         item['reason'],
         int(item['cost']),
-        item['memo']
+        item['memo'],
+        expense_id=item.get('id')
     )
     if success:
-        st.toast("🗑️ 삭제 완료!", icon="✅")
         if st.session_state.edit_mode and st.session_state.edit_item == item:
             reset_form_callback()
+        request_page_rerun(toast=("🗑️ 삭제 완료!", "✅"))
 
 # 5. 수정 데이터 불러오기 콜백
 def load_edit_data_callback(item):
@@ -228,37 +220,51 @@ def load_edit_data_callback(item):
         st.session_state.current_reason = item['reason']
         st.session_state.current_cost = int(item['cost'])
         st.session_state.current_memo = item['memo']
+        request_page_rerun()
     except Exception as e:
         print(f"Error loading edit data: {e}")
 
 # ==========================================
 # [사이드바] 입력 및 수정 폼
 # ==========================================
-st.sidebar.header("✏️ 소비 내역 수정" if st.session_state.edit_mode else "📝 소비 내역 입력")
+# 폼은 fragment 로 따로 다시 실행됨: 대분류를 고르거나 금액을 입력하는 동안에는
+# 이 함수만 다시 실행하고 캘린더(월 조회, 캘린더 생성)는 그대로 둔다 (DB 조회 없음).
+@debug_panel.fragment("소비 기록:입력 폼")
+def expense_form():
+    page_rerun_if_requested()
 
-# 여기서 key="current_date"가 바인딩되어 있어서 외부에서 직접 수정 시 에러가 났던 것임
-date = st.sidebar.date_input("날짜", key="current_date")
-time = st.sidebar.time_input("시간", key="current_time")
+    st.header("✏️ 소비 내역 수정" if st.session_state.edit_mode else "📝 소비 내역 입력")
 
-category_options = list(CATEGORY_STRUCTURE.keys())
-category = st.sidebar.selectbox("대분류", options=category_options, key="current_category")
+    # 여기서 key="current_date"가 바인딩되어 있어서 외부에서 직접 수정 시 에러가 났던 것임
+    date = st.date_input("날짜", key="current_date")
+    time = st.time_input("시간", key="current_time")
 
-reason_options = CATEGORY_STRUCTURE.get(category, [])
-reason = st.sidebar.selectbox("중분류", options=reason_options, key="current_reason")
+    category_options = list(CATEGORY_STRUCTURE.keys())
+    category = st.selectbox("대분류", options=category_options, key="current_category")
 
-cost = st.sidebar.number_input("금액 (원)", min_value=0, step=1000, key="current_cost")
-memo = st.sidebar.text_input("메모", placeholder="상세 내용을 입력하세요", max_chars=50, key="current_memo")
+    reason_options = CATEGORY_STRUCTURE.get(category, [])
+    reason = st.selectbox("중분류", options=reason_options, key="current_reason")
+
+    cost = st.number_input("금액 (원)", min_value=0, step=1000, key="current_cost")
+    memo = st.text_input("메모", placeholder="상세 내용을 입력하세요", max_chars=50, key="current_memo")
+
+    col_save, col_cancel = st.columns(2)
+
+    with col_save:
+        if st.session_state.edit_mode:
+            st.button("💾 수정 저장", on_click=submit_update_callback, use_container_width=True)
+        else:
+            st.button("💾 저장", on_click=submit_add_callback, use_container_width=True)
 
-col_save, col_cancel = st.sidebar.columns(2)
+    with col_cancel:
+        st.button("❌ 취소", on_click=reset_form_callback, use_container_width=True)
 
-with col_save:
-    if st.session_state.edit_mode:
-        st.button("💾 수정 저장", on_click=submit_update_callback, use_container_width=True)
-    else:
-        st.button("💾 저장", on_click=submit_add_callback, use_container_width=True)
+if 'pending_toast' in st.session_state:
+    message, icon = st.session_state.pop('pending_toast')
+    st.toast(message, icon=icon)
 
-with col_cancel:
-    st.button("❌ 취소", on_click=reset_form_callback, use_container_width=True)
+with st.sidebar:
+    expense_form()
 
 
 # ==========================================
@@ -275,112 +281,6 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# 월 이동 버튼 (수정된 부분)
-col1, col2, col3 = st.columns([1, 3, 1])
-
-with col1:
-    # on_click으로 변경하여 콜백 함수 호출
-    st.button("◀ 지난 달", on_click=change_month_callback, args=(-1,), use_container_width=True)
-
-with col2:
-    st.markdown(
-        f"<h3 style='text-align: center;'>{st.session_state.current_date.year}년 {st.session_state.current_date.month}월</h3>", 
-        unsafe_allow_html=True
-    )
-
-with col3:
-    # on_click으로 변경하여 콜백 함수 호출
-    st.button("다음 달 ▶", on_click=change_month_callback, args=(1,), use_container_width=True)
-
-current_year = st.session_state.current_date.year
-current_month = st.session_state.current_date.month
-
-start_date = f"{current_year}-{current_month:02d}-01"
-if current_month == 12:
-    end_date = f"{current_year + 1}-01-01"
-else:
-    end_date = f"{current_year}-{current_month + 1:02d}-01"
-
-calendar_events = []
-monthly_total = 0
-daily_stats = {}
-
-try:
-    query = f"""
-    SELECT date, time, category, reason, cost, memo
-    FROM card
-    WHERE date >= '{start_date}' AND date < '{end_date}'
-    ORDER BY date, time
-    """
-    
-    df = handle_sql.get_data(query)
-    
-    if not df.empty:
-        results = df.to_dict('records')
-        
-        for row in results:
-            date_val = row['date']
-            if isinstance(date_val, (datetime, pd.Timestamp)):
-                event_date = date_val.strftime('%Y-%m-%d')
-            else:
-                event_date = str(date_val)
-
-            cost_val = row.get('cost', 0) or 0
-            
-            if event_date not in daily_stats:
-                daily_stats[event_date] = {'total': 0, 'items': []}
-            
-            daily_stats[event_date]['total'] += cost_val
-            
-            time_value = row.get('time', '')
-            time_str = ''
-            original_time_db = ''
-            
-            if time_value is not None:
-                if hasattr(time_value, 'total_seconds'):
-                    total_seconds = int(time_value.total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    time_str = f"{hours:02d}:{minutes:02d}"
-                    original_time_db = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                else:
-                    time_str = str(time_value)
-                    if ':' in time_str:
-                        parts = time_str.split(':')
-                        if len(parts) == 2:
-                            original_time_db = f"{parts[0]}:{parts[1]}:00"
-                        else:
-                            original_time_db = time_str
-                    else:
-                        original_time_db = time_str
-
-            daily_stats[event_date]['items'].append({
-                'category': row.get('category', ''),
-                'reason': row.get('reason', ''),
-                'cost': cost_val,
-                'time': time_str,
-                'memo': row.get('memo', ''),
-                'original_date': event_date,
-                'original_time': original_time_db
-            })
-            
-            monthly_total += cost_val
-    
-    for date_key, stats in daily_stats.items():
-        event = {
-            "title": f"{stats['total']:,}원",
-            "start": date_key,
-            "allDay": True,
-            "backgroundColor": "transparent",
-            "borderColor": "transparent",
-            "textColor": "#dc3545",
-        }
-        calendar_events.append(event)
-    
-except Exception as e:
-    st.error(f"❌ 데이터 조회 오류: {e}")
-
 # 메트릭 카드 스타일 함수
 def create_metric_card(title, value, value_color="#1f1f1f"):
     return f"""
@@ -401,123 +301,171 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-st.markdown("<br>", unsafe_allow_html=True)
-col_a, col_b, col_c = st.columns(3)
-with col_a:
-    avg_daily = monthly_total / len(daily_stats) if len(daily_stats) > 0 else 0
-    st.markdown(create_metric_card("💰 월 총 소비", f"{monthly_total:,}원"), unsafe_allow_html=True)
-with col_b:
-    st.markdown(create_metric_card("📅 소비 일수", f"{len(daily_stats)}일"), unsafe_allow_html=True)
-with col_c:
-    st.markdown(create_metric_card("📊 일평균 소비", f"{avg_daily:,.0f}원"), unsafe_allow_html=True)
-
-st.markdown("---")
-
-calendar_options = {
-    "editable": False,
-    "selectable": True,
-    "headerToolbar": {"left": "", "center": "", "right": ""},
-    "initialView": "dayGridMonth",
-    "initialDate": f"{current_year}-{current_month:02d}-01",
-    "locale": "ko",
-    "height": 600,
-}
-
-state = calendar(
-    events=calendar_events, 
-    options=calendar_options, 
-    key=f"calendar_{current_year}_{current_month}"
-)
-
-if state and state.get('dateClick'):
-    clicked_raw = state['dateClick']['date']
-    try:
-        if 'T' in clicked_raw:
-            dt_obj = datetime.fromisoformat(clicked_raw.replace('Z', '+00:00'))
-            kst_date = (dt_obj + timedelta(hours=9)).date()
-            st.session_state.selected_date = kst_date
-        else:
-            st.session_state.selected_date = datetime.strptime(clicked_raw[:10], '%Y-%m-%d').date()
-    except Exception as e:
-        st.error(f"날짜 선택 오류: {e}")
+# 캘린더 구역도 fragment: ◀/▶ 월 이동, 날짜 선택은 이 구역만 다시 실행한다.
+# 월 화면은 (월, 데이터 버전) 단위 LRU 에서, 날짜별 항목은 그 화면에 메모해 둔 것을 쓰므로
+# 이미 본 달/날짜로 돌아오거나 ✏️ 로 폼을 채울 때는 DB 를 다시 조회하지 않는다.
+@debug_panel.fragment("소비 기록:캘린더")
+def calendar_section():
+    page_rerun_if_requested()
+
+    # 월 이동 버튼
+    col1, col2, col3 = st.columns([1, 3, 1])
+
+    with col1:
+        # on_click으로 변경하여 콜백 함수 호출
+        st.button("◀ 지난 달", on_click=change_month_callback, args=(-1,), use_container_width=True)
+
+    with col2:
+        st.markdown(
+            f"<h3 style='text-align: center;'>{st.session_state.calendar_month.year}년 {st.session_state.calendar_month.month}월</h3>", 
+            unsafe_allow_html=True
+        )
+
+    with col3:
+        # on_click으로 변경하여 콜백 함수 호출
+        st.button("다음 달 ▶", on_click=change_month_callback, args=(1,), use_container_width=True)
+
+    current_year = st.session_state.calendar_month.year
+    current_month = st.session_state.calendar_month.month
+
+    month_view = calendar_view.MonthView(pd.DataFrame(), lambda day: pd.DataFrame())
 
-elif state and state.get('eventClick'):
-    event_raw = state['eventClick']['event']['start']
     try:
-        if 'T' in event_raw:
-            dt_obj = datetime.fromisoformat(event_raw.replace('Z', '+00:00'))
-            kst_date = (dt_obj + timedelta(hours=9)).date()
-            st.session_state.selected_date = kst_date
-        else:
-            st.session_state.selected_date = datetime.strptime(event_raw[:10], '%Y-%m-%d').date()
+        # 캘린더에는 일별 합계만 필요하므로 롤업에서 GROUP BY day 로 받고 (최대 31행),
+        # 날짜별 항목은 아래에서 선택한 날짜만 조회함. 둘 다 (월/날짜, 데이터 버전) 단위로 캐시되어
+        # 쓰기(추가/수정/삭제)가 커밋되면 자동으로 새로 조회됨
+        with trace.span('calendar.month_view', month=f"{current_year}-{current_month:02d}"):
+            month_view = calendar_view.get_month_view(current_year, current_month)
+
     except Exception as e:
-        st.error(f"이벤트 선택 오류: {e}")
+        st.error(f"❌ 데이터 조회 오류: {e}")
 
-selected_date_str = st.session_state.selected_date.strftime('%Y-%m-%d')
+    calendar_events = month_view.events
+    monthly_total = month_view.total
 
-if selected_date_str in daily_stats:
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown(f'<div class="section-header">📅 {selected_date_str} 소비 내역</div>', unsafe_allow_html=True)
-    
-    stats = daily_stats[selected_date_str]
-    st.markdown(f"""
-    <div style="background-color: #e7f5ff; padding: 15px; border-radius: 8px; border-left: 4px solid #1c7ed6; margin-bottom: 20px;">
-        <h4 style="color: #0b7285; margin: 0;">
-            일 총 소비: <span style="color: #1c7ed6; font-weight: 700;">{stats['total']:,}원</span>
-        </h4>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    for idx, item in enumerate(stats['items']):
-        with st.container():
-            col_info, col_btn = st.columns([4, 1])
-            
-            with col_info:
-                st.markdown(f"""
-                <div style="padding: 10px; margin: 5px 0; border: 1px solid #ddd; border-radius: 5px; background-color: #f9f9f9;">
-                    <strong>{item['time'] or '-'}</strong> | 
-                    <strong>{item['category'] or '-'}</strong> - {item['reason'] or '-'} | 
-                    <strong style="color: #dc3545;">{item['cost']:,}원</strong>
-                    {f'<br><small style="color: #666;">메모: {item["memo"] or "-"}</small>' if item.get('memo') else ''}
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col_btn:
-                st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
-                
-                # 버튼을 담을 2개의 작은 컬럼 생성
-                btn_edit, btn_del = st.columns(2)
-                
-                with btn_edit:
-                    st.button(
-                        "✏️", 
-                        key=f"edit_{selected_date_str}_{idx}",
-                        on_click=load_edit_data_callback,
-                        args=(item,),
-                        help="수정",
-                        use_container_width=True
-                    )
-                
-                with btn_del:
-                    st.button(
-                        "🗑️",
-                        key=f"del_{selected_date_str}_{idx}",
-                        on_click=delete_expense_callback,
-                        args=(item,),
-                        help="삭제",
-                        type="primary", # 빨간색 버튼 강조
-                        use_container_width=True
-                    )
-            
-            st.markdown("---")
-    
-    with st.expander("📋 테이블 보기"):
-        detail_data = [{
-            '시간': i['time'], '카테고리': i['category'], '내용': i['reason'], 
-            '금액': f"{i['cost']:,}원", '메모': i['memo']
-        } for i in stats['items']]
-        st.dataframe(pd.DataFrame(detail_data), use_container_width=True, hide_index=True)
-        
-elif selected_date_str:
     st.markdown("<br>", unsafe_allow_html=True)
-    st.info(f"📆 {selected_date_str}에는 소비 내역이 없습니다.")
\ No newline at end of file
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        avg_daily = monthly_total / month_view.days if month_view.days > 0 else 0
+        st.markdown(create_metric_card("💰 월 총 소비", f"{monthly_total:,}원"), unsafe_allow_html=True)
+    with col_b:
+        st.markdown(create_metric_card("📅 소비 일수", f"{month_view.days}일"), unsafe_allow_html=True)
+    with col_c:
+        st.markdown(create_metric_card("📊 일평균 소비", f"{avg_daily:,.0f}원"), unsafe_allow_html=True)
+
+    st.markdown("---")
+
+    calendar_options = {
+        "editable": False,
+        "selectable": True,
+        "headerToolbar": {"left": "", "center": "", "right": ""},
+        "initialView": "dayGridMonth",
+        "initialDate": f"{current_year}-{current_month:02d}-01",
+        "locale": "ko",
+        "height": 600,
+    }
+
+    with trace.span('calendar.render', events=len(calendar_events)):
+        state = calendar(
+            events=calendar_events, 
+            options=calendar_options, 
+            key=f"calendar_{current_year}_{current_month}"
+        )
+
+    if state and state.get('dateClick'):
+        clicked_raw = state['dateClick']['date']
+        try:
+            if 'T' in clicked_raw:
+                dt_obj = datetime.fromisoformat(clicked_raw.replace('Z', '+00:00'))
+                kst_date = (dt_obj + timedelta(hours=9)).date()
+                st.session_state.selected_date = kst_date
+            else:
+                st.session_state.selected_date = datetime.strptime(clicked_raw[:10], '%Y-%m-%d').date()
+        except Exception as e:
+            st.error(f"날짜 선택 오류: {e}")
+
+    elif state and state.get('eventClick'):
+        event_raw = state['eventClick']['event']['start']
+        try:
+            if 'T' in event_raw:
+                dt_obj = datetime.fromisoformat(event_raw.replace('Z', '+00:00'))
+                kst_date = (dt_obj + timedelta(hours=9)).date()
+                st.session_state.selected_date = kst_date
+            else:
+                st.session_state.selected_date = datetime.strptime(event_raw[:10], '%Y-%m-%d').date()
+        except Exception as e:
+            st.error(f"이벤트 선택 오류: {e}")
+
+    selected_date_str = st.session_state.selected_date.strftime('%Y-%m-%d')
+
+    if selected_date_str in month_view:
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown(f'<div class="section-header">📅 {selected_date_str} 소비 내역</div>', unsafe_allow_html=True)
+
+        with trace.span('calendar.day_items', date=selected_date_str):
+            stats = {'total': month_view.day_total(selected_date_str), 'items': month_view.items(selected_date_str)}
+        st.markdown(f"""
+        <div style="background-color: #e7f5ff; padding: 15px; border-radius: 8px; border-left: 4px solid #1c7ed6; margin-bottom: 20px;">
+            <h4 style="color: #0b7285; margin: 0;">
+                일 총 소비: <span style="color: #1c7ed6; font-weight: 700;">{stats['total']:,}원</span>
+            </h4>
+        </div>
+        """, unsafe_allow_html=True)
+
+        for idx, item in enumerate(stats['items']):
+            with st.container():
+                col_info, col_btn = st.columns([4, 1])
+
+                with col_info:
+                    st.markdown(f"""
+                    <div style="padding: 10px; margin: 5px 0; border: 1px solid #ddd; border-radius: 5px; background-color: #f9f9f9;">
+                        <strong>{item['time'] or '-'}</strong> | 
+                        <strong>{item['category'] or '-'}</strong> - {item['reason'] or '-'} | 
+                        <strong style="color: #dc3545;">{item['cost']:,}원</strong>
+                        {f'<br><small style="color: #666;">메모: {item["memo"] or "-"}</small>' if item.get('memo') else ''}
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                with col_btn:
+                    st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
+
+                    # 버튼을 담을 2개의 작은 컬럼 생성
+                    btn_edit, btn_del = st.columns(2)
+
+                    with btn_edit:
+                        st.button(
+                            "✏️", 
+                            key=f"edit_{item['id']}",
+                            on_click=load_edit_data_callback,
+                            args=(item,),
+                            help="수정",
+                            use_container_width=True
+                        )
+
+                    with btn_del:
+                        st.button(
+                            "🗑️",
+                            key=f"del_{item['id']}",
+                            on_click=delete_expense_callback,
+                            args=(item,),
+                            help="삭제",
+                            type="primary", # 빨간색 버튼 강조
+                            use_container_width=True
+                        )
+
+                st.markdown("---")
+
+        with st.expander("📋 테이블 보기"):
+            detail_data = [{
+                '시간': i['time'], '카테고리': i['category'], '내용': i['reason'], 
+                '금액': f"{i['cost']:,}원", '메모': i['memo']
+            } for i in stats['items']]
+            st.dataframe(pd.DataFrame(detail_data), use_container_width=True, hide_index=True)
+
+    elif selected_date_str:
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.info(f"📆 {selected_date_str}에는 소비 내역이 없습니다.")
+
+calendar_section()
+
+debug_panel.render()
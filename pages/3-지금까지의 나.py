@@ -45,241 +45,176 @@ sys.path.append(parent_dir)
 
 try:
     import utils.handle_sql as handle_sql
+    import utils.ledger_cache as ledger_cache
+    import utils.rollup as rollup
+    import utils.reinterpret as reinterpret
+    import utils.ledger as ledger_module
+    import utils.debug_panel as debug_panel
+    import utils.trace as trace
 except ImportError:
     pass
 
 # --------------------------------------------------------------------------------
 # 2. 데이터 로드 및 전처리 (handle_sql 사용)
 # --------------------------------------------------------------------------------
+# Ledger 컬럼 -> 화면에 쓰는 한글 컬럼명 (hour / weekday / month 는 그대로 사용)
+COLUMN_NAMES = {
+    'date': '날짜', 'category': '대분류', 'reason': '소분류',
+    'cost': '비용', 'memo': '비고', 'cnt': '건수', 'reinterpretation': '재해석'
+}
+
 def load_and_process_data():
     try:
-        # SQL 쿼리 작성
-        query = """
-            SELECT date, time, category, reason, cost, memo
-            FROM card
-            ORDER BY date DESC, time DESC
-        """
-        
-        # handle_sql을 통해 DataFrame으로 직접 가져옴
-        if 'utils.handle_sql' in sys.modules:
-            df = handle_sql.get_data(query)
+        # 모든 페이지가 공유하는 소비 내역 캐시에서 가져옴 (utils/ledger.py 의 Ledger, date DESC 정렬)
+        # 날짜/비용 정리, hour/weekday/month 파생, 재해석은 Ledger 로 만들 때 이미 끝나 있음
+        if 'utils.ledger_cache' in sys.modules:
+            ledger = ledger_cache.get_ledger()
         else:
             return pd.DataFrame()
         
         # 데이터가 없는 경우 빈 DataFrame 반환
-        if df.empty:
+        if ledger.is_empty:
             return pd.DataFrame()
 
-        # 영문 컬럼명 -> 한글 컬럼명 변경
-        df.columns = ['날짜', '시간', '대분류', '소분류', '비용', '비고']
+        # 컬럼 이름만 바꾸고 값 버퍼는 공유 캐시와 함께 씀 (재실행마다 전체를 복사하지 않음, 값은 수정하지 말 것)
+        return ledger.frame.rename(columns=COLUMN_NAMES, copy=False)
 
-        # 날짜 처리
-        df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
-        df = df.dropna(subset=['날짜'])
-        
-        # 비용 처리
-        df['비용'] = pd.to_numeric(df['비용'], errors='coerce')
-        df = df.dropna(subset=['비용'])
+    except Exception as e:
+        st.error(f"❌ 데이터 로드 및 처리 중 오류 발생: {e}")
+        return pd.DataFrame()
 
-        # 파생 변수 생성
-        df['month'] = df['날짜'].dt.strftime('%Y-%m')
-        
-        day_map = {0:'월', 1:'화', 2:'수', 3:'목', 4:'금', 5:'토', 6:'일'}
-        df['weekday_name'] = df['날짜'].dt.weekday.map(day_map)
-        
-        # 시간 처리
-        if pd.api.types.is_timedelta64_dtype(df['시간']):
-             df['hour'] = df['시간'].dt.components['hours']
+def load_rollup_summary():
+    """일별 롤업(일 × 대분류 × 중분류 합계)을 월별 집계용 Ledger 로 가공"""
+    try:
+        if 'utils.rollup' in sys.modules:
+            summary = rollup.get_rollup()
         else:
-            temp_time = pd.to_datetime(df['시간'].astype(str), format='%H:%M:%S', errors='coerce')
-            df['hour'] = temp_time.dt.hour.fillna(0).astype(int)
+            return pd.DataFrame()
 
-        return df
+        if summary.empty:
+            return pd.DataFrame()
+
+        summary = summary.rename(columns={'day': 'date', 'total_cost': 'cost'}, copy=False)
+        return ledger_module.Ledger.from_frame(summary).frame.rename(columns=COLUMN_NAMES, copy=False)
 
     except Exception as e:
-        st.error(f"❌ 데이터 로드 및 처리 중 오류 발생: {e}")
+        st.error(f"❌ 집계 데이터 로드 중 오류 발생: {e}")
         return pd.DataFrame()
 
 # --------------------------------------------------------------------------------
-# 3. 비즈니스 로직 함수 (재해석 & 포맷팅)
+# 3. 비즈니스 로직 함수 (포맷팅)
 # --------------------------------------------------------------------------------
-def apply_reinterpretation(df):
-    """(대분류, 소분류) 조합으로 소비 성격을 재해석"""
-    df = df.copy()
-    mapping_rules = {
-        ("식비", "배달/야식"): "게으름",
-        ("식비", "카페/간식"): "충동",
-        ("식비", "술/유흥"): "충동",
-        ("주거/통신", "월세/관리비"): "호흡",
-        ("주거/통신", "공과금"): "호흡",
-        ("주거/통신", "통신비"): "호흡",
-        ("주거/통신", "구독/OTT"): "호흡",
-        ("생활/쇼핑", "패션/미용"): "충동",
-        ("생활/쇼핑", "가전/가구"): "충동",
-        ("생활/쇼핑", "반려동물"): "호흡",
-        ("교통/차량", "대중교통"): "호흡",
-        ("교통/차량", "자차/주유"): "호흡",
-        ("교통/차량", "택시/호출"): "게으름",
-        ("건강/운동", "운동/헬스"): "성장",
-        ("교육/계발", "도서/문구"): "성장",
-        ("교육/계발", "강의/수강"): "성장",
-        ("관계", "데이트/모임"): "충동",
-        ("문화/취미", "영화/공연"): "충동",
-        ("문화/취미", "여행"): "충동",
-        ("금융", "보험/세금"): "호흡",
-        ("금융", "저축/투자"): "성장"
-    }
-    
-    def get_category(row):
-        return mapping_rules.get((row['대분류'], row['소분류']), "중립")
-
-    df['재해석'] = df.apply(get_category, axis=1)
-    return df
-
 def format_currency(value):
     return f"₩{int(value):,}"
 
 # --------------------------------------------------------------------------------
-# 4. 메인 화면 구성
+# 4. 부분 재실행 구역 (st.fragment)
 # --------------------------------------------------------------------------------
-def main():
-    # 헤더 영역
-    st.markdown("""
-    <div style="text-align: center; padding: 20px 0; margin-bottom: 30px;">
-        <h1 style="color: #1f1f1f; font-size: 36px; font-weight: 700; margin: 0;">
-            💰 지금까지의 나
-        </h1>
-        <p style="color: #666; font-size: 16px; margin-top: 10px;">
-            소비 재해석 및 패턴 분석 리포트
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    with st.sidebar:
-        st.header("⚙️ 데이터 관리")
-        if st.button("🔄 데이터 강제 동기화", use_container_width=True):
-            st.cache_data.clear()
-            st.rerun()
-        st.markdown("---")
-        st.markdown("""
-        <div style="padding: 15px; background-color: #f8f9fa; border-radius: 8px; font-size: 13px; color: #666;">
-            <strong>💡 팁</strong><br>
-            데이터가 업데이트되지 않으면<br>
-            동기화 버튼을 눌러주세요.
-        </div>
-        """, unsafe_allow_html=True)
-
-    # 1. 데이터 로드
-    raw_df = load_and_process_data()
-
-    if raw_df.empty:
-        st.warning("⚠️ 데이터가 없거나 DB 연결에 실패했습니다. utils/handle_sql 설정을 확인해주세요.")
-        return
-
-    # 2. 재해석 적용
-    df = apply_reinterpretation(raw_df)
-
-    # 3. 탭 구성
-    tab1, tab2 = st.tabs(["📊 월별 리포트", "🔥 소비 패턴 분석"]) 
-
-    # --- TAB 1: 월별 리포트 ---
-    with tab1:
-        st.markdown('<div class="section-header">📅 월별 소비 성격 분석</div>', unsafe_allow_html=True)
-        
-        # 월 선택
-        all_months = sorted(df['month'].unique(), reverse=True)
-        col_select, col_info = st.columns([2, 3])
-        with col_select:
-            selected_month = st.selectbox(
-                "📆 분석할 월을 선택하세요", 
-                all_months,
-                help="분석하고 싶은 월을 선택하면 해당 월의 상세 리포트를 확인할 수 있습니다."
-            )
-        
-        # [중요] 선택된 월 데이터만 필터링
+# 월 선택, 히트맵 유형 선택은 해당 구역만 다시 실행한다. 필요한 데이터(df, summary_df)는
+# 인자로 받으며, fragment 만 다시 실행될 때는 마지막 전체 실행에서 받은 프레임을 그대로 쓰므로
+# 소비 내역을 다시 불러오거나(DB/캐시) 다른 차트를 다시 만들지 않는다.
+@debug_panel.fragment("지금까지의 나:월별 리포트")
+def render_monthly_report(df, summary_df):
+    """월별 리포트 탭 (df: Ledger 프레임, summary_df: 롤업 기반 월별 집계용 프레임)"""
+    st.markdown('<div class="section-header">📅 월별 소비 성격 분석</div>', unsafe_allow_html=True)
+
+    # 월 선택
+    all_months = sorted(summary_df['month'].unique(), reverse=True)
+    col_select, col_info = st.columns([2, 3])
+    with col_select:
+        selected_month = st.selectbox(
+            "📆 분석할 월을 선택하세요", 
+            all_months,
+            help="분석하고 싶은 월을 선택하면 해당 월의 상세 리포트를 확인할 수 있습니다."
+        )
+
+    # [중요] 선택된 월 데이터만 필터링
+    with trace.span('report.aggregate', month=str(selected_month)):
         month_df = df[df['month'] == selected_month].copy()
-        
-        # 통계 집계
-        total_cost = month_df["비용"].sum()
-        cost_by_type = month_df.groupby("재해석")["비용"].sum()
-        
-        impulse = cost_by_type.get("충동", 0)
-        lazy = cost_by_type.get("게으름", 0)
-        breath = cost_by_type.get("호흡", 0)
-        growth = cost_by_type.get("성장", 0)
-        waste = impulse + lazy
-
-        # 비중(%) 계산
-        if total_cost > 0:
-            waste_pct = (waste / total_cost) * 100
-            breath_pct = (breath / total_cost) * 100
-            growth_pct = (growth / total_cost) * 100
-        else:
-            waste_pct = breath_pct = growth_pct = 0
+        month_summary = summary_df[summary_df['month'] == selected_month]
 
-        # KPI Metrics - 카드 스타일로 개선
-        st.markdown("<br>", unsafe_allow_html=True)
-        col1, col2, col3, col4 = st.columns(4)
-        
-        def create_metric_card(title, value, badge_text="", badge_color="#888", value_color="#1f1f1f"):
-            # 배지가 없는 경우 빈 공간 추가하여 높이 통일
-            badge_html = f'<div style="margin-top: 8px;"><span style="background-color: {badge_color}; color: white; padding: 4px 10px; border-radius: 12px; font-size: 12px; font-weight: 600;">{badge_text}</span></div>' if badge_text else '<div style="margin-top: 8px; height: 24px;"></div>'
-            return f"""
-            <div class="metric-card" style="height: 160px; display: flex; flex-direction: column; justify-content: space-between;">
-                <div>
-                    <div style="font-size: 13px; color: #666; margin-bottom: 8px; font-weight: 500;">
-                        {title}
-                    </div>
-                    <div style="font-size: 28px; font-weight: 700; color: {value_color}; margin-bottom: 8px;">
-                        {value}
-                    </div>
+        # 통계 집계
+        total_cost = month_summary["비용"].sum()
+        cost_by_type = month_summary.groupby("재해석", observed=True)["비용"].sum()
+
+    impulse = cost_by_type.get("충동", 0)
+    lazy = cost_by_type.get("게으름", 0)
+    breath = cost_by_type.get("호흡", 0)
+    growth = cost_by_type.get("성장", 0)
+    waste = impulse + lazy
+
+    # 비중(%) 계산
+    if total_cost > 0:
+        waste_pct = (waste / total_cost) * 100
+        breath_pct = (breath / total_cost) * 100
+        growth_pct = (growth / total_cost) * 100
+    else:
+        waste_pct = breath_pct = growth_pct = 0
+
+    # KPI Metrics - 카드 스타일로 개선
+    st.markdown("<br>", unsafe_allow_html=True)
+    col1, col2, col3, col4 = st.columns(4)
+
+    def create_metric_card(title, value, badge_text="", badge_color="#888", value_color="#1f1f1f"):
+        # 배지가 없는 경우 빈 공간 추가하여 높이 통일
+        badge_html = f'<div style="margin-top: 8px;"><span style="background-color: {badge_color}; color: white; padding: 4px 10px; border-radius: 12px; font-size: 12px; font-weight: 600;">{badge_text}</span></div>' if badge_text else '<div style="margin-top: 8px; height: 24px;"></div>'
+        return f"""
+        <div class="metric-card" style="height: 160px; display: flex; flex-direction: column; justify-content: space-between;">
+            <div>
+                <div style="font-size: 13px; color: #666; margin-bottom: 8px; font-weight: 500;">
+                    {title}
+                </div>
+                <div style="font-size: 28px; font-weight: 700; color: {value_color}; margin-bottom: 8px;">
+                    {value}
                 </div>
-                {badge_html}
             </div>
-            """
-        
-        with col1:
-            st.markdown(create_metric_card(
-                "총 소비",
-                format_currency(total_cost),
-                value_color="#1f1f1f"
-            ), unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(create_metric_card(
-                "낭비 (충동+게으름)",
-                format_currency(waste),
-                f"줄여야 할 돈 ({waste_pct:.1f}%)",
-                "#dc3545"
-            ), unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(create_metric_card(
-                "호흡 (고정비)",
-                format_currency(breath),
-                f"{breath_pct:.1f}%",
-                "#4D96FF"
-            ), unsafe_allow_html=True)
-        
-        with col4:
-            st.markdown(create_metric_card(
-                "성장 (투자)",
-                format_currency(growth),
-                f"{growth_pct:.1f}%",
-                "#6BCB77"
-            ), unsafe_allow_html=True)
-
-        # 차트 영역
-        st.markdown("<br>", unsafe_allow_html=True)
-        col_pie, col_def_table = st.columns([1.2, 1])
-        
-        # [좌측] 소비 성격 비중 (파이차트)
-        with col_pie:
-            st.markdown(f"### 🎨 {selected_month} 소비 성격 비중")
-            
-            colors = {"충동":"#FF6B6B", "게으름":"#FFA07A", "호흡":"#4D96FF", "성장":"#6BCB77", "중립":"#E0E0E0"}
-            
-            if not cost_by_type.empty:
+            {badge_html}
+        </div>
+        """
+
+    with col1:
+        st.markdown(create_metric_card(
+            "총 소비",
+            format_currency(total_cost),
+            value_color="#1f1f1f"
+        ), unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(create_metric_card(
+            "낭비 (충동+게으름)",
+            format_currency(waste),
+            f"줄여야 할 돈 ({waste_pct:.1f}%)",
+            "#dc3545"
+        ), unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(create_metric_card(
+            "호흡 (고정비)",
+            format_currency(breath),
+            f"{breath_pct:.1f}%",
+            "#4D96FF"
+        ), unsafe_allow_html=True)
+
+    with col4:
+        st.markdown(create_metric_card(
+            "성장 (투자)",
+            format_currency(growth),
+            f"{growth_pct:.1f}%",
+            "#6BCB77"
+        ), unsafe_allow_html=True)
+
+    # 차트 영역
+    st.markdown("<br>", unsafe_allow_html=True)
+    col_pie, col_def_table = st.columns([1.2, 1])
+
+    # [좌측] 소비 성격 비중 (파이차트)
+    with col_pie:
+        st.markdown(f"### 🎨 {selected_month} 소비 성격 비중")
+
+        colors = {"충동":"#FF6B6B", "게으름":"#FFA07A", "호흡":"#4D96FF", "성장":"#6BCB77", "중립":"#E0E0E0"}
+
+        if not cost_by_type.empty:
+            with trace.span('plotly.build', chart='pie'):
                 fig_pie = px.pie(
                     names=cost_by_type.index, 
                     values=cost_by_type.values,
@@ -299,66 +234,68 @@ def main():
                     showlegend=True,
                     legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05)
                 )
+            with trace.span('plotly.render', chart='pie'):
                 st.plotly_chart(fig_pie, use_container_width=True)
-            else:
-                st.info("📊 데이터가 없습니다.")
+        else:
+            st.info("📊 데이터가 없습니다.")
 
-        # [우측] 소비 유형 정의 표
-        with col_def_table:
-            st.markdown("### 📋 소비 유형 정의")
-            st.markdown("##### 교관이 정한 기준이니 숙지하도록!")
-            
-            # 개선된 테이블 스타일
-            st.markdown("""
-            <div style="background-color: white; padding: 15px; border-radius: 8px; box-shadow: 0px 2px 4px rgba(0,0,0,0.1);">
-            <table style="width: 100%; border-collapse: collapse; font-size: 13px;">
-                <thead>
-                    <tr style="background-color: #f8f9fa; border-bottom: 2px solid #dee2e6;">
-                        <th style="padding: 10px; text-align: left; font-weight: 600;">유형</th>
-                        <th style="padding: 10px; text-align: left; font-weight: 600;">정의</th>
-                        <th style="padding: 10px; text-align: center; font-weight: 600;">판정</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    <tr style="border-bottom: 1px solid #e9ecef;">
-                        <td style="padding: 10px; font-weight: 600; color: #FF6B6B;">게으름</td>
-                        <td style="padding: 10px;">편리함에 굴복한 비용</td>
-                        <td style="padding: 10px; text-align: center;"><span style="color: #dc3545; font-weight: 600;">🔴 낭비</span></td>
-                    </tr>
-                    <tr style="border-bottom: 1px solid #e9ecef;">
-                        <td style="padding: 10px; font-weight: 600; color: #FFA07A;">충동</td>
-                        <td style="padding: 10px;">계획 없는 감정 소비</td>
-                        <td style="padding: 10px; text-align: center;"><span style="color: #dc3545; font-weight: 600;">🔴 낭비</span></td>
-                    </tr>
-                    <tr style="border-bottom: 1px solid #e9ecef;">
-                        <td style="padding: 10px; font-weight: 600; color: #4D96FF;">호흡</td>
-                        <td style="padding: 10px;">생활 유지 필수 비용</td>
-                        <td style="padding: 10px; text-align: center;"><span style="color: #0066cc; font-weight: 600;">🔵 필수</span></td>
-                    </tr>
-                    <tr>
-                        <td style="padding: 10px; font-weight: 600; color: #6BCB77;">성장</td>
-                        <td style="padding: 10px;">미래를 위한 투자</td>
-                        <td style="padding: 10px; text-align: center;"><span style="color: #28a745; font-weight: 600;">🟢 투자</span></td>
-                    </tr>
-                </tbody>
-            </table>
-            </div>
-            """, unsafe_allow_html=True)
+    # [우측] 소비 유형 정의 표
+    with col_def_table:
+        st.markdown("### 📋 소비 유형 정의")
+        st.markdown("##### 교관이 정한 기준이니 숙지하도록!")
 
-        # 하단 영역: 상세 내역 & Top 5 차트
-        st.markdown("<br>", unsafe_allow_html=True)
-        col_list, col_bar = st.columns([2.2, 1])
+        # 개선된 테이블 스타일
+        st.markdown("""
+        <div style="background-color: white; padding: 15px; border-radius: 8px; box-shadow: 0px 2px 4px rgba(0,0,0,0.1);">
+        <table style="width: 100%; border-collapse: collapse; font-size: 13px;">
+            <thead>
+                <tr style="background-color: #f8f9fa; border-bottom: 2px solid #dee2e6;">
+                    <th style="padding: 10px; text-align: left; font-weight: 600;">유형</th>
+                    <th style="padding: 10px; text-align: left; font-weight: 600;">정의</th>
+                    <th style="padding: 10px; text-align: center; font-weight: 600;">판정</th>
+                </tr>
+            </thead>
+            <tbody>
+                <tr style="border-bottom: 1px solid #e9ecef;">
+                    <td style="padding: 10px; font-weight: 600; color: #FF6B6B;">게으름</td>
+                    <td style="padding: 10px;">편리함에 굴복한 비용</td>
+                    <td style="padding: 10px; text-align: center;"><span style="color: #dc3545; font-weight: 600;">🔴 낭비</span></td>
+                </tr>
+                <tr style="border-bottom: 1px solid #e9ecef;">
+                    <td style="padding: 10px; font-weight: 600; color: #FFA07A;">충동</td>
+                    <td style="padding: 10px;">계획 없는 감정 소비</td>
+                    <td style="padding: 10px; text-align: center;"><span style="color: #dc3545; font-weight: 600;">🔴 낭비</span></td>
+                </tr>
+                <tr style="border-bottom: 1px solid #e9ecef;">
+                    <td style="padding: 10px; font-weight: 600; color: #4D96FF;">호흡</td>
+                    <td style="padding: 10px;">생활 유지 필수 비용</td>
+                    <td style="padding: 10px; text-align: center;"><span style="color: #0066cc; font-weight: 600;">🔵 필수</span></td>
+                </tr>
+                <tr>
+                    <td style="padding: 10px; font-weight: 600; color: #6BCB77;">성장</td>
+                    <td style="padding: 10px;">미래를 위한 투자</td>
+                    <td style="padding: 10px; text-align: center;"><span style="color: #28a745; font-weight: 600;">🟢 투자</span></td>
+                </tr>
+            </tbody>
+        </table>
+        </div>
+        """, unsafe_allow_html=True)
 
-        # [좌측 하단] 상세 내역 테이블
-        with col_list:
-            st.markdown(f"### 📝 {selected_month} 상세 내역")
-            display_cols = ["날짜", "대분류", "소분류", "비용", "재해석", "비고"]
-            
-            # 데이터프레임 스타일링
+    # 하단 영역: 상세 내역 & Top 5 차트
+    st.markdown("<br>", unsafe_allow_html=True)
+    col_list, col_bar = st.columns([2.2, 1])
+
+    # [좌측 하단] 상세 내역 테이블
+    with col_list:
+        st.markdown(f"### 📝 {selected_month} 상세 내역")
+        display_cols = ["날짜", "대분류", "소분류", "비용", "재해석", "비고"]
+
+        # 데이터프레임 스타일링
+        with trace.span('report.detail_table', rows=len(month_df)):
             display_df = month_df[display_cols].sort_values("날짜", ascending=False).copy()
             display_df['날짜'] = display_df['날짜'].dt.strftime('%Y-%m-%d')
             display_df['비용'] = display_df['비용'].apply(lambda x: f"₩{int(x):,}")
-            
+
             # 재해석에 따른 색상 적용
             def color_reinterpretation(val):
                 colors_map = {
@@ -370,31 +307,32 @@ def main():
                 }
                 color = colors_map.get(val, '#E0E0E0')
                 return f'background-color: {color}; color: white; font-weight: 600;'
-            
+
             styled_df = display_df.style.applymap(
                 color_reinterpretation, 
                 subset=['재해석']
             )
-            
-            st.dataframe(
-                styled_df,
-                use_container_width=True, 
-                height=450,
-                hide_index=True
-            )
 
-        # [우측 하단] 소비 상위 Top 5 (바차트)
-        with col_bar:
-            st.markdown(f"### 💸 {selected_month} 소비 상위 Top 5")
-            
-            if not month_df.empty:
+        st.dataframe(
+            styled_df,
+            use_container_width=True, 
+            height=450,
+            hide_index=True
+        )
+
+    # [우측 하단] 소비 상위 Top 5 (바차트)
+    with col_bar:
+        st.markdown(f"### 💸 {selected_month} 소비 상위 Top 5")
+
+        if not month_summary.empty:
+            with trace.span('plotly.build', chart='bar'):
                 category_ratio = (
-                    month_df.groupby("대분류")["비용"]
+                    month_summary.groupby("대분류", observed=True)["비용"]
                     .sum()
                     .sort_values(ascending=False)
                     .head(5)
                 )
-                
+
                 fig_bar = px.bar(
                     x=category_ratio.values, 
                     y=category_ratio.index,
@@ -404,7 +342,7 @@ def main():
                     color=category_ratio.values,
                     color_continuous_scale='Blues'
                 )
-                
+
                 fig_bar.update_layout(
                     height=450, 
                     margin=dict(t=20, b=20, l=10, r=10),
@@ -416,10 +354,133 @@ def main():
                     textposition='outside',
                     textfont=dict(size=11, color='#333')
                 )
-                
+
+            with trace.span('plotly.render', chart='bar'):
                 st.plotly_chart(fig_bar, use_container_width=True)
-            else:
-                st.info("📊 데이터가 없습니다.")
+        else:
+            st.info("📊 데이터가 없습니다.")
+
+@debug_panel.fragment("지금까지의 나:히트맵")
+def render_heatmap(df):
+    """소비 유형별 요일 × 시간 히트맵과 Top 3 (df: Ledger 프레임)"""
+    filter_options = ["충동", "게으름", "호흡", "성장"]
+    selected_types = st.multiselect(
+        "📌 분석할 유형을 선택하세요 (복수 선택 가능)", 
+        options=filter_options, 
+        default=filter_options,
+        help="분석하고 싶은 소비 유형을 선택하세요"
+    )
+
+    title_text = f"선택된 유형({', '.join(selected_types)})의 전체 소비 히트맵" if selected_types else "유형을 선택하세요"
+    st.markdown(f"### 🌡️ {title_text}")
+
+    if selected_types:
+        with trace.span('heatmap.filter', types=len(selected_types)):
+            target_df = df[df["재해석"].isin(selected_types)]
+    else:
+        target_df = pd.DataFrame()
+        st.warning("⚠️ 분석할 유형을 하나 이상 선택해주세요.")
+
+    if not target_df.empty:
+        with trace.span('heatmap.pivot', rows=len(target_df)):
+            heatmap_data = target_df.groupby(["weekday", "hour"])["비용"].sum().reset_index()
+
+            # weekday 는 0(월)~6(일) 정수 코드이므로 순서대로 놓고 요일 이름만 붙임
+            pivot_table = heatmap_data.pivot_table(
+                index="weekday", columns="hour", values="비용", fill_value=0
+            ).reindex(range(7))
+            pivot_table.index = ledger_module.WEEKDAY_LABELS
+
+        with trace.span('plotly.build', chart='heatmap'):
+            fig_heatmap = px.imshow(
+                pivot_table,
+                labels=dict(x="시간(시)", y="요일", color="소비액"),
+                x=pivot_table.columns,
+                y=pivot_table.index,
+                aspect="auto",
+                color_continuous_scale="Reds",
+                text_auto=True
+            )
+            fig_heatmap.update_xaxes(range=[-0.5, 23.5], tickmode='linear', dtick=2)
+
+            fig_heatmap.update_layout(
+                margin=dict(t=20, l=10, r=10, b=10),
+                height=450
+            )
+        with trace.span('plotly.render', chart='heatmap'):
+            st.plotly_chart(fig_heatmap, use_container_width=True)
+
+        # Top 3 표시 개선
+        st.markdown("#### 🏆 선택 항목 합산 소비 Top 3")
+        top3 = target_df.nlargest(3, "비용")[["날짜", "대분류", "소분류", "비용", "비고"]].copy()
+        top3['날짜'] = top3['날짜'].dt.strftime('%Y-%m-%d')
+        top3["비용"] = top3["비용"].apply(format_currency)
+        top3 = top3.reset_index(drop=True)
+        top3.index = top3.index + 1
+
+        # 스타일링된 테이블
+        st.dataframe(
+            top3,
+            use_container_width=True,
+            hide_index=False,
+            height=150
+        )
+
+    elif selected_types:
+        st.warning("⚠️ 선택한 유형에 해당하는 소비 내역이 없습니다.")
+
+# --------------------------------------------------------------------------------
+# 5. 메인 화면 구성
+# --------------------------------------------------------------------------------
+def main():
+    # 헤더 영역
+    st.markdown("""
+    <div style="text-align: center; padding: 20px 0; margin-bottom: 30px;">
+        <h1 style="color: #1f1f1f; font-size: 36px; font-weight: 700; margin: 0;">
+            💰 지금까지의 나
+        </h1>
+        <p style="color: #666; font-size: 16px; margin-top: 10px;">
+            소비 재해석 및 패턴 분석 리포트
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    with st.sidebar:
+        st.header("⚙️ 데이터 관리")
+        if st.button("🔄 데이터 강제 동기화", use_container_width=True):
+            ledger_cache.invalidate()
+            st.rerun()
+        st.markdown("---")
+        st.markdown("""
+        <div style="padding: 15px; background-color: #f8f9fa; border-radius: 8px; font-size: 13px; color: #666;">
+            <strong>💡 팁</strong><br>
+            데이터가 업데이트되지 않으면<br>
+            동기화 버튼을 눌러주세요.
+        </div>
+        """, unsafe_allow_html=True)
+
+    # 1. 데이터 로드
+    with trace.span('load.ledger'):
+        raw_df = load_and_process_data()
+
+    if raw_df.empty:
+        st.warning("⚠️ 데이터가 없거나 DB 연결에 실패했습니다. utils/handle_sql 설정을 확인해주세요.")
+        return
+
+    # 2. 재해석은 Ledger 에 이미 붙어 있음 (월별 합계/비중/상관관계는 수백 행짜리 롤업으로 계산)
+    df = raw_df
+    with trace.span('load.rollup'):
+        summary_df = load_rollup_summary()
+    if summary_df.empty:
+        # 롤업을 읽지 못하면 원본 행으로 같은 집계를 계산
+        summary_df = raw_df.assign(건수=1)
+
+    # 3. 탭 구성
+    tab1, tab2 = st.tabs(["📊 월별 리포트", "🔥 소비 패턴 분석"]) 
+
+    # --- TAB 1: 월별 리포트 ---
+    with tab1:
+        render_monthly_report(df, summary_df)
 
     # --- TAB 2: 패턴 분석 ---
     with tab2:
@@ -436,17 +497,19 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
-            # 상관계수 계산
-            monthly_agg = df.groupby("month").apply(
-                lambda x: pd.Series({
-                    "total": x["비용"].sum(),
-                    "waste": x[x["재해석"].isin(["충동", "게으름"])]["비용"].sum() 
-                })
-            ).reset_index()
-
-            corr_value = 0 
-            if len(monthly_agg) > 1:
-                corr_value = monthly_agg['waste'].corr(monthly_agg['total'])
+            # 상관계수 계산 (롤업 기준 월별 총 소비 / 낭비)
+            with trace.span('pattern.correlation'):
+                monthly_agg = (
+                    summary_df.assign(waste=summary_df["비용"].where(summary_df["재해석"].isin(reinterpret.WASTE_LABELS), 0))
+                    .groupby("month")
+                    .agg(total=("비용", "sum"), waste=("waste", "sum"))
+                    .reset_index()
+                    .astype({"month": str})
+                )
+
+                corr_value = 0 
+                if len(monthly_agg) > 1:
+                    corr_value = monthly_agg['waste'].corr(monthly_agg['total'])
 
             # 이미지 경로 및 상태 텍스트 설정
             script_dir = os.path.dirname(os.path.abspath(__file__)) 
@@ -554,104 +617,49 @@ def main():
             st.markdown("### 📉 낭비 vs 총 소비 상관관계 분석도")
             
             if len(monthly_agg) > 1:
-                fig_scatter = px.scatter(
-                    monthly_agg, 
-                    x="waste", 
-                    y="total", 
-                    text="month",
-                    labels={"waste": "낭비 (충동+게으름)", "total": "총 소비"},
-                    size=[10]*len(monthly_agg),
-                    color="total",
-                    color_continuous_scale="Reds"
-                )
-                try:
-                    z = np.polyfit(monthly_agg["waste"], monthly_agg["total"], 1)
-                    p = np.poly1d(z)
-                    x_range = np.linspace(monthly_agg["waste"].min(), monthly_agg["waste"].max(), 100)
-                    fig_scatter.add_trace(go.Scatter(
-                        x=x_range, 
-                        y=p(x_range), 
-                        mode='lines', 
-                        name='추세선', 
-                        line=dict(dash='dot', color='red', width=2)
-                    ))
-                except Exception:
-                    pass
+                with trace.span('plotly.build', chart='scatter'):
+                    fig_scatter = px.scatter(
+                        monthly_agg, 
+                        x="waste", 
+                        y="total", 
+                        text="month",
+                        labels={"waste": "낭비 (충동+게으름)", "total": "총 소비"},
+                        size=[10]*len(monthly_agg),
+                        color="total",
+                        color_continuous_scale="Reds"
+                    )
+                    try:
+                        z = np.polyfit(monthly_agg["waste"], monthly_agg["total"], 1)
+                        p = np.poly1d(z)
+                        x_range = np.linspace(monthly_agg["waste"].min(), monthly_agg["waste"].max(), 100)
+                        fig_scatter.add_trace(go.Scatter(
+                            x=x_range, 
+                            y=p(x_range), 
+                            mode='lines', 
+                            name='추세선', 
+                            line=dict(dash='dot', color='red', width=2)
+                        ))
+                    except Exception:
+                        pass
                 
-                fig_scatter.update_layout(
-                    margin=dict(t=20, l=10, r=10, b=10),
-                    height=450,
-                    xaxis_tickformat=',',
-                    yaxis_tickformat=',',
-                    showlegend=True
-                )
-                fig_scatter.update_traces(textposition="top center", textfont_size=10)
-                st.plotly_chart(fig_scatter, use_container_width=True)
+                    fig_scatter.update_layout(
+                        margin=dict(t=20, l=10, r=10, b=10),
+                        height=450,
+                        xaxis_tickformat=',',
+                        yaxis_tickformat=',',
+                        showlegend=True
+                    )
+                    fig_scatter.update_traces(textposition="top center", textfont_size=10)
+                with trace.span('plotly.render', chart='scatter'):
+                    st.plotly_chart(fig_scatter, use_container_width=True)
             else:
                 st.info("🪖 훈련 데이터 부족! 최소 2개월 이상의 기록이 필요합니다.")
 
         # 하단 우측: 히트맵
         with col_chart_right:
-            filter_options = ["충동", "게으름", "호흡", "성장"]
-            selected_types = st.multiselect(
-                "📌 분석할 유형을 선택하세요 (복수 선택 가능)", 
-                options=filter_options, 
-                default=filter_options,
-                help="분석하고 싶은 소비 유형을 선택하세요"
-            )
-
-            title_text = f"선택된 유형({', '.join(selected_types)})의 전체 소비 히트맵" if selected_types else "유형을 선택하세요"
-            st.markdown(f"### 🌡️ {title_text}")
-
-            if selected_types:
-                target_df = df[df["재해석"].isin(selected_types)]
-            else:
-                target_df = pd.DataFrame()
-                st.warning("⚠️ 분석할 유형을 하나 이상 선택해주세요.")
-
-            if not target_df.empty:
-                heatmap_data = target_df.groupby(["weekday_name", "hour"])["비용"].sum().reset_index()
-                
-                week_order = ["월", "화", "수", "목", "금", "토", "일"]
-                pivot_table = heatmap_data.pivot_table(
-                    index="weekday_name", columns="hour", values="비용", fill_value=0
-                ).reindex(week_order)
-
-                fig_heatmap = px.imshow(
-                    pivot_table,
-                    labels=dict(x="시간(시)", y="요일", color="소비액"),
-                    x=pivot_table.columns,
-                    y=pivot_table.index,
-                    aspect="auto",
-                    color_continuous_scale="Reds",
-                    text_auto=True
-                )
-                fig_heatmap.update_xaxes(range=[-0.5, 23.5], tickmode='linear', dtick=2)
-                
-                fig_heatmap.update_layout(
-                    margin=dict(t=20, l=10, r=10, b=10),
-                    height=450
-                )
-                st.plotly_chart(fig_heatmap, use_container_width=True)
-                
-                # Top 3 표시 개선
-                st.markdown("#### 🏆 선택 항목 합산 소비 Top 3")
-                top3 = target_df.nlargest(3, "비용")[["날짜", "대분류", "소분류", "비용", "비고"]].copy()
-                top3['날짜'] = top3['날짜'].dt.strftime('%Y-%m-%d')
-                top3["비용"] = top3["비용"].apply(format_currency)
-                top3 = top3.reset_index(drop=True)
-                top3.index = top3.index + 1
-                
-                # 스타일링된 테이블
-                st.dataframe(
-                    top3,
-                    use_container_width=True,
-                    hide_index=False,
-                    height=150
-                )
-            
-            elif selected_types:
-                st.warning("⚠️ 선택한 유형에 해당하는 소비 내역이 없습니다.")
+            render_heatmap(df)
 
 if __name__ == "__main__":
+    debug_panel.begin("지금까지의 나")
     main()
+    debug_panel.render()
@@ -54,9 +54,16 @@ sys.path.append(parent_dir)
 
 try:
     import utils.handle_sql as handle_sql
+    import utils.rollup as rollup
+    import utils.reinterpret as reinterpret
+    import utils.ledger as ledger_module
+    import utils.debug_panel as debug_panel
+    import utils.trace as trace
 except ImportError:
     st.error("utils/handle_sql.py 파일을 찾을 수 없습니다.")
 
+debug_panel.begin("앞으로의 나")
+
 # 헤더 영역
 st.markdown("""
 <div style="text-align: center; padding: 20px 0; margin-bottom: 30px;">
@@ -90,39 +97,41 @@ monthly_budget = load_budget()
 # =========================
 # 데이터 로드
 # =========================
-@st.cache_data(ttl=600)
 def load_expense_data():
-    query = """
-    SELECT date, time, category, reason, cost
-    FROM card
-    """
-    df = handle_sql.get_data(query)
-    df["date"] = pd.to_datetime(df["date"])
-    df["cost"] = pd.to_numeric(df["cost"], errors="coerce").fillna(0)
-    df["month"] = df["date"].dt.to_period("M").astype(str)
-    return df
-
-df = load_expense_data()
+    # 이 페이지의 지표는 모두 합계이므로 일별 롤업(일 × 대분류 × 중분류)만 읽음
+    # Ledger 로 변환하면 month(period[M]) 와 재해석(reinterpretation) 컬럼이 함께 붙음
+    df = rollup.get_rollup().rename(columns={"day": "date", "total_cost": "cost"})
+    return ledger_module.Ledger.from_frame(df).frame
+
+try:
+    with trace.span('load.rollup'):
+        df = load_expense_data()
+except Exception as e:
+    st.error(f"❌ 데이터 로드 중 오류 발생: {e}")
+    debug_panel.render()
+    st.stop()
 if df.empty:
     st.warning("⚠️ 소비 데이터가 없어 훈련이 불가합니다.")
+    debug_panel.render()
     st.stop()
 
 # =========================
 # 공통 계산
 # =========================
-monthly = df.groupby("month")["cost"].sum().reset_index()
-recent_3 = monthly.tail(3)
-avg_monthly = recent_3["cost"].mean()
-
-category_ratio = (
-    df.groupby("category")["cost"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(5)
-)
+with trace.span('forecast.aggregate', rows=len(df)):
+    monthly = df.groupby("month")["cost"].sum().reset_index()
+    recent_3 = monthly.tail(3)
+    avg_monthly = recent_3["cost"].mean()
+
+    category_ratio = (
+        df.groupby("category", observed=True)["cost"]
+        .sum()
+        .sort_values(ascending=False)
+        .head(5)
+    )
 
-current_month = datetime.now().strftime("%Y-%m")
-used_this_month = df[df["month"] == current_month]["cost"].sum()
+    current_month = pd.Period(datetime.now(), "M")
+    used_this_month = df[df["month"] == current_month]["cost"].sum()
 
 # =========================
 # 공통 계산(남은 일수 / 하루 사용 가능 금액)
@@ -133,43 +142,6 @@ remaining_days = days_in_month - today.day
 remaining_budget = monthly_budget - used_this_month
 daily_available = remaining_budget / remaining_days if remaining_days > 0 else 0
 
-# =========================
-# 재해석 매핑 (TAB1에서 낭비 계산용)
-# =========================
-def apply_reinterpretation(df):
-    mapping_rules = {
-        ("식비", "배달/야식"): "게으름",
-        ("식비", "카페/간식"): "충동",
-        ("식비", "술/유흥"): "충동",
-        ("주거/통신", "월세/관리비"): "호흡",
-        ("주거/통신", "공과금"): "호흡",
-        ("주거/통신", "통신비"): "호흡",
-        ("주거/통신", "구독/OTT"): "호흡",
-        ("생활/쇼핑", "패션/미용"): "충동",
-        ("생활/쇼핑", "가전/가구"): "충동",
-        ("생활/쇼핑", "반려동물"): "호흡",
-        ("교통/차량", "대중교통"): "호흡",
-        ("교통/차량", "자차/주유"): "호흡",
-        ("교통/차량", "택시/호출"): "게으름",
-        ("건강/운동", "운동/헬스"): "성장",
-        ("교육/계발", "도서/문구"): "성장",
-        ("교육/계발", "강의/수강"): "성장",
-        ("관계", "데이트/모임"): "충동",
-        ("문화/취미", "영화/공연"): "충동",
-        ("문화/취미", "여행"): "충동",
-        ("금융", "보험/세금"): "호흡",
-        ("금융", "저축/투자"): "성장"
-    }
-    
-    df = df.copy()
-    df['sub_category'] = df['reason']  # reason을 소분류로 사용
-    def get_category(row):
-        return mapping_rules.get((row['category'], row['sub_category']), "중립")
-    df['재해석'] = df.apply(get_category, axis=1)
-    return df
-
-df_reinterpreted = apply_reinterpretation(df)
-
 # =========================
 # 프롬프트 생성
 # =========================
@@ -269,26 +241,33 @@ with tab1:
         )
 
     # 낭비(충동+게으름) 계산
-    month_df = df_reinterpreted[df_reinterpreted["month"] == current_month]
-    waste_amount = month_df[month_df["재해석"].isin(["충동", "게으름"])]["cost"].sum()
+    # 재해석(reinterpretation)은 Ledger 로 변환할 때 이미 붙어 있음 (TAB1 낭비 계산용)
+    month_df = df[df["month"] == current_month]
+    waste_amount = month_df[month_df["reinterpretation"].isin(reinterpret.WASTE_LABELS)]["cost"].sum()
 
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("🧠 미래 평가 받기", use_container_width=True):
         with st.spinner("교관이 판단 중입니다..."):
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "너는 소비 훈련소 교관이다."},
-                    {"role": "user", "content": generate_final_prompt(
-                        monthly_budget,
-                        used_this_month,
-                        remaining_days,
-                        daily_available,
-                        waste_amount
-                    )}
-                ],
-                temperature=0.4
-            )
+            with trace.span('llm.openai', model="gpt-4o-mini") as attrs:
+                response = client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "너는 소비 훈련소 교관이다."},
+                        {"role": "user", "content": generate_final_prompt(
+                            monthly_budget,
+                            used_this_month,
+                            remaining_days,
+                            daily_available,
+                            waste_amount
+                        )}
+                    ],
+                    temperature=0.4
+                )
+                if attrs is not None and response.usage is not None:
+                    attrs.update(
+                        prompt_tokens=response.usage.prompt_tokens,
+                        completion_tokens=response.usage.completion_tokens
+                    )
             st.session_state.coach_feedback = response.choices[0].message.content.replace("\n", "<br>")
             st.rerun()
 
@@ -432,3 +411,5 @@ with tab3:
     st.markdown("<br>", unsafe_allow_html=True)
     st.success(f"🧭 이번 희망회로 결과: **{destination} 가능**")
     st_folium(fmap, height=450, width=800)
+
+debug_panel.render()
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 테스트는 내장 SQLite 백엔드로 실행한다.
+# handle_sql 은 설정을 처음 쓸 때 한 번만 읽으므로 utils 를 임포트하기 전에 임시 DB 를 가리키게 하고,
+# 느린 쿼리 로그 / 스냅샷 / trace 가 작업 트리의 data/ 에 쓰지 않도록 끈다 (.env 보다 환경 변수가 우선).
+#
+#   python -m pytest -q
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_workdir = tempfile.mkdtemp(prefix='tungjang-test-')
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['DB_SQLITE_PATH'] = os.path.join(_workdir, 'test.db')
+os.environ['LEDGER_SNAPSHOT_PATH'] = ''
+os.environ['DB_SLOW_QUERY_LOG'] = ''
+os.environ['TRACE'] = '0'
+
+@pytest.fixture
+def db():
+    """
+    마이그레이션을 마친 빈 SQLite DB (테스트마다 card / 롤업 / 삭제 기록을 비움)
+
+    Returns:
+        module: utils.handle_sql
+    """
+    import utils.handle_sql as handle_sql
+    import utils.migrate as migrate
+    import utils.rollup as rollup
+
+    migrate.ensure_migrated()
+    with handle_sql.transaction() as cursor:
+        cursor.execute("DELETE FROM card")
+        cursor.execute(f"DELETE FROM {rollup.ROLLUP_TABLE}")
+        cursor.execute("DELETE FROM card_tombstone")
+    handle_sql.bump_data_version()
+    return handle_sql
@@ -0,0 +1,33 @@
+from datetime import time, timedelta
+
+import utils.dedupe as dedupe
+
+ROW = ('2026-01-21', '19:54:00', '식비', '카페/간식', 4500, '스타벅스')
+
+def test_fingerprint_shape():
+    value = dedupe.fingerprint(*ROW)
+    assert len(value) == 40
+    assert value.startswith('20260121')
+
+def test_fingerprint_null_cost():
+    # NULL 금액인 옛 행도 지문을 만들 수 있어야 하고, 0 원과는 다른 행으로 본다
+    null_cost = dedupe.fingerprint('2026-01-21', '19:54:00', '식비', '카페/간식', None, '스타벅스')
+    zero_cost = dedupe.fingerprint('2026-01-21', '19:54:00', '식비', '카페/간식', 0, '스타벅스')
+    assert len(null_cost) == 40
+    assert null_cost != zero_cost
+
+def test_fingerprint_null_memo_equals_empty():
+    assert dedupe.fingerprint(*ROW[:5], None) == dedupe.fingerprint(*ROW[:5], '')
+
+def test_fingerprint_time_formats():
+    # 폼은 'HH:MM', DB 는 'HH:MM:SS' / timedelta(MySQL TIME) / time 객체로 돌려준다
+    expected = dedupe.fingerprint(*ROW)
+    for value in ('19:54', '19:54:00', ' 19:54 ', timedelta(hours=19, minutes=54), time(19, 54)):
+        assert dedupe.fingerprint(ROW[0], value, *ROW[2:]) == expected, value
+
+def test_fingerprint_seconds_matter():
+    assert dedupe.fingerprint(ROW[0], '19:54:30', *ROW[2:]) != dedupe.fingerprint(*ROW)
+
+def test_fingerprint_normalizes_whitespace():
+    assert dedupe.fingerprint(*ROW[:5], '  스타벅스 ') == dedupe.fingerprint(*ROW)
+    assert dedupe.fingerprint(*ROW[:5], '스타벅스  강남') == dedupe.fingerprint(*ROW[:5], '스타벅스 강남')
@@ -0,0 +1,34 @@
+import pandas as pd
+
+import utils.handle_sql as handle_sql
+import utils.ledger as ledger
+import utils.rollup as rollup
+
+def test_coerce_keeps_null_cost():
+    df = pd.DataFrame({
+        'date': ['2026-01-21', '2026-01-22', None],
+        'category': ['식비', '식비', '식비'],
+        'reason': ['외식', '외식', '외식'],
+        'cost': [4500, None, 3000],
+    })
+    frame = ledger.coerce(df)
+    # 날짜가 없는 행만 버리고, 금액이 NULL 인 행은 0 원으로
+    assert frame['cost'].tolist() == [4500, 0]
+
+def test_ledger_matches_rollup_with_null_cost(db):
+    # 상세 표/히트맵(Ledger)과 월 합계/건수(롤업)가 같은 행을 센다
+    with handle_sql.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO card (date, time, category, reason, cost, memo) VALUES (%s, %s, %s, %s, %s, %s)",
+            [('2026-01-24', '09:00:00', '식비', '외식', None, '옛 행'),
+             ('2026-01-24', '12:00:00', '식비', '외식', 9000, '점심'),
+             ('2026-02-01', '08:00:00', '교통', '택시/호출', 12000, None)]
+        )
+    rollup.rebuild()
+
+    frame = ledger.Ledger.from_frame(handle_sql.get_frame("SELECT * FROM card")).frame
+    by_month = frame.groupby('month', observed=True)['cost'].agg(['sum', 'count'])
+    summary = ledger.coerce(rollup.get_rollup().rename(columns={'day': 'date', 'total_cost': 'cost'}))
+    expected = summary.groupby('month', observed=True).agg(sum=('cost', 'sum'), count=('cnt', 'sum'))
+    pd.testing.assert_frame_equal(by_month, expected, check_dtype=False)
+    assert by_month.loc[pd.Period('2026-01', 'M')].tolist() == [9000, 2]
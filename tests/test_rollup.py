@@ -0,0 +1,105 @@
+import utils.expenses as expenses
+import utils.handle_sql as handle_sql
+import utils.rollup as rollup
+
+def _cells():
+    """(롤업, card 직접 집계) 를 {(날짜, 대분류, 중분류): (합계, 건수)} 로 (건수 0 인 칸 제외)"""
+    with handle_sql.transaction() as cursor:
+        cursor.execute(
+            f"SELECT day, category, reason, total_cost, cnt FROM {rollup.ROLLUP_TABLE} WHERE cnt > 0"
+        )
+        stored = {(str(day)[:10], category, reason): (int(total), int(cnt))
+                  for day, category, reason, total, cnt in cursor.fetchall()}
+        cursor.execute(
+            "SELECT date, category, reason, COALESCE(SUM(cost), 0), COUNT(*) FROM card GROUP BY date, category, reason"
+        )
+        expected = {(str(day)[:10], category, reason): (int(total), int(cnt))
+                    for day, category, reason, total, cnt in cursor.fetchall()}
+    return stored, expected
+
+def _assert_consistent():
+    stored, expected = _cells()
+    assert stored == expected
+
+def _card_ids():
+    with handle_sql.transaction() as cursor:
+        cursor.execute("SELECT id FROM card ORDER BY id")
+        return [row[0] for row in cursor.fetchall()]
+
+def test_add_updates_rollup(db):
+    # 페이지는 시간을 'HH:MM:SS' 로 넘김
+    assert expenses.add_expense('2026-01-21', '19:54:00', '식비', '카페/간식', 4500, '스타벅스') == 1
+    assert expenses.add_expense('2026-01-21', '12:10:00', '식비', '카페/간식', 3000, '') == 1
+    assert expenses.add_expense('2026-01-22', '08:00:00', '교통', '택시/호출', 12000, None) == 1
+    _assert_consistent()
+    stored, _ = _cells()
+    assert stored[('2026-01-21', '식비', '카페/간식')] == (7500, 2)
+
+def test_duplicate_add_leaves_rollup_alone(db):
+    expenses.add_expense('2026-01-21', '19:54:00', '식비', '카페/간식', 4500, '스타벅스')
+    # 같은 지문 ('HH:MM' 과 'HH:MM:SS', 메모 앞뒤 공백) 은 추가하지 않음
+    assert expenses.add_expense('2026-01-21', '19:54', '식비', '카페/간식', 4500, ' 스타벅스') == 0
+    _assert_consistent()
+    assert len(_card_ids()) == 1
+
+def test_update_moves_rollup_cell(db):
+    expenses.add_expense('2026-01-21', '19:54:00', '식비', '카페/간식', 4500, '스타벅스')
+    expenses.add_expense('2026-01-21', '12:10:00', '식비', '카페/간식', 3000, '')
+    first = _card_ids()[0]
+
+    # id 로 수정: 날짜/분류/금액이 모두 바뀌면 이전 칸에서 빠지고 새 칸에 더해짐
+    assert expenses.update_expense('2026-01-23', '20:00:00', '여가', '영화/공연', 15000, '심야 영화', expense_id=first) == 1
+    _assert_consistent()
+
+    # id 없는 이전 호출 방식 (original_* 로 대상 찾기, original_time 은 'HH:MM' 도 허용)
+    assert expenses.update_expense(
+        '2026-01-21', '12:10:00', '식비', '카페/간식', 3500, '',
+        original_date='2026-01-21', original_time='12:10', original_category='식비', original_reason='카페/간식'
+    ) == 1
+    _assert_consistent()
+    stored, _ = _cells()
+    assert stored[('2026-01-21', '식비', '카페/간식')] == (3500, 1)
+
+def test_delete_empties_rollup_cell(db):
+    expenses.add_expense('2026-01-21', '19:54:00', '식비', '카페/간식', 4500, '스타벅스')
+    expenses.add_expense('2026-01-22', '08:00:00', '교통', '택시/호출', 12000, None)
+    first, second = _card_ids()
+
+    assert expenses.delete_expense(expense_id=first) == 1
+    _assert_consistent()
+    assert expenses.delete_expense(
+        original_date='2026-01-22', original_time='08:00', category='교통', reason='택시/호출', cost=12000
+    ) == 1
+    _assert_consistent()
+    assert _cells() == ({}, {})
+    assert expenses.delete_expense(expense_id=second) == 0
+
+def test_rebuild_with_null_cost(db):
+    # 금액이 NULL 인 옛 행만 있는 날도 롤업 재계산이 실패하지 않고 0 원으로 집계
+    with handle_sql.transaction() as cursor:
+        cursor.execute(
+            "INSERT INTO card (date, time, category, reason, cost, memo) VALUES (%s, %s, %s, %s, %s, %s)",
+            ('2026-01-24', '09:00:00', '식비', '외식', None, '옛 행')
+        )
+    rollup.rebuild()
+    _assert_consistent()
+    stored, _ = _cells()
+    assert stored[('2026-01-24', '식비', '외식')] == (0, 1)
+
+def test_update_and_delete_null_cost_row(db):
+    # 금액이 NULL 인 옛 행도 수정/삭제할 수 있고 롤업은 0 원으로 빠짐
+    with handle_sql.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO card (date, time, category, reason, cost, memo) VALUES (%s, %s, %s, %s, %s, %s)",
+            [('2026-01-24', '09:00:00', '식비', '외식', None, '옛 행'),
+             ('2026-01-24', '10:00:00', '식비', '외식', None, '옛 행 2')]
+        )
+    rollup.rebuild()
+    first, second = _card_ids()
+
+    assert expenses.update_expense('2026-01-24', '09:00:00', '식비', '외식', 8000, '옛 행', expense_id=first) == 1
+    _assert_consistent()
+    assert expenses.delete_expense(expense_id=second) == 1
+    _assert_consistent()
+    stored, _ = _cells()
+    assert stored[('2026-01-24', '식비', '외식')] == (8000, 1)
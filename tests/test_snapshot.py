@@ -0,0 +1,29 @@
+import pandas as pd
+
+import utils.handle_sql as handle_sql
+import utils.ledger_cache as ledger_cache
+import utils.snapshot as snapshot
+
+def test_mapped_with_null_dictionary_values(db, tmp_path):
+    # 메모/분류가 NULL 인 행이 있어도 다른 프로세스(캐시)는 DB 대신 스냅샷 파일을 매핑해야 함
+    with handle_sql.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO card (date, time, category, reason, cost, memo) VALUES (%s, %s, %s, %s, %s, %s)",
+            [('2026-01-21', '19:54:00', '식비', '카페/간식', 4500, None),
+             ('2026-01-22', '08:00:00', None, '택시/호출', 12000, '출근'),
+             ('2026-01-23', '12:00:00', '식비', '외식', 9000, '점심')]
+        )
+    handle_sql.bump_data_version()
+    path = str(tmp_path / 'ledger.arrow')
+
+    writer = ledger_cache.LedgerCache(snapshot_path=path)
+    expected = writer.get().frame
+    writer.wait_published(timeout=30)
+    assert snapshot.read_meta(path)['state'] == snapshot.db_state()
+
+    reader = ledger_cache.LedgerCache(snapshot_path=path)
+    mapped = reader.get().frame
+    stats = reader.stats()
+    assert (stats['mapped'], stats['loads']) == (1, 0)
+    pd.testing.assert_frame_equal(mapped, expected)
+    assert pd.isna(mapped['category'].iloc[1])
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import utils.handle_sql as handle_sql
+
+from conftest import ROOT
+
+def test_iter_frames_chunks(db):
+    with handle_sql.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO card (date, time, category, reason, cost, memo) VALUES (%s, %s, %s, %s, %s, %s)",
+            [('2026-01-01', f"{n % 24:02d}:00:00", '식비', '외식', n, f"메모{n}") for n in range(1, 1001)]
+        )
+    sizes, total = [], 0
+    for frame in handle_sql.iter_frames("SELECT id, cost FROM card ORDER BY id", chunk_size=300):
+        sizes.append(len(frame))
+        total += int(frame['cost'].sum())
+    assert sizes == [300, 300, 300, 100]
+    assert total == sum(range(1, 1001))
+
+def test_stream_memory_bound():
+    """
+    200만 행 합성 원장을 청크 단위로 집계하는 동안 최대 RSS 가 상한 안인지
+    (한 번에 읽으면 1 GiB 를 넘으므로, 결과를 통째로 올리면 실패한다)
+
+    최대 RSS 는 프로세스 단위 값이라 다른 테스트의 영향을 받지 않도록 새 프로세스에서 잰다.
+    """
+    result = subprocess.run(
+        [sys.executable, '-m', 'utils.bench', 'stream', '--rows', '2000000', '--chunk', '50000', '--max-rss-mb', '400'],
+        cwd=ROOT, env={**os.environ, 'PYTHONPATH': ROOT}, capture_output=True, text=True, timeout=600
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert '상한 이내' in result.stdout
@@ -0,0 +1,692 @@
+import argparse
+import csv
+import os
+import json
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import utils.calendar_view as calendar_view
+import utils.export as export
+import utils.handle_sql as handle_sql
+import utils.importer as importer
+import utils.ledger as ledger
+import utils.reinterpret as reinterpret
+import utils.synth as synth
+
+# 성능 벤치마크 모음
+#
+#   python -m utils.bench reinterpret [--rows 200000] [--repeat 3]
+#   python -m utils.bench ledger [--rows 200000] [--repeat 3]
+#   python -m utils.bench fetch [--repeat 3]     (설정된 DB 의 card 테이블을 읽음, DB_BACKEND 참고)
+#   python -m utils.bench calendar [--rows 20000] [--repeat 3]
+#   python -m utils.bench stream [--rows 3000000] [--chunk 50000] [--max-rss-mb 400]
+#                                                 (임시 SQLite DB, 최대 RSS 가 상한을 넘으면 종료 코드 1)
+#   python -m utils.bench import [--rows 1000000] [--batch-size 20000] [--statement-rows 1000]
+#                                                 (임시 CSV -> 임시 SQLite DB)
+#   python -m utils.bench export [--rows 3000000] [--format parquet] [--max-rss-mb 400]
+#                                                 (임시 SQLite DB -> 임시 파일, 최대 RSS 가 상한을 넘으면 종료 코드 1)
+#   python -m utils.bench snapshot [--rows 1000000] [--readers 3]
+#                                                 (임시 SQLite DB, 별도 프로세스들의 첫 조회: DB vs Arrow 스냅샷)
+#   python -m utils.bench pipeline [--rows 10000 100000 1000000] [--repeat 3] [--seed 0] [--db-dir DIR]
+#                                  [--output data/bench/pipeline.json] [--compare 이전결과.json] [--tolerance 0.25]
+#                                                 (utils.synth 합성 원장 -> SQLite, 페이지별 단계 시간을 JSON 으로,
+#                                                  --compare 결과보다 느려진 단계가 있으면 종료 코드 1)
+
+def _timeit(func, repeat):
+    """func 를 repeat 번 실행해 가장 빠른 시간(초)과 마지막 결과를 반환"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def _random_pairs(rows, seed=0):
+    """규칙에 있는 조합과 없는 조합(중립)을 섞은 (대분류, 소분류) 표본"""
+    rng = np.random.default_rng(seed)
+    pairs = list(reinterpret.MAPPING_RULES) + [("식비", "외식"), ("건강/운동", "병원/약국"), ("기타", "기타")]
+    picks = rng.integers(0, len(pairs), size=rows)
+    return pd.DataFrame({
+        'category': [pairs[i][0] for i in picks],
+        'reason': [pairs[i][1] for i in picks],
+    })
+
+def bench_reinterpret(rows, repeat):
+    """행 단위 df.apply 구현과 코드 표 기반 벡터 구현 비교"""
+    df = _random_pairs(rows)
+    rowwise_s, expected = _timeit(lambda: reinterpret.apply_reinterpretation_rowwise(df), repeat)
+    vector_s, actual = _timeit(lambda: reinterpret.apply_reinterpretation(df), repeat)
+    categorical = df.astype('category')
+    categorical_s, _ = _timeit(lambda: reinterpret.apply_reinterpretation(categorical), repeat)
+
+    if not (expected['재해석'].astype(str) == actual['재해석'].astype(str)).all():
+        raise SystemExit("❌ 벡터 구현 결과가 기존 구현과 다릅니다.")
+
+    print(f"rows={rows:,}")
+    print(f"  df.apply (행 단위)      : {rowwise_s * 1000:10.1f} ms  ({rows / rowwise_s:14,.0f} rows/s)")
+    print(f"  코드 표 (object 입력)   : {vector_s * 1000:10.1f} ms  ({rows / vector_s:14,.0f} rows/s)  x{rowwise_s / vector_s:,.0f}")
+    print(f"  코드 표 (범주형 입력)   : {categorical_s * 1000:10.1f} ms  ({rows / categorical_s:14,.0f} rows/s)  x{rowwise_s / categorical_s:,.0f}")
+
+def _raw_ledger(rows, seed=0):
+    """DB 조회 결과와 같은 모양(object 문자열/timedelta)의 소비 내역 표본"""
+    rng = np.random.default_rng(seed)
+    df = _random_pairs(rows, seed)
+    df.insert(0, 'id', np.arange(1, rows + 1))
+    df.insert(1, 'date', (pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 730, rows), unit='D')).date)
+    df.insert(2, 'time', pd.to_timedelta(rng.integers(0, 86400, rows), unit='s'))
+    df['cost'] = rng.integers(1, 200, rows) * 100
+    df['memo'] = np.array([f"가맹점{i}" for i in range(500)], dtype=object)[rng.integers(0, 500, rows)]
+    return df
+
+def bench_ledger(rows, repeat):
+    """DB 원본 모양 프레임 vs Ledger 의 메모리와 월 × 재해석 집계 시간 비교"""
+    raw = _raw_ledger(rows)
+    convert_s, typed = _timeit(lambda: ledger.Ledger.from_frame(raw), repeat)
+
+    def raw_groupby():
+        labeled = reinterpret.apply_reinterpretation(raw)
+        month = pd.to_datetime(labeled['date']).dt.strftime('%Y-%m')
+        return labeled.groupby([month, '재해석'], observed=True)['cost'].sum()
+
+    raw_s, _ = _timeit(raw_groupby, repeat)
+    typed_s, _ = _timeit(
+        lambda: typed.frame.groupby(['month', 'reinterpretation'], observed=True)['cost'].sum(), repeat
+    )
+    raw_bytes = int(raw.memory_usage(deep=True).sum())
+    typed_bytes = typed.memory_usage()
+
+    print(f"rows={rows:,}")
+    print(f"  메모리  원본(object)  : {raw_bytes / 2**20:8.1f} MiB  ({raw_bytes / rows:6.0f} B/row)")
+    print(f"  메모리  Ledger        : {typed_bytes / 2**20:8.1f} MiB  ({typed_bytes / rows:6.0f} B/row)  x{raw_bytes / typed_bytes:.1f} 절감")
+    print(f"  변환    원본 -> Ledger: {convert_s * 1000:8.1f} ms")
+    print(f"  월×재해석 집계 원본   : {raw_s * 1000:8.1f} ms")
+    print(f"  월×재해석 집계 Ledger : {typed_s * 1000:8.1f} ms  x{raw_s / typed_s:,.0f}")
+
+FETCH_QUERIES = {
+    'ledger': "SELECT id, date, time, category, reason, cost, memo FROM card",
+    'daily_sum': "SELECT date, SUM(cost) AS total FROM card GROUP BY date",
+}
+
+def _read_sql(SQL):
+    """기존 get_data 경로 (pd.read_sql + DBAPI 연결)"""
+    backend = handle_sql.get_backend()
+    with backend.connection() as conn:
+        return pd.read_sql(backend.dialect.translate(SQL), conn)
+
+def bench_fetch(repeat):
+    """pd.read_sql vs Arrow 조회(get_frame) 의 rows/s 와 합계 시간 비교"""
+    for name, query in FETCH_QUERIES.items():
+        read_sql_s, legacy = _timeit(lambda: _read_sql(query), repeat)
+        frame_s, typed = _timeit(lambda: handle_sql.get_frame(query), repeat)
+        arrow_s, _ = _timeit(lambda: handle_sql.get_frame(query, arrow_dtypes=True), repeat)
+        value = 'cost' if 'cost' in typed else 'total'
+        if 'cost' in typed:
+            # 페이지가 실제로 쓰는 형태(Ledger)까지 만드는 시간
+            legacy_ledger_s, _ = _timeit(lambda: ledger.Ledger.from_frame(_read_sql(query)), repeat)
+            typed_ledger_s, _ = _timeit(lambda: ledger.Ledger.from_frame(handle_sql.get_frame(query)), repeat)
+        legacy_sum_s, _ = _timeit(lambda: legacy[value].sum(), repeat)
+        typed_sum_s, _ = _timeit(lambda: typed[value].sum(), repeat)
+
+        rows = max(len(typed), 1)
+        print(f"[{name}] rows={len(typed):,}")
+        print(f"  pd.read_sql             : {read_sql_s * 1000:9.1f} ms  ({rows / read_sql_s:12,.0f} rows/s)  {value}={legacy[value].dtype}")
+        print(f"  get_frame (NumPy)       : {frame_s * 1000:9.1f} ms  ({rows / frame_s:12,.0f} rows/s)  {value}={typed[value].dtype}")
+        print(f"  get_frame (ArrowDtype)  : {arrow_s * 1000:9.1f} ms  ({rows / arrow_s:12,.0f} rows/s)")
+        print(f"  {value}.sum() 원본 / 고정 : {legacy_sum_s * 1000:9.3f} ms / {typed_sum_s * 1000:.3f} ms")
+        if 'cost' in typed:
+            print(f"  pd.read_sql -> Ledger   : {legacy_ledger_s * 1000:9.1f} ms  ({rows / legacy_ledger_s:12,.0f} rows/s)")
+            print(f"  get_frame -> Ledger     : {typed_ledger_s * 1000:9.1f} ms  ({rows / typed_ledger_s:12,.0f} rows/s)")
+
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MiB, Linux 의 ru_maxrss 는 KiB 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != 'darwin' else peak / 2**20
+
+def _build_synthetic_sqlite(path, rows):
+    """SQLite 안에서 바로 rows 행짜리 card 테이블을 생성 (파이썬 메모리를 거치지 않음)"""
+    pairs = list(reinterpret.MAPPING_RULES) + [("식비", "외식"), ("건강/운동", "병원/약국")]
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript("""
+            CREATE TABLE card (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT, time TEXT, category TEXT, reason TEXT, cost INTEGER, memo TEXT
+            );
+            CREATE TEMP TABLE pairs (i INTEGER PRIMARY KEY, category TEXT, reason TEXT);
+        """)
+        conn.executemany("INSERT INTO pairs VALUES (?, ?, ?)", [(i, c, r) for i, (c, r) in enumerate(pairs)])
+        conn.execute(
+            """
+            WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n + 1 < ?)
+            INSERT INTO card (date, time, category, reason, cost, memo)
+            SELECT date('2020-01-01', '+' || (n % 2190) || ' days'),
+                   printf('%02d:%02d:00', (n * 7) % 24, (n * 13) % 60),
+                   p.category, p.reason, ((n * 37) % 500 + 1) * 100, '가맹점' || (n % 500)
+            FROM seq JOIN pairs p ON p.i = n % ?
+            """,
+            (rows, len(pairs))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def bench_stream(rows, chunk, max_rss_mb):
+    """
+    수백만 행 합성 원장을 iter_frames 로 청크 단위 집계하면서 최대 RSS 가 상한 안인지 확인
+    (월 × 재해석 합계를 청크마다 누적)
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'stream.db')
+        started = time.perf_counter()
+        _build_synthetic_sqlite(path, rows)
+        build_s = time.perf_counter() - started
+
+        # handle_sql 설정은 처음 쓸 때 읽히므로 그 전에 임시 DB 를 가리키게 함
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = path
+        baseline_mb = _peak_rss_mb()
+
+        started = time.perf_counter()
+        totals, seen = None, 0
+        for frame in handle_sql.iter_frames("SELECT date, category, reason, cost FROM card", chunk_size=chunk):
+            labels = reinterpret.reinterpret(frame['category'], frame['reason'])
+            part = frame.groupby([frame['date'].dt.to_period('M'), labels], observed=True)['cost'].sum()
+            totals = part if totals is None else totals.add(part, fill_value=0)
+            seen += len(frame)
+        stream_s = time.perf_counter() - started
+        peak_mb = _peak_rss_mb()
+
+    print(f"rows={seen:,}  chunk={chunk:,}")
+    print(f"  합성 DB 생성          : {build_s:8.1f} s")
+    print(f"  스트리밍 집계         : {stream_s:8.1f} s  ({seen / stream_s:12,.0f} rows/s)  결과 {len(totals):,}칸")
+    print(f"  최대 RSS              : {peak_mb:8.1f} MiB  (집계 전 {baseline_mb:.1f} MiB, 상한 {max_rss_mb} MiB)")
+    if seen != rows or int(totals.sum()) <= 0:
+        raise SystemExit("❌ 집계 결과가 올바르지 않습니다.")
+    if peak_mb > max_rss_mb:
+        raise SystemExit(f"❌ 최대 RSS {peak_mb:.1f} MiB 가 상한 {max_rss_mb} MiB 를 넘었습니다.")
+    print("  ✅ 상한 이내")
+
+def bench_export(rows, fmt, chunk, max_rss_mb):
+    """수백만 행 합성 원장을 utils.export 로 파일에 쓰면서 최대 RSS 가 상한 안인지 확인"""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'export.db')
+        started = time.perf_counter()
+        _build_synthetic_sqlite(path, rows)
+        # 실제 DB 처럼 (date, time) 인덱스 순서로 읽게 함 (ORDER BY 를 위한 정렬이 생기지 않도록)
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE INDEX idx_card_date_time ON card (date, time)")
+        build_s = time.perf_counter() - started
+
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = path
+        baseline_mb = _peak_rss_mb()
+        out_path = os.path.join(workdir, f"ledger.{'parquet' if fmt == 'parquet' else 'csv'}")
+        report = export.export(out_path, chunk_size=chunk, log=None)
+        peak_mb = _peak_rss_mb()
+
+    print(f"rows={report['rows']:,}  format={fmt}  chunk={chunk:,}")
+    print(f"  합성 DB 생성          : {build_s:8.1f} s")
+    print(f"  내보내기              : {report['seconds']:8.1f} s  ({report['rows_per_sec']:12,.0f} rows/s)  {report['bytes'] / 2**20:,.1f} MiB")
+    print(f"  최대 RSS              : {peak_mb:8.1f} MiB  (내보내기 전 {baseline_mb:.1f} MiB, 상한 {max_rss_mb} MiB)")
+    if report['rows'] != rows:
+        raise SystemExit("❌ 내보낸 행 수가 올바르지 않습니다.")
+    if peak_mb > max_rss_mb:
+        raise SystemExit(f"❌ 최대 RSS {peak_mb:.1f} MiB 가 상한 {max_rss_mb} MiB 를 넘었습니다.")
+    print("  ✅ 상한 이내")
+
+# 새 프로세스에서 소비 내역을 처음 읽는 시간과 메모리 (bench_snapshot 이 프로세스마다 실행)
+_COLD_START = """
+import json, time
+started = time.perf_counter()
+import utils.ledger_cache as ledger_cache
+imported = time.perf_counter()
+frame = ledger_cache.get_ledger().frame
+loaded = time.perf_counter()
+total = int(frame.groupby('month')['cost'].sum().sum())   # 모든 페이지를 실제로 건드림
+ledger_cache.wait_snapshot()
+status = dict(line.split(':', 1) for line in open('/proc/self/status') if line.startswith(('RssAnon', 'RssFile')))
+print(json.dumps({
+    'import_ms': (imported - started) * 1000, 'load_ms': (loaded - imported) * 1000, 'rows': len(frame),
+    'total': total, 'stats': {k: v for k, v in ledger_cache.get_cache_stats().items() if k in ('loads', 'mapped')},
+    'anon_mb': int(status['RssAnon'].split()[0]) / 1024, 'file_mb': int(status['RssFile'].split()[0]) / 1024,
+}))
+"""
+
+def bench_snapshot(rows, readers):
+    """
+    여러 Streamlit 프로세스를 흉내 냄: 첫 프로세스는 DB 에서 읽고 스냅샷 파일을 쓰며,
+    이후 프로세스는 파일을 memory-map 한다. 프로세스마다 첫 조회 시간과 RssAnon(자기 메모리) /
+    RssFile(공유되는 파일 페이지) 를 비교한다. (Linux 전용)
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'snapshot.db')
+        started = time.perf_counter()
+        _build_synthetic_sqlite(path, rows)
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = path
+        handle_sql.init_database()
+        build_s = time.perf_counter() - started
+
+        env = dict(
+            os.environ, LEDGER_SNAPSHOT_PATH=os.path.join(workdir, 'ledger.arrow'),
+            PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')]))
+        )
+        results = []
+        for n in range(1 + readers):
+            out = subprocess.run([sys.executable, '-c', _COLD_START], env=env, capture_output=True, text=True, check=True)
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        snapshot_mb = os.path.getsize(env['LEDGER_SNAPSHOT_PATH']) / 2**20
+
+    print(f"rows={rows:,}  스냅샷 파일 {snapshot_mb:,.1f} MiB  (합성 DB 생성 + 마이그레이션 {build_s:.1f} s)")
+    for n, result in enumerate(results):
+        source = 'DB 전체 조회 + 파일 쓰기' if result['stats']['loads'] else 'Arrow 스냅샷 매핑'
+        print(
+            f"  프로세스 {n + 1}: {source:<22} 첫 조회 {result['load_ms']:9.1f} ms  "
+            f"RssAnon {result['anon_mb']:7.1f} MiB  RssFile {result['file_mb']:7.1f} MiB"
+        )
+    if any(result['rows'] != rows or result['total'] != results[0]['total'] for result in results):
+        raise SystemExit("❌ 프로세스마다 읽은 내역이 다릅니다.")
+    if any(not result['stats']['mapped'] for result in results[1:]):
+        raise SystemExit("❌ 두 번째 프로세스부터 스냅샷 파일을 쓰지 않았습니다.")
+
+def _write_synthetic_csv(path, rows):
+    """example_data.csv 형식(한글 헤더, BOM, 'HH:MM' 시간, 날짜순)의 합성 CSV 를 씀"""
+    pairs = list(reinterpret.MAPPING_RULES) + [("식비", "외식"), ("건강/운동", "병원/약국")]
+    days = pd.date_range('2020-01-01', periods=2190).strftime('%Y-%m-%d').tolist()
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write("날짜,시간,카테고리(1차 카테고리),사유(2차 카테고리),비용,메모\n")
+        for n in range(rows):
+            category, reason = pairs[n % len(pairs)]
+            f.write(f"{days[n * len(days) // rows]},{(n * 7) % 24:02d}:{(n * 13) % 60:02d},{category},{reason},{((n * 37) % 500 + 1) * 100},가맹점{n % 500}\n")
+
+def bench_import(rows, batch_size, statement_rows):
+    """CSV 가져오기: 파일 전체를 executemany 한 번으로 넣던 방식 vs utils.importer (청크 트랜잭션 + 다중 행 INSERT)"""
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, 'ledger.csv')
+        _write_synthetic_csv(csv_path, rows)
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_SQLITE_PATH'] = os.path.join(workdir, 'import.db')
+        handle_sql.init_database()
+
+        def legacy():
+            with open(csv_path, encoding='utf-8-sig', newline='') as f:
+                data = [
+                    (row['날짜'], row['시간'] + ':00', row['카테고리(1차 카테고리)'], row['사유(2차 카테고리)'], int(row['비용']), row['메모'])
+                    for row in csv.DictReader(f)
+                ]
+            return handle_sql.execute_many(
+                "INSERT INTO card (date, time, category, reason, cost, memo) VALUES (%s, %s, %s, %s, %s, %s)", data
+            )
+
+        legacy_s, legacy_rows = _timeit(legacy, 1)
+        legacy_peak_mb = _peak_rss_mb()
+        report = importer.import_file(csv_path, batch_size=batch_size, statement_rows=statement_rows, restart=True, log=None)
+        count = int(handle_sql.get_data("SELECT COUNT(*) AS n FROM card")['n'].iloc[0])
+        rollup_cnt = int(handle_sql.get_data("SELECT SUM(cnt) AS n FROM card_daily_rollup")['n'].iloc[0])
+
+    print(f"rows={rows:,}  batch={batch_size:,}  statement={statement_rows:,}")
+    print(f"  executemany 한 번 (롤업 없음) : {legacy_s:7.2f} s  ({legacy_rows / legacy_s:12,.0f} rows/s)  최대 RSS {legacy_peak_mb:.0f} MiB")
+    print(f"  importer (롤업 포함)          : {report['seconds']:7.2f} s  ({report['rows_per_sec']:12,.0f} rows/s)")
+    if count != rows * 2 or rollup_cnt != rows or report['inserted'] != rows:
+        raise SystemExit("❌ 가져온 행 수가 올바르지 않습니다.")
+
+def _legacy_daily_stats(df):
+    """기존 "2-소비 기록" 의 행 단위 daily_stats 루프 (비교용)"""
+    daily_stats = {}
+    for row in df.to_dict('records'):
+        event_date = row['date'].strftime('%Y-%m-%d')
+        daily_stats.setdefault(event_date, {'total': 0, 'items': []})
+        daily_stats[event_date]['total'] += row['cost']
+        total_seconds = int(row['seconds'])
+        daily_stats[event_date]['items'].append({
+            'category': row['category'], 'reason': row['reason'], 'cost': row['cost'],
+            'time': f"{total_seconds // 3600:02d}:{total_seconds % 3600 // 60:02d}",
+            'memo': row['memo'], 'original_date': event_date,
+            'original_time': f"{total_seconds // 3600:02d}:{total_seconds % 3600 // 60:02d}:{total_seconds % 60:02d}",
+        })
+    events = [{"title": f"{stats['total']:,}원", "start": day} for day, stats in daily_stats.items()]
+    return daily_stats, events
+
+def bench_calendar(rows, repeat):
+    """한 달 rows 건일 때 캘린더 화면 구성 시간: 행 단위 루프 vs MonthView (+선택한 하루 항목)"""
+    raw = _raw_ledger(rows)
+    raw['date'] = (pd.Timestamp('2026-01-01') + pd.to_timedelta(np.arange(rows) % 31, unit='D')).date
+    frame = ledger.Ledger.from_frame(raw).frame
+    legacy_s, (legacy, _) = _timeit(lambda: _legacy_daily_stats(frame), repeat)
+
+    def columnar():
+        view = calendar_view.MonthView.from_frame(frame)
+        return view, view.items('2026-01-15')
+
+    columnar_s, (view, items) = _timeit(columnar, repeat)
+    if view.total != sum(stats['total'] for stats in legacy.values()) or len(items) != len(legacy['2026-01-15']['items']):
+        raise SystemExit("❌ MonthView 결과가 기존 구현과 다릅니다.")
+
+    print(f"rows={rows:,} (한 달)")
+    print(f"  행 단위 루프          : {legacy_s * 1000:9.1f} ms")
+    print(f"  MonthView + 하루 항목 : {columnar_s * 1000:9.1f} ms  x{legacy_s / columnar_s:,.0f}")
+
+# ==========================================
+# 페이지별 파이프라인 단계 (pipeline)
+# ==========================================
+# 크기마다 별도 프로세스에서 합성 원장 DB 를 만들고(handle_sql 설정은 프로세스당 한 번 정해지므로)
+# 각 페이지가 재실행마다 거치는 단계를 따로 잰다. DB 를 읽는 단계는 매 반복 전에 캐시를 비운다.
+# 결과는 (rows, page, stage) 단위의 평평한 목록이라 두 결과 파일을 그대로 비교할 수 있다.
+
+PIPELINE_SIZES = (10_000, 100_000, 1_000_000)
+PIPELINE_OUTPUT = os.path.join('data', 'bench', 'pipeline.json')
+PIPELINE_TOLERANCE = 0.25
+# 이보다 짧은 단계는 잡음이 커서 비교에서 느려짐으로 보지 않음
+PIPELINE_MIN_DELTA_MS = 1.0
+
+_PIPELINE_CHILD = """
+import json, sys
+import utils.bench as bench
+print(json.dumps(bench._pipeline_run(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), sys.argv[4])))
+"""
+
+def _pipeline_build(path, rows, seed):
+    """합성 원장 CSV 를 만들어 utils.importer 로 path(SQLite)에 가져옴 (지문/롤업/인덱스까지 실제와 같게)"""
+    csv_path = f"{path}.csv"
+    try:
+        synth.write_csv(csv_path, rows, seed=seed, log=None)
+        handle_sql.init_database()
+        return importer.import_file(csv_path, restart=True, log=None)
+    finally:
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+
+def _stage_times(func, repeat, before=None):
+    """func 를 repeat 번 실행한 시간 목록(초)과 마지막 결과 (before 는 매번 시간 밖에서 먼저 실행)"""
+    times, result = [], None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return times, result
+
+def _report_aggregation(summary):
+    """"지금까지의 나" 월별 리포트(가장 최근 월)와 낭비/총 소비 상관관계 (페이지와 같은 식)"""
+    selected = summary['month'].max()
+    month_summary = summary[summary['month'] == selected]
+    cost_by_type = month_summary.groupby("재해석", observed=True)["비용"].sum()
+    top5 = month_summary.groupby("대분류", observed=True)["비용"].sum().sort_values(ascending=False).head(5)
+    monthly = (
+        summary.assign(waste=summary["비용"].where(summary["재해석"].isin(reinterpret.WASTE_LABELS), 0))
+        .groupby("month")
+        .agg(total=("비용", "sum"), waste=("waste", "sum"))
+        .reset_index()
+        .astype({"month": str})
+    )
+    return cost_by_type, top5, monthly['waste'].corr(monthly['total'])
+
+def _heatmap_pivot(df, selected_types=("충동", "게으름", "호흡", "성장")):
+    """"지금까지의 나" 히트맵 (페이지와 같은 식)"""
+    target = df[df["재해석"].isin(list(selected_types))]
+    heatmap_data = target.groupby(["weekday", "hour"])["비용"].sum().reset_index()
+    pivot = heatmap_data.pivot_table(index="weekday", columns="hour", values="비용", fill_value=0).reindex(range(7))
+    pivot.index = ledger.WEEKDAY_LABELS
+    return pivot
+
+def _forecast_aggregation(df):
+    """"앞으로의 나" 공통 계산 (페이지와 같은 식, 이번 달 대신 가장 최근 월)"""
+    monthly = df.groupby("month")["cost"].sum().reset_index()
+    avg_monthly = monthly.tail(3)["cost"].mean()
+    category_ratio = df.groupby("category", observed=True)["cost"].sum().sort_values(ascending=False).head(5)
+    latest = df["month"].max()
+    return avg_monthly, category_ratio, df[df["month"] == latest]["cost"].sum()
+
+def _pipeline_run(rows, repeat, seed, path):
+    """
+    (자식 프로세스) path 의 합성 원장 DB 를 만들거나 재사용하고 페이지별 단계 시간을 잼
+
+    Returns:
+        dict: rows, build_s, peak_rss_mb, stages (page, stage, times_ms, input_rows)
+    """
+    import utils.calendar_view as calendar_view_module
+    import utils.ledger_cache as ledger_cache
+    import utils.rollup as rollup
+
+    build_s = 0.0
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        _pipeline_build(path, rows, seed)
+        build_s = time.perf_counter() - started
+    card_rows = int(handle_sql.get_data("SELECT COUNT(*) AS n FROM card")['n'].iloc[0])
+
+    stages = []
+
+    def stage(page, name, func, input_rows, cold=False):
+        times, result = _stage_times(func, repeat, ledger_cache.invalidate if cold else None)
+        stages.append({'page': page, 'stage': name, 'input_rows': int(input_rows), 'times_ms': [t * 1000 for t in times]})
+        return result
+
+    # 지금까지의 나: 공유 캐시(card 전체) -> Ledger -> 월별 리포트 / 히트맵
+    page = "지금까지의 나"
+    query = f"SELECT {', '.join(handle_sql.IncrementalSnapshot.COLUMNS)} FROM card"
+    raw = stage(page, 'load', lambda: handle_sql.get_frame(query), card_rows)
+    frame = stage(page, 'coerce', lambda: ledger.coerce(raw), len(raw))
+    stage(page, 'reinterpret', lambda: reinterpret.reinterpret(frame['category'], frame['reason']), len(frame))
+    stage(page, 'ledger_cache', lambda: ledger_cache.get_ledger(), card_rows, cold=True)
+    summary_rows = stage(page, 'load_rollup', lambda: rollup.get_rollup(), card_rows, cold=True)
+    summary = stage(
+        page, 'coerce_rollup',
+        lambda: ledger.Ledger.from_frame(summary_rows.rename(columns={'day': 'date', 'total_cost': 'cost'})).frame.rename(
+            columns={'date': '날짜', 'category': '대분류', 'reason': '소분류', 'cost': '비용', 'cnt': '건수', 'reinterpretation': '재해석'}
+        ),
+        len(summary_rows)
+    )
+    stage(page, 'monthly_aggregation', lambda: _report_aggregation(summary), len(summary))
+    stage(
+        page, 'monthly_aggregation_rows',
+        lambda: frame.groupby(['month', 'reinterpretation'], observed=True)['cost'].sum(), len(frame)
+    )
+    labeled = frame.rename(columns={'cost': '비용', 'reinterpretation': '재해석'})
+    stage(page, 'heatmap_pivot', lambda: _heatmap_pivot(labeled), len(labeled))
+
+    # 소비 기록: 가장 거래가 많은 달의 캘린더 (롤업 GROUP BY day + 가장 바쁜 날 항목)
+    page = "소비 기록"
+    month_counts = frame['month'].value_counts()
+    busiest = month_counts.index[0]
+    month_frame = frame[frame['month'] == busiest]
+    busiest_day = month_frame['date'].value_counts().index[0].strftime('%Y-%m-%d')
+
+    def calendar_from_db():
+        view = calendar_view_module.load_month_view(busiest.year, busiest.month)
+        return view, view.items(busiest_day)
+
+    def calendar_from_frame():
+        view = calendar_view_module.MonthView.from_frame(month_frame)
+        return view, view.items(busiest_day)
+
+    stage(page, 'calendar_build', calendar_from_db, len(month_frame), cold=True)
+    stage(page, 'calendar_build_memory', calendar_from_frame, len(month_frame))
+
+    # 앞으로의 나: 롤업 -> Ledger -> 공통 계산
+    page = "앞으로의 나"
+    future = ledger.Ledger.from_frame(summary_rows.rename(columns={'day': 'date', 'total_cost': 'cost'})).frame
+    stage(page, 'forecast_aggregation', lambda: _forecast_aggregation(future), len(future))
+
+    # main: 월 요약 (롤업 조건부 집계 쿼리 한 번)
+    stage("main", 'month_summary', lambda: handle_sql.get_month_summary(str(busiest)), card_rows, cold=True)
+
+    return {'rows': card_rows, 'build_s': build_s, 'peak_rss_mb': _peak_rss_mb(), 'stages': stages}
+
+def _git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_pipeline(current, baseline, tolerance=PIPELINE_TOLERANCE):
+    """
+    두 pipeline 결과의 같은 (rows, page, stage) 의 best_ms 비교
+
+    Returns:
+        list[dict]: rows, page, stage, before_ms, after_ms, ratio, regressed
+    """
+    before = {(entry['rows'], entry['page'], entry['stage']): entry for entry in baseline['results']}
+    rows = []
+    for entry in current['results']:
+        old = before.get((entry['rows'], entry['page'], entry['stage']))
+        if old is None:
+            continue
+        ratio = entry['best_ms'] / old['best_ms'] if old['best_ms'] else float('inf')
+        regressed = ratio > 1 + tolerance and entry['best_ms'] - old['best_ms'] > PIPELINE_MIN_DELTA_MS
+        rows.append({
+            'rows': entry['rows'], 'page': entry['page'], 'stage': entry['stage'],
+            'before_ms': old['best_ms'], 'after_ms': entry['best_ms'], 'ratio': ratio, 'regressed': regressed,
+        })
+    return rows
+
+def bench_pipeline(sizes, repeat, seed, db_dir, output, compare, tolerance):
+    """
+    크기별 합성 원장(SQLite)으로 페이지별 단계 시간을 재고 JSON 으로 저장 (--compare 와 비교)
+    """
+    import pyarrow
+
+    results, runs = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        directory = db_dir or workdir
+        os.makedirs(directory, exist_ok=True)
+        for rows in sizes:
+            path = os.path.join(directory, f"synthetic-{rows}-{seed}.db")
+            env = dict(
+                os.environ, DB_BACKEND='sqlite', DB_SQLITE_PATH=path, LEDGER_SNAPSHOT_PATH='', TRACE='0',
+                DB_SLOW_QUERY_LOG='',
+                PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')]))
+            )
+            out = subprocess.run(
+                [sys.executable, '-c', _PIPELINE_CHILD, str(rows), str(repeat), str(seed), path],
+                env=env, capture_output=True, text=True
+            )
+            if out.returncode != 0:
+                raise SystemExit(f"❌ rows={rows:,} 실행 실패:\n{out.stderr[-2000:]}")
+            run = json.loads(out.stdout.strip().splitlines()[-1])
+            runs.append({'rows': rows, 'card_rows': run['rows'], 'build_s': run['build_s'], 'peak_rss_mb': run['peak_rss_mb']})
+            print(f"rows={rows:,} (card {run['rows']:,}행, DB 생성 {run['build_s']:.1f}s, 최대 RSS {run['peak_rss_mb']:.0f} MiB)")
+            for entry in run['stages']:
+                times = sorted(entry['times_ms'])
+                best, median = times[0], times[len(times) // 2]
+                results.append({
+                    'rows': rows, 'page': entry['page'], 'stage': entry['stage'], 'input_rows': entry['input_rows'],
+                    'best_ms': best, 'median_ms': median,
+                    'rows_per_sec': entry['input_rows'] / best * 1000 if best else None,
+                })
+                print(f"  {entry['page']:<8} {entry['stage']:<26} {best:10.2f} ms  (중앙값 {median:.2f} ms, {entry['input_rows']:,}행)")
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'), 'git': _git_revision(),
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'pyarrow': pyarrow.__version__, 'platform': platform.platform(), 'backend': 'sqlite',
+            'seed': seed, 'repeat': repeat,
+        },
+        'runs': runs,
+        'results': results,
+    }
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ {output}")
+
+    if compare:
+        with open(compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        diff = compare_pipeline(report, baseline, tolerance)
+        print(f"비교: {compare} ({baseline['meta'].get('git')} -> {report['meta']['git']}, 허용 +{tolerance:.0%})")
+        for entry in diff:
+            mark = '❌' if entry['regressed'] else '  '
+            print(
+                f"{mark} rows={entry['rows']:<9,} {entry['page']:<8} {entry['stage']:<26} "
+                f"{entry['before_ms']:10.2f} -> {entry['after_ms']:10.2f} ms  x{entry['ratio']:.2f}"
+            )
+        regressed = [entry for entry in diff if entry['regressed']]
+        if regressed:
+            raise SystemExit(f"❌ 느려진 단계 {len(regressed)}개")
+        print("  ✅ 느려진 단계 없음")
+
+def main():
+    parser = argparse.ArgumentParser(description="텅장 훈련소 성능 벤치마크")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_reinterpret = sub.add_parser('reinterpret', help="재해석: df.apply vs 벡터 구현")
+    p_reinterpret.add_argument('--rows', type=int, default=200_000)
+    p_reinterpret.add_argument('--repeat', type=int, default=3)
+
+    p_ledger = sub.add_parser('ledger', help="Ledger: 메모리/집계 시간 비교")
+    p_ledger.add_argument('--rows', type=int, default=200_000)
+    p_ledger.add_argument('--repeat', type=int, default=3)
+
+    p_fetch = sub.add_parser('fetch', help="조회: pd.read_sql vs Arrow 조회")
+    p_fetch.add_argument('--repeat', type=int, default=3)
+
+    p_calendar = sub.add_parser('calendar', help="캘린더: 행 단위 루프 vs MonthView")
+    p_calendar.add_argument('--rows', type=int, default=20_000)
+    p_calendar.add_argument('--repeat', type=int, default=3)
+
+    p_stream = sub.add_parser('stream', help="스트리밍 조회: 합성 원장을 고정 RSS 상한 안에서 집계")
+    p_stream.add_argument('--rows', type=int, default=3_000_000)
+    p_stream.add_argument('--chunk', type=int, default=50_000)
+    p_stream.add_argument('--max-rss-mb', type=float, default=400)
+
+    p_import = sub.add_parser('import', help="CSV 가져오기: executemany 한 번 vs importer")
+    p_import.add_argument('--rows', type=int, default=1_000_000)
+    p_import.add_argument('--batch-size', type=int, default=importer.BATCH_SIZE)
+    p_import.add_argument('--statement-rows', type=int, default=importer.STATEMENT_ROWS)
+
+    p_export = sub.add_parser('export', help="내보내기: 합성 원장을 고정 RSS 상한 안에서 CSV / Parquet 로")
+    p_export.add_argument('--rows', type=int, default=3_000_000)
+    p_export.add_argument('--format', choices=export.FORMATS, default='parquet')
+    p_export.add_argument('--chunk', type=int, default=50_000)
+    p_export.add_argument('--max-rss-mb', type=float, default=400)
+
+    p_snapshot = sub.add_parser('snapshot', help="스냅샷: 새 프로세스의 첫 조회를 DB vs Arrow 매핑으로")
+    p_snapshot.add_argument('--rows', type=int, default=1_000_000)
+    p_snapshot.add_argument('--readers', type=int, default=3)
+
+    p_pipeline = sub.add_parser('pipeline', help="페이지별 단계 시간: 합성 원장 크기별, JSON 저장/비교")
+    p_pipeline.add_argument('--rows', type=int, nargs='+', default=list(PIPELINE_SIZES))
+    p_pipeline.add_argument('--repeat', type=int, default=3)
+    p_pipeline.add_argument('--seed', type=int, default=0)
+    p_pipeline.add_argument('--db-dir', help="합성 DB 를 보관/재사용할 폴더 (기본값: 임시 폴더)")
+    p_pipeline.add_argument('--output', default=PIPELINE_OUTPUT)
+    p_pipeline.add_argument('--compare', help="비교할 이전 결과 JSON")
+    p_pipeline.add_argument('--tolerance', type=float, default=PIPELINE_TOLERANCE, help="허용 비율 (0.25 = 25%% 느려짐까지)")
+
+    args = parser.parse_args()
+    if args.command == 'reinterpret':
+        bench_reinterpret(args.rows, args.repeat)
+    elif args.command == 'ledger':
+        bench_ledger(args.rows, args.repeat)
+    elif args.command == 'fetch':
+        bench_fetch(args.repeat)
+    elif args.command == 'calendar':
+        bench_calendar(args.rows, args.repeat)
+    elif args.command == 'stream':
+        bench_stream(args.rows, args.chunk, args.max_rss_mb)
+    elif args.command == 'import':
+        bench_import(args.rows, args.batch_size, args.statement_rows)
+    elif args.command == 'export':
+        bench_export(args.rows, args.format, args.chunk, args.max_rss_mb)
+    elif args.command == 'snapshot':
+        bench_snapshot(args.rows, args.readers)
+    elif args.command == 'pipeline':
+        bench_pipeline(args.rows, args.repeat, args.seed, args.db_dir, args.output, args.compare, args.tolerance)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import utils.env as env
+import utils.handle_sql as handle_sql
+import utils.ledger as ledger
+import utils.ledger_cache as ledger_cache
+import utils.rollup as rollup
+import utils.snapshot as snapshot
+
+# "2-소비 기록" 페이지의 월 캘린더 데이터.
+# 캘린더에는 하루에 숫자 하나만 필요하므로 일별 합계는 롤업 테이블에서 GROUP BY day 로 받고,
+# 날짜별 항목 목록은 사용자가 고른 날짜에 대해서만 card 에서 조회한다.
+# 두 쿼리 모두 ledger_cache.cached_query 로 (월/날짜, 데이터 버전) 단위로 캐시된다.
+# 월 화면(MonthView)은 MonthPrefetcher 가 작은 LRU 에 보관하고, 한 달을 보여 줄 때
+# 앞뒤 달을 백그라운드에서 미리 만들어 두어 ◀/▶ 이동이 대부분 메모리에서 끝나게 한다.
+# 데이터 버전은 이 프로세스의 쓰기만 반영하므로, 화면을 만든 지 LEDGER_CACHE_TTL 초가 지나면
+# DB 상태 토큰(utils/snapshot.py db_state)을 다시 확인해 다른 프로세스의 쓰기도 반영한다.
+
+MONTH_CACHE_SIZE = int(env.get('MONTH_CACHE_SIZE', 6))
+
+# 한 달 일별 합계 (파라미터: 월 첫날, 다음 달 첫날)
+MONTH_DAILY_SQL = f"""
+    SELECT day, SUM(total_cost) AS total, SUM(cnt) AS cnt
+    FROM {rollup.ROLLUP_TABLE}
+    WHERE day >= %s AND day < %s
+    GROUP BY day
+    HAVING SUM(cnt) > 0
+    ORDER BY day
+"""
+
+# 한 날짜의 항목 (파라미터: 날짜)
+DAY_ITEMS_SQL = """
+    SELECT id, date, time, category, reason, cost, memo
+    FROM card
+    WHERE date = %s
+    ORDER BY time
+"""
+
+EVENT_STYLE = {
+    "allDay": True,
+    "backgroundColor": "transparent",
+    "borderColor": "transparent",
+    "textColor": "#dc3545",
+}
+
+def format_times(seconds):
+    """
+    하루 중 초 배열을 ('HH:MM', 'HH:MM:SS') 문자열 Series 두 개로 변환
+
+    Args:
+        seconds (pd.Series): int 초 값
+
+    Returns:
+        tuple[pd.Series, pd.Series]: 화면 표시용 'HH:MM', DB 조회용 'HH:MM:SS'
+    """
+    seconds = seconds.astype('int64')
+    hours = (seconds // 3600).astype(str).str.zfill(2)
+    minutes = (seconds % 3600 // 60).astype(str).str.zfill(2)
+    secs = (seconds % 60).astype(str).str.zfill(2)
+    short = hours + ':' + minutes
+    return short, short + ':' + secs
+
+class MonthView:
+    """
+    한 달 캘린더 화면에 필요한 값 묶음
+
+    Attributes:
+        daily (pd.DataFrame): day ('YYYY-MM-DD'), total, count 컬럼 (날짜 오름차순)
+        total (int): 월 총 소비
+        events (list[dict]): streamlit_calendar 에 넘길 일별 합계 이벤트
+    """
+
+    def __init__(self, daily, load_day):
+        """
+        Args:
+            daily (pd.DataFrame): day (날짜), total, cnt 컬럼의 일별 합계
+            load_day (callable): 'YYYY-MM-DD' -> 그날의 Ledger 프레임
+        """
+        self._load_day = load_day
+        self._items = {}      # 날짜 -> items() 결과 (화면과 함께 만료됨, clear_items)
+        if daily.empty:
+            self.daily = pd.DataFrame({'day': [], 'total': [], 'count': []})
+        else:
+            daily = daily.sort_values('day')
+            self.daily = pd.DataFrame({
+                'day': pd.to_datetime(daily['day']).dt.strftime('%Y-%m-%d').to_numpy(),
+                'total': daily['total'].astype('int64').to_numpy(),
+                'count': daily['cnt'].astype('int64').to_numpy(),
+            })
+        self.total = int(self.daily['total'].sum())
+        self._totals = dict(zip(self.daily['day'], self.daily['total'].astype('int64').tolist()))
+        self.events = [
+            {"title": f"{total:,}원", "start": day, **EVENT_STYLE}
+            for day, total in self._totals.items()
+        ]
+
+    @classmethod
+    def from_frame(cls, frame):
+        """이미 메모리에 있는 한 달치 Ledger 프레임으로 만듦 (groupby 한 번)"""
+        if frame.empty:
+            return cls(pd.DataFrame(), lambda day: frame)
+        grouped = frame.groupby('date', sort=True)['cost'].agg(['sum', 'size'])
+        daily = pd.DataFrame({'day': grouped.index, 'total': grouped['sum'].to_numpy(), 'cnt': grouped['size'].to_numpy()})
+        return cls(daily, lambda day: frame[frame['date'] == pd.Timestamp(day)])
+
+    @property
+    def days(self):
+        """소비가 있는 날 수"""
+        return len(self._totals)
+
+    def __contains__(self, day):
+        return day in self._totals
+
+    def day_total(self, day):
+        return self._totals.get(day, 0)
+
+    def items(self, day):
+        """
+        한 날짜의 소비 항목 목록 (선택한 날짜에 대해서만 호출, 같은 날짜는 두 번째부터 메모리에서)
+
+        Args:
+            day (str): 'YYYY-MM-DD'
+
+        Returns:
+            list[dict]: id (card.id), category, reason, cost, time, memo, original_date, original_time (시간순)
+        """
+        if day not in self._totals:
+            return []
+        items = self._items.get(day)
+        if items is None:
+            items = self._items[day] = self._build_items(day)
+        return items
+
+    def clear_items(self):
+        """날짜별 항목 메모를 비움 (화면이 캐시에서 만료될 때)"""
+        self._items.clear()
+
+    def _build_items(self, day):
+        rows = self._load_day(day)
+        if rows.empty:
+            return []
+        rows = rows.sort_values('seconds', kind='stable')
+        time_str, original_time = format_times(rows['seconds'])
+        items = pd.DataFrame({
+            'id': rows['id'].to_numpy(),
+            'category': rows['category'].astype(str).to_numpy(),
+            'reason': rows['reason'].astype(str).to_numpy(),
+            'cost': rows['cost'].to_numpy(),
+            'time': time_str.to_numpy(),
+            'memo': rows['memo'].astype(str).to_numpy(),
+            'original_date': day,
+            'original_time': original_time.to_numpy(),
+        })
+        return items.to_dict('records')
+
+def month_range(year, month):
+    """
+    Returns:
+        tuple[str, str]: (월 첫날, 다음 달 첫날) 'YYYY-MM-DD'
+    """
+    start = f"{year}-{month:02d}-01"
+    end = f"{year + month // 12}-{month % 12 + 1:02d}-01"
+    return start, end
+
+def load_day(day):
+    """
+    한 날짜의 소비 내역 (날짜 + 데이터 버전 기준 캐시)
+
+    Args:
+        day (str): 'YYYY-MM-DD'
+
+    Returns:
+        pd.DataFrame: 그날의 Ledger 프레임
+    """
+    df = ledger_cache.cached_query(DAY_ITEMS_SQL, (day,))
+    return ledger.Ledger.from_frame(df).frame
+
+def shift_month(year, month, amount):
+    """
+    Returns:
+        tuple[int, int]: (year, month) 에서 amount 달 이동한 (연도, 월)
+    """
+    index = year * 12 + (month - 1) + amount
+    return index // 12, index % 12 + 1
+
+def current_state():
+    """
+    DB 상태 토큰 (월 화면 캐시 재검증용)
+
+    Returns:
+        str | None: snapshot.db_state(), 조회할 수 없으면 None (그 화면은 TTL 이 지나면 새로 만듦)
+    """
+    try:
+        return snapshot.db_state()
+    except Exception as e:
+        print(f"DB 상태 토큰을 조회하지 못했습니다: {e}")
+        return None
+
+def load_month_view(year, month):
+    """
+    캘린더 한 달 화면 데이터를 DB(또는 쿼리 캐시)에서 만듦
+
+    일별 합계는 롤업 테이블에서 GROUP BY day 로 받으므로 전송/변환량이 거래 수가 아니라
+    날짜 수(최대 31행)에 비례한다.
+
+    Args:
+        year (int): 연도
+        month (int): 월
+
+    Returns:
+        MonthView
+    """
+    rollup.require_schema()
+    start, end = month_range(year, month)
+    daily = ledger_cache.cached_query(MONTH_DAILY_SQL, (start, end))
+    return MonthView(daily, load_day)
+
+class MonthPrefetcher:
+    """
+    (연, 월, 데이터 버전) -> MonthView 를 보관하는 크기 제한 LRU + 앞뒤 달 백그라운드 프리페치
+
+    get() 으로 M 월을 요청하면 M-1, M+1 을 워커 스레드에서 미리 만든다.
+    사용자가 더 멀리 이동하면 아직 시작하지 않은 프리페치는 취소하고,
+    이미 실행 중인 것은 끝나더라도 새 화면의 이웃 달이 아니면 캐시에 넣지 않는다.
+    화면마다 만들 때의 DB 상태 토큰을 함께 두고, ttl 초가 지난 화면은 토큰을 다시 조회해
+    그대로면 계속 쓰고 바뀌었으면(다른 프로세스의 쓰기) 데이터 버전을 올리고 모두 버린다.
+    """
+
+    def __init__(self, maxsize=MONTH_CACHE_SIZE, loader=load_month_view, radius=1,
+                 ttl=ledger_cache.LEDGER_CACHE_TTL, state=current_state):
+        self.maxsize = maxsize
+        self.radius = radius
+        self.ttl = ttl
+        self._loader = loader
+        self._state = state
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # (year, month, version) -> [MonthView, 상태 토큰, 확인 시각]
+        self._pending = {}              # (year, month, version) -> Future
+        self._wanted = set()
+        self._executor = None
+        self._stats = {
+            'hits': 0, 'misses': 0, 'prefetched': 0, 'prefetch_hits': 0, 'cancelled': 0, 'discarded': 0,
+            'revalidated': 0, 'expired': 0,
+        }
+        self._prefetched_keys = set()
+        self._seen_state = None         # 마지막으로 조회한 DB 상태 토큰
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='month-prefetch')
+        return self._executor
+
+    def _load(self, year, month):
+        """(화면, 만들기 전에 조회한 상태 토큰). 만드는 중에 쓰기가 있으면 다음 확인에서 토큰이 달라짐"""
+        state = self._state()
+        with self._lock:
+            changed = state is not None and self._seen_state not in (None, state)
+            if state is not None:
+                self._seen_state = state
+        if changed:
+            # 마지막으로 본 뒤 다른 프로세스가 썼으면 쿼리 캐시에 남은 옛 결과로 화면을 만들지 않게 함
+            handle_sql.bump_data_version()
+        return self._loader(year, month), state
+
+    def _store(self, key, view, state):
+        self._entries[key] = [view, state, time.monotonic()]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            old_key, (old_view, _, _) = self._entries.popitem(last=False)
+            old_view.clear_items()
+            self._prefetched_keys.discard(old_key)
+
+    def _revalidate(self, key):
+        """
+        ttl 이 지난 화면의 DB 상태 토큰 확인
+
+        Returns:
+            bool: 계속 써도 되면 True. 아니면 캐시를 모두 비우고 (토큰이 바뀐 경우) 데이터 버전을 올림
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[2] < self.ttl:
+                return entry is not None
+            stored = entry[1]
+        state = self._state()
+        with self._lock:
+            if state is not None and state == stored:
+                entry[2] = time.monotonic()
+                self._stats['revalidated'] += 1
+                return True
+            self._stats['expired'] += 1
+            if state is not None:
+                self._seen_state = state
+        self.clear()
+        if state is not None:
+            # 다른 프로세스가 쓴 것: 같은 데이터 버전을 키로 쓰는 다른 캐시(쿼리 캐시 등)도 새로 읽게 함
+            handle_sql.bump_data_version()
+        return False
+
+    def get(self, year, month, prefetch=True):
+        """
+        한 달 화면 데이터 (캐시에 없거나 만료되었으면 지금 만들고, 앞뒤 달 프리페치를 예약)
+
+        Returns:
+            MonthView
+        """
+        key = (year, month, handle_sql.get_data_version())
+        if not self._revalidate(key):
+            key = (year, month, handle_sql.get_data_version())
+        with self._lock:
+            entry = self._entries.get(key)
+            view = entry[0] if entry is not None else None
+            if view is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                if key in self._prefetched_keys:
+                    self._stats['prefetch_hits'] += 1
+                    self._prefetched_keys.discard(key)
+            pending = None if view is not None else self._pending.get(key)
+
+        if view is None:
+            state = None
+            if pending is not None and not pending.cancel():
+                # 이미 백그라운드에서 만들고 있으면 그 결과를 기다림
+                try:
+                    view, state = pending.result()
+                except Exception:
+                    view = None
+            elif pending is not None:
+                with self._lock:
+                    self._pending.pop(key, None)
+            if view is None:
+                view, state = self._load(year, month)
+            with self._lock:
+                self._stats['misses'] += 1
+                self._store(key, view, state)
+
+        if prefetch:
+            self.prefetch(year, month, key[2])
+        return view
+
+    def prefetch(self, year, month, version=None):
+        """
+        (year, month) 의 앞뒤 radius 달을 백그라운드에서 불러오도록 예약하고
+        더 이상 필요 없는 대기 중 작업은 취소
+        """
+        if version is None:
+            version = handle_sql.get_data_version()
+        wanted = {
+            (*shift_month(year, month, amount), version)
+            for amount in range(-self.radius, self.radius + 1) if amount
+        }
+        with self._lock:
+            self._wanted = wanted
+            for key, future in list(self._pending.items()):
+                if key not in wanted and future.cancel():
+                    self._stats['cancelled'] += 1
+                    del self._pending[key]
+            for key in wanted:
+                if key in self._entries or key in self._pending:
+                    continue
+                self._pending[key] = self._get_executor().submit(self._prefetch_one, key)
+
+    def _prefetch_one(self, key):
+        year, month, version = key
+        try:
+            view, state = self._load(year, month)
+        except Exception as e:
+            print(f"월 프리페치 실패 ({year}-{month:02d}): {e}")
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        with self._lock:
+            self._pending.pop(key, None)
+            if key in self._wanted and version == handle_sql.get_data_version():
+                self._store(key, view, state)
+                self._prefetched_keys.add(key)
+                self._stats['prefetched'] += 1
+            else:
+                self._stats['discarded'] += 1
+        return view, state
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            for view, _, _ in self._entries.values():
+                view.clear_items()
+            self._entries.clear()
+            self._prefetched_keys.clear()
+
+_prefetcher = MonthPrefetcher()
+
+def get_month_view(year, month, prefetch=True):
+    """
+    캘린더 한 달 화면 데이터 (월 + 데이터 버전 기준 LRU, 앞뒤 달은 백그라운드 프리페치)
+
+    Args:
+        year (int): 연도
+        month (int): 월
+        prefetch (bool): 앞뒤 달 프리페치 여부
+
+    Returns:
+        MonthView
+    """
+    return _prefetcher.get(year, month, prefetch)
+
+def get_prefetch_stats():
+    """
+    Returns:
+        dict: hits, misses, prefetched, prefetch_hits, cancelled, discarded, revalidated, expired, size, pending
+    """
+    return _prefetcher.stats()
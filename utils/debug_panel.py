@@ -0,0 +1,141 @@
+import functools
+import os
+
+import pandas as pd
+import streamlit as st
+
+import utils.env as env
+import utils.handle_sql as handle_sql
+import utils.trace as trace
+
+# 페이지 사이드바의 쿼리 계측 패널 (handle_sql 의 쿼리 계측 참고).
+# DEBUG_PANEL=1 일 때만 보인다 (쿼리 원문과 시간, 통계 초기화 버튼이 있으므로 주소 파라미터로는 켜지 않음).
+# 각 페이지 스크립트의 맨 끝에서 render() 를 불러 이번 재실행의 쿼리까지 포함해서 보여 준다.
+#
+# 재실행 trace (utils/trace.py): 페이지 맨 앞에서 begin() 을 부르면 TRACE=1 일 때
+# 이번 재실행 전체를 trace 로 기록하고, render() 가 trace 를 끝내 파일로 내보낸다.
+# @st.fragment 대신 @fragment(이름) 을 쓰면 그 구역만 다시 실행될 때도 trace 가 하나 남는다.
+
+DEBUG_PANEL = env.get('DEBUG_PANEL', '0') == '1'
+
+TOP_QUERIES = 10
+
+def enabled():
+    """패널을 보여 줄지 (DEBUG_PANEL 환경 변수)"""
+    return DEBUG_PANEL
+
+def begin(page):
+    """
+    이번 재실행의 trace 시작 (TRACE=1 일 때, set_page_config 다음에 호출)
+
+    Args:
+        page (str): trace 이름으로 쓸 페이지 이름
+    """
+    trace.start(page)
+
+def _fragment_rerun():
+    """이번 재실행이 fragment 만 다시 실행하는 것인지"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return bool(ctx is not None and ctx.fragment_ids_this_run)
+    except Exception:
+        return False
+
+def fragment(name):
+    """
+    st.fragment + trace
+
+    전체 재실행 중에는 페이지 trace 안의 'fragment.<이름>' span 으로, fragment 만 다시 실행될 때는
+    (begin()/render() 가 불리지 않으므로) 그 부분 재실행을 '<이름>' trace 하나로 기록한다.
+
+    Args:
+        name (str): span / trace 이름 (예: '소비 기록:캘린더')
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _fragment_rerun():
+                with trace.span(f"fragment.{name}"):
+                    return func(*args, **kwargs)
+            started = trace.start(name)
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                # st.rerun 등으로 중단된 부분 재실행
+                if started is not None:
+                    started.status = 'interrupted'
+                raise
+            finally:
+                if started is not None:
+                    trace.finish(started)
+        return st.fragment(wrapper)
+    return decorator
+
+def _trace_frame(spans):
+    return pd.DataFrame({
+        '구간': [entry['name'] for entry in spans],
+        '호출': [entry['calls'] for entry in spans],
+        '누적(ms)': [round(entry['total_ms'], 1) for entry in spans],
+        '최대(ms)': [round(entry['max_ms'], 1) for entry in spans],
+    })
+
+def _stats_frame(stats):
+    return pd.DataFrame({
+        '쿼리': [entry['fingerprint'] for entry in stats],
+        '종류': [entry['kind'] for entry in stats],
+        '호출': [entry['calls'] for entry in stats],
+        '누적(ms)': [round(entry['total_ms'], 1) for entry in stats],
+        '평균(ms)': [round(entry['mean_ms'], 1) for entry in stats],
+        '최대(ms)': [round(entry['max_ms'], 1) for entry in stats],
+        '연결(ms)': [round(entry['connect_ms'], 1) for entry in stats],
+        '실행(ms)': [round(entry['execute_ms'], 1) for entry in stats],
+        '수신(ms)': [round(entry['fetch_ms'], 1) for entry in stats],
+        '행': [entry['rows'] for entry in stats],
+        'KiB': [round(entry['bytes'] / 1024, 1) for entry in stats],
+        '느림': [entry['slow'] for entry in stats],
+        '오류': [entry['errors'] for entry in stats],
+    })
+
+def render(top=TOP_QUERIES):
+    """
+    사이드바에 누적 시간 기준 상위 쿼리와 최근 쿼리를 표시 (enabled() 일 때만)
+
+    begin() 으로 시작한 trace 가 있으면 여기서 끝내고 파일로 내보낸다 (패널에는 구간별 합계 표시).
+
+    Args:
+        top (int): 표시할 쿼리 지문 수
+    """
+    finished = trace.finish()
+    if not enabled():
+        return
+    if finished is not None:
+        with st.sidebar.expander("⏱️ 재실행 trace", expanded=False):
+            st.caption(f"{finished.name} · {finished.duration_ms:,.0f} ms · {getattr(finished, 'path', '')}")
+            st.dataframe(_trace_frame(trace.summarize(finished, top=top)), hide_index=True)
+    with st.sidebar.expander("🛠️ 쿼리 계측", expanded=False):
+        stats = handle_sql.get_query_stats(top=top)
+        if not stats:
+            st.caption("아직 기록된 쿼리가 없습니다.")
+            return
+        all_stats = handle_sql.get_query_stats()
+        total_ms = sum(entry['total_ms'] for entry in all_stats)
+        calls = sum(entry['calls'] for entry in all_stats)
+        st.caption(
+            f"프로세스 누적 {calls:,}회 · {total_ms:,.0f} ms · 느린 쿼리 기준 {handle_sql.SLOW_QUERY_MS:,.0f} ms"
+        )
+        st.dataframe(_stats_frame(stats), hide_index=True)
+
+        recent = handle_sql.get_query_log(limit=top)
+        if recent:
+            st.caption("최근 쿼리")
+            st.dataframe(pd.DataFrame({
+                '쿼리': [record['fingerprint'] for record in reversed(recent)],
+                '총(ms)': [round(record['total_ms'], 1) for record in reversed(recent)],
+                '행': [record['rows'] for record in reversed(recent)],
+                '오류': [record['error'] or '' for record in reversed(recent)],
+            }), hide_index=True)
+        if st.button("통계 초기화", key="debug_panel_reset"):
+            handle_sql.reset_query_stats()
+            st.rerun()
@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+from datetime import timedelta
+
+import utils.handle_sql as handle_sql
+import utils.rollup as rollup
+
+# card 행 지문(fingerprint): 날짜(YYYYMMDD) + 정규화한 date, time, category, reason, cost, memo 의 SHA-1 앞 32자.
+# 날짜를 앞에 두면 날짜순으로 들어오는 가져오기/입력이 인덱스의 가까운 페이지에 모여 쓰기가 빠르다.
+# card.fingerprint 에는 유니크 인덱스(uq_card_fingerprint, utils/migrate.py 007)가 있어서
+# 같은 명세서를 다시 가져오거나 "2-소비 기록" 폼을 두 번 제출해도 같은 행이 두 번 들어가지 않는다.
+# 지문이 NULL 인 행은 마이그레이션 전부터 있던 중복이거나, 지문을 채우지 않는 경로(execute_many 등)로
+# 들어온 행이다. 아래 명령이 이를 한 번에 찾아 정리한다.
+#
+#   python -m utils.dedupe scan          # 지문 없는 행 중 중복/신규 집계 (읽기 전용)
+#   python -m utils.dedupe fix           # 신규 행은 지문을 채우고, 중복 행은 삭제 (롤업 함께 갱신)
+
+FINGERPRINT_INDEX = 'uq_card_fingerprint'
+
+# 한 번에 IN (...) 으로 조회할 지문 수
+LOOKUP_SIZE = 500
+
+# 이미 있는 지문 조회 ({placeholders}: 지문 개수만큼의 %s)
+FINGERPRINT_LOOKUP_SQL = "SELECT fingerprint, id FROM card WHERE fingerprint IN ({placeholders})"
+
+def _text(value):
+    """앞뒤 공백 제거 + 연속 공백을 하나로 (None 은 빈 문자열)"""
+    if value is None:
+        return ''
+    text = str(value).strip()
+    if '  ' in text or '\t' in text or '\n' in text:
+        return ' '.join(text.split())
+    return text
+
+def _time_text(value):
+    """TIME 값(문자열 / timedelta / 하루 중 초 / time 객체)을 'HH:MM:SS' 로"""
+    if value is None or value == '':
+        return ''
+    if isinstance(value, str):
+        if len(value) == 8:
+            return value
+        parts = value.strip().split(':')
+        if len(parts) not in (2, 3):
+            return value.strip()   # 해석할 수 없는 값은 그대로 (같은 값끼리는 같은 지문)
+        try:
+            return ':'.join(f"{int(float(part)):02d}" for part in (parts + ['0'])[:3])
+        except ValueError:
+            return value.strip()
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds()) % 86400
+    elif hasattr(value, 'hour'):
+        seconds = value.hour * 3600 + value.minute * 60 + value.second
+    else:
+        seconds = int(value) % 86400
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def fingerprint(date, time, category, reason, cost, memo):
+    """
+    소비 내역 한 건의 지문
+
+    Args:
+        date (str | date): 날짜 ('YYYY-MM-DD' 앞 10자만 사용)
+        time (str | timedelta | time | None): 시간 ('HH:MM' 과 'HH:MM:SS' 는 같은 값으로 취급)
+        category (str): 대분류
+        reason (str): 중분류
+        cost (int | None): 금액 (NULL 인 옛 행은 빈 값으로 취급, 0 과는 다른 지문)
+        memo (str | None): 메모 (None 과 '' 는 같은 값으로 취급)
+
+    Returns:
+        str: 40자 ('YYYYMMDD' + SHA-1 16진수 앞 32자)
+    """
+    day = str(date)[:10]
+    cost_text = '' if cost is None else str(int(cost))
+    key = '\x1f'.join((day, _time_text(time), _text(category), _text(reason), cost_text, _text(memo)))
+    return day.replace('-', '') + hashlib.sha1(key.encode('utf-8')).hexdigest()[:32]
+
+def existing_fingerprints(cursor, fingerprints):
+    """
+    이미 card 에 있는 지문 집합 (유니크 인덱스 조회, LOOKUP_SIZE 개씩)
+
+    Args:
+        cursor: handle_sql.Cursor (트랜잭션 안에서 호출하면 같은 스냅샷 기준)
+        fingerprints (list[str]): 확인할 지문
+
+    Returns:
+        dict: 지문 -> card.id
+    """
+    found = {}
+    for start in range(0, len(fingerprints), LOOKUP_SIZE):
+        part = fingerprints[start:start + LOOKUP_SIZE]
+        cursor.execute(
+            FINGERPRINT_LOOKUP_SQL.format(placeholders=', '.join(['%s'] * len(part))),
+            tuple(part)
+        )
+        found.update(cursor.fetchall())
+    return found
+
+def iter_unfingerprinted(cursor, chunk_size=5000):
+    """
+    지문이 없는 card 행을 id 순으로 chunk_size 개씩 (키셋 페이지네이션, DB 가 돌려준 값 그대로)
+
+    Yields:
+        list[tuple]: (id, date, time, category, reason, cost, memo) 행 목록
+    """
+    last_id = 0
+    while True:
+        cursor.execute(
+            "SELECT id, date, time, category, reason, cost, memo FROM card "
+            "WHERE id > %s AND fingerprint IS NULL ORDER BY id LIMIT %s",
+            (last_id, int(chunk_size))
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def scan(chunk_size=5000):
+    """
+    지문이 없는 행을 id 순으로 나눠 읽어 중복 여부를 판정 (card 는 수정하지 않음)
+
+    Args:
+        chunk_size (int): 한 번에 읽을 행 수
+
+    Returns:
+        dict:
+            duplicates (list[dict]): id, duplicate_of, date, category, reason, cost (삭제 대상)
+            missing (list[tuple]): (fingerprint, id) 지문만 채우면 되는 행
+            scanned (int): 읽은 행 수
+    """
+    rollup.ensure_schema()
+    duplicates, missing, scanned = [], [], 0
+    first_seen = {}   # 지문 없는 행들끼리의 중복 판정 (지문 -> 먼저 나온 id)
+    backend = handle_sql.get_backend()
+    try:
+        with backend.connection() as conn:
+            cursor = handle_sql.Cursor(conn.cursor(), backend.dialect)
+            try:
+                for rows in iter_unfingerprinted(cursor, chunk_size):
+                    scanned += len(rows)
+                    fingerprints = [fingerprint(*row[1:]) for row in rows]
+                    stored = existing_fingerprints(cursor, sorted(set(fingerprints)))
+                    for row, fp in zip(rows, fingerprints):
+                        keep_id = stored.get(fp, first_seen.get(fp))
+                        if keep_id is None:
+                            first_seen[fp] = row[0]
+                            missing.append((fp, row[0]))
+                        else:
+                            duplicates.append({
+                                'id': row[0], 'duplicate_of': keep_id, 'date': str(row[1])[:10],
+                                'category': row[3], 'reason': row[4],
+                                # NULL 금액은 롤업 SUM 에서처럼 0 으로
+                                'cost': int(row[5] or 0),
+                            })
+            finally:
+                cursor.close()
+    except Exception as e:
+        raise Exception(f"중복 검사 오류: {e}")
+    return {'duplicates': duplicates, 'missing': missing, 'scanned': scanned}
+
+def fix(result):
+    """
+    scan() 결과를 적용: 신규 행은 지문을 채우고, 중복 행은 삭제 (롤업 함께 갱신, 한 트랜잭션)
+
+    Returns:
+        tuple[int, int]: (지문을 채운 행 수, 삭제한 행 수)
+    """
+    deltas = {}
+    for row in result['duplicates']:
+        delta = deltas.setdefault((row['date'], row['category'], row['reason']), [0, 0])
+        delta[0] -= row['cost']
+        delta[1] -= 1
+    ids = [row['id'] for row in result['duplicates']]
+    deleted = 0
+    try:
+        with handle_sql.transaction() as cursor:
+            for start in range(0, len(ids), LOOKUP_SIZE):
+                part = ids[start:start + LOOKUP_SIZE]
+                deleted += cursor.execute(
+                    f"DELETE FROM card WHERE id IN ({', '.join(['%s'] * len(part))})", tuple(part)
+                )
+            rollup.apply_deltas(cursor, deltas)
+            if result['missing']:
+                cursor.executemany("UPDATE card SET fingerprint = %s WHERE id = %s", result['missing'])
+    except Exception as e:
+        raise Exception(f"중복 정리 오류: {e}")
+    return len(result['missing']), deleted
+
+def main():
+    parser = argparse.ArgumentParser(description="card 중복 행 검사/정리")
+    parser.add_argument('command', nargs='?', choices=['scan', 'fix'], default='scan',
+                        help="scan: 집계만 (기본값), fix: 지문 채우기 + 중복 삭제")
+    parser.add_argument('--show', type=int, default=10, help="출력할 중복 행 수")
+    args = parser.parse_args()
+
+    result = scan()
+    duplicates = result['duplicates']
+    print(f"지문 없는 행 {result['scanned']:,}개: 중복 {len(duplicates):,}개, 신규 {len(result['missing']):,}개")
+    for row in duplicates[:args.show]:
+        print(f"  id={row['id']} = id={row['duplicate_of']}  {row['date']} {row['category']}/{row['reason']} {row['cost']:,}원")
+    if args.command == 'fix':
+        filled, deleted = fix(result)
+        print(f"✅ 지문 {filled:,}개 채움, 중복 {deleted:,}행 삭제")
+
+if __name__ == "__main__":
+    main()
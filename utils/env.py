@@ -0,0 +1,38 @@
+import os
+import threading
+
+# 설정(환경 변수) 읽기.
+# 모듈 상수(DB_SLOW_QUERY_MS, TRACE, LEDGER_CACHE_TTL 등)는 임포트 시점에 읽히므로,
+# .env 를 DB 설정(handle_sql.get_config)보다 먼저, 처음 설정을 읽을 때 한 번 os.environ 에 반영한다.
+# 이미 설정된 환경 변수가 .env 보다 우선한다 (load_dotenv 기본 동작).
+#
+#   SLOW_QUERY_MS = float(env.get('DB_SLOW_QUERY_MS', 500))
+
+_loaded = False
+_lock = threading.Lock()
+
+def load():
+    """.env 를 한 번만 읽어 os.environ 에 반영 (여러 번 호출해도 안전)"""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _loaded = True
+
+def get(name, default=None):
+    """
+    .env 를 반영한 뒤 환경 변수 값을 반환
+
+    Args:
+        name (str): 변수 이름
+        default: 없을 때 반환할 값
+
+    Returns:
+        str | None
+    """
+    load()
+    return os.getenv(name, default)
@@ -0,0 +1,145 @@
+import utils.dedupe as dedupe
+import utils.handle_sql as handle_sql
+import utils.rollup as rollup
+
+# card 테이블 쓰기 경로 (추가 / 수정 / 삭제).
+# 각 작업은 card 변경과 롤업(utils/rollup.py) 갱신을 한 트랜잭션으로 처리한다.
+# 추가/수정은 행 지문(utils/dedupe.py)을 함께 저장하므로 같은 내역은 한 번만 들어간다.
+
+def normalize_time(value):
+    """
+    시간 값을 'HH:MM:SS' 문자열로 맞춤 ('HH:MM' -> 'HH:MM:SS')
+    """
+    if value is None:
+        return value
+    text = str(value)
+    if len(text.split(':')) == 2:
+        text = f"{text}:00"
+    return text
+
+def add_expense(date, time, category, reason, cost, memo):
+    """
+    소비 내역 한 건을 추가
+
+    같은 지문(날짜, 시간, 분류, 금액, 메모)의 행이 이미 있으면 추가하지 않는다 (폼 중복 제출 등).
+
+    Returns:
+        int: 추가된 행 수 (중복이면 0)
+
+    Raises:
+        Exception: 쿼리 실행 중 오류 발생 시
+    """
+    rollup.require_schema()
+    fingerprint = dedupe.fingerprint(date, time, category, reason, cost, memo)
+    try:
+        with handle_sql.transaction() as cursor:
+            affected = cursor.execute(
+                """
+                INSERT INTO card (date, time, category, reason, cost, memo, fingerprint)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE id = id
+                """,
+                (date, time, category, reason, cost, memo, fingerprint)
+            )
+            if affected:
+                rollup.apply_delta(cursor, date, category, reason, cost, 1)
+        return affected
+    except Exception as e:
+        raise Exception(f"쿼리 실행 오류: {e}")
+
+# 수정/삭제 대상 행 잠금 조회 (id 를 모르는 이전 호출은 아래 컬럼 비교 조건으로 찾음)
+FIND_ROW_SQL = "SELECT id, date, category, reason, cost FROM card WHERE {where} LIMIT 1 FOR UPDATE"
+UPDATE_MATCH_WHERE = "date = %s AND time = %s AND category = %s AND reason = %s"
+DELETE_MATCH_WHERE = "date = %s AND time = %s AND category = %s AND reason = %s AND cost = %s"
+
+def _find_row(cursor, expense_id, fallback_where, fallback_params):
+    """
+    수정/삭제 대상 행을 잠그고 (id, date, category, reason, cost) 를 반환
+
+    expense_id(card.id) 가 있으면 기본 키로 한 행만 찾는다. id 를 모르는 이전 호출은
+    date, time 등 컬럼을 그대로 비교하는 조건으로 찾는다 (컬럼에 함수를 씌우지 않으므로
+    (date, time) 인덱스를 탈 수 있음).
+    """
+    if expense_id is not None:
+        where, params = "id = %s", (int(expense_id),)
+    else:
+        where, params = fallback_where, fallback_params
+    cursor.execute(FIND_ROW_SQL.format(where=where), params)
+    return cursor.fetchone()
+
+def update_expense(date, time, category, reason, cost, memo,
+                   original_date=None, original_time=None, original_category=None, original_reason=None,
+                   expense_id=None):
+    """
+    기존 소비 내역 한 건을 수정
+
+    Args:
+        expense_id (int, optional): 수정할 card.id. 없으면 original_* 값으로 대상을 찾음
+
+    Returns:
+        int: 수정된 행 수 (대상이 없으면 0)
+
+    Raises:
+        Exception: 쿼리 실행 중 오류 발생 시
+    """
+    rollup.require_schema()
+    original_time = normalize_time(original_time)
+    try:
+        with handle_sql.transaction() as cursor:
+            row = _find_row(
+                cursor, expense_id,
+                UPDATE_MATCH_WHERE,
+                (original_date, original_time, original_category, original_reason)
+            )
+            if row is None:
+                return 0
+            row_id, old_date, old_category, old_reason, old_cost = row
+            fingerprint = dedupe.fingerprint(date, time, category, reason, cost, memo)
+            cursor.execute("SELECT id FROM card WHERE fingerprint = %s AND id <> %s", (fingerprint, row_id))
+            if cursor.fetchone() is not None:
+                raise ValueError("같은 날짜/시간/분류/금액/메모의 내역이 이미 있습니다")
+            affected = cursor.execute(
+                """
+                UPDATE card
+                SET date = %s, time = %s, category = %s, reason = %s, cost = %s, memo = %s, fingerprint = %s
+                WHERE id = %s
+                """,
+                (date, time, category, reason, cost, memo, fingerprint, row_id)
+            )
+            rollup.apply_delta(cursor, old_date, old_category, old_reason, -int(old_cost or 0), -1)
+            rollup.apply_delta(cursor, date, category, reason, cost, 1)
+        return affected
+    except Exception as e:
+        raise Exception(f"쿼리 실행 오류: {e}")
+
+def delete_expense(original_date=None, original_time=None, category=None, reason=None, cost=None,
+                   expense_id=None):
+    """
+    소비 내역 한 건을 삭제
+
+    Args:
+        expense_id (int, optional): 삭제할 card.id. 없으면 나머지 값으로 대상을 찾음
+
+    Returns:
+        int: 삭제된 행 수 (대상이 없으면 0)
+
+    Raises:
+        Exception: 쿼리 실행 중 오류 발생 시
+    """
+    rollup.require_schema()
+    original_time = normalize_time(original_time)
+    try:
+        with handle_sql.transaction() as cursor:
+            row = _find_row(
+                cursor, expense_id,
+                DELETE_MATCH_WHERE,
+                (original_date, original_time, category, reason, cost)
+            )
+            if row is None:
+                return 0
+            row_id, old_date, old_category, old_reason, old_cost = row
+            affected = cursor.execute("DELETE FROM card WHERE id = %s", (row_id,))
+            rollup.apply_delta(cursor, old_date, old_category, old_reason, -int(old_cost or 0), -1)
+        return affected
+    except Exception as e:
+        raise Exception(f"쿼리 실행 오류: {e}")
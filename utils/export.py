@@ -0,0 +1,245 @@
+import argparse
+import os
+import time
+
+import utils.handle_sql as handle_sql
+import utils.reinterpret as reinterpret
+
+# card 테이블 내보내기 (CSV / Parquet).
+#
+#   python -m utils.export ledger.parquet [--start 2025-01-01] [--end 2026-01-01] [--row-group-size 250000]
+#                          [--compression zstd] [--labels]
+#   python -m utils.export ledger.csv [--no-bom]       # ledger.csv.gz 면 gzip 압축
+#
+# handle_sql.iter_batches() 로 서버 측 커서에서 청크 단위로 받아 바로 파일에 쓰므로
+# 메모리 사용량은 원장 크기와 관계없이 청크(+ Parquet 행 그룹) 하나 분량이다.
+# 파일은 임시 이름으로 쓴 뒤 다 쓰면 바꿔 달아서, 중간에 실패해도 반쯤 쓴 파일이 남지 않는다.
+
+COLUMNS = ('id', 'date', 'time', 'category', 'reason', 'cost', 'memo')
+
+# 내보낼 때 컬럼 타입 (time 은 하루 중 초로 받아 Arrow time32 로 바꿈)
+SCHEMA = {
+    'id': 'int64', 'date': 'date', 'time': 'time', 'category': 'string', 'reason': 'string',
+    'cost': 'int64', 'memo': 'string',
+}
+
+ROW_GROUP_SIZE = 250_000
+PARQUET_COMPRESSION = 'zstd'
+
+FORMATS = ('csv', 'parquet')
+
+def infer_format(path):
+    """
+    파일 이름으로 형식과 압축을 정함
+
+    Returns:
+        tuple[str, str | None]: ('csv' | 'parquet', 압축 코덱)
+    """
+    name = path.lower()
+    if name.endswith(('.parquet', '.pq')):
+        return 'parquet', PARQUET_COMPRESSION
+    if name.endswith('.csv.gz'):
+        return 'csv', 'gzip'
+    if name.endswith('.csv'):
+        return 'csv', None
+    raise ValueError(f"확장자로 형식을 알 수 없습니다 (.csv / .csv.gz / .parquet): {path}")
+
+def select_query(start=None, end=None):
+    """
+    Returns:
+        tuple[str, tuple | None]: 기간 [start, end) 의 card 행을 (date, time, id) 순으로 읽는 쿼리와 파라미터
+    """
+    conditions, params = [], []
+    if start:
+        conditions.append("date >= %s")
+        params.append(start)
+    if end:
+        conditions.append("date < %s")
+        params.append(end)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # (date, time) 인덱스 순서대로 읽으므로 정렬을 위해 결과를 모아 둘 필요가 없음
+    return f"SELECT {', '.join(COLUMNS)} FROM card {where} ORDER BY date, time, id", tuple(params) or None
+
+def _prepare(batch, labels):
+    """iter_batches() 청크를 내보낼 모양으로: time 을 time32[s] 로, 필요하면 재해석 라벨 추가"""
+    import pyarrow as pa
+
+    arrays = []
+    for name in COLUMNS:
+        array = batch.column(name)
+        if name == 'time':
+            array = array.cast(pa.int32()).cast(pa.time32('s'))
+        arrays.append(array)
+    names = list(COLUMNS)
+    if labels:
+        codes = reinterpret.reinterpret_codes(
+            batch.column('category').to_numpy(zero_copy_only=False),
+            batch.column('reason').to_numpy(zero_copy_only=False)
+        )
+        arrays.append(pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()), pa.array(reinterpret.LABELS)))
+        names.append('reinterpretation')
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+class _ParquetSink:
+    """RecordBatch 를 모아 row_group_size 행마다 행 그룹 하나로 씀"""
+
+    def __init__(self, path, schema, compression, row_group_size):
+        import pyarrow.parquet as pq
+
+        self._writer = pq.ParquetWriter(path, schema, compression=compression or 'none')
+        self._row_group_size = row_group_size
+        self._pending, self._pending_rows = [], 0
+
+    def write(self, batch):
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if self._pending:
+            self._writer.write_table(pa.Table.from_batches(self._pending), row_group_size=self._row_group_size)
+        self._pending, self._pending_rows = [], 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+class _CsvSink:
+    """pyarrow CSV 작성기 (엑셀에서 한글이 깨지지 않도록 기본으로 BOM 을 붙임)"""
+
+    def __init__(self, path, schema, compression, bom):
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        self._stream = pa.output_stream(path, compression=compression)
+        if bom:
+            self._stream.write('﻿'.encode('utf-8'))
+        self._writer = pa_csv.CSVWriter(self._stream, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        self._stream.close()
+
+def export(path, start=None, end=None, fmt=None, compression=None, row_group_size=ROW_GROUP_SIZE,
+           chunk_size=None, labels=False, bom=True, log=print):
+    """
+    card 를 파일로 내보내기 (스트리밍, 메모리 사용량 일정)
+
+    Args:
+        path (str): 출력 파일 (.csv / .csv.gz / .parquet)
+        start (str, optional): 시작 날짜 (포함, YYYY-MM-DD)
+        end (str, optional): 종료 날짜 (미포함, YYYY-MM-DD)
+        fmt (str, optional): 'csv' 또는 'parquet' (기본값: 확장자로 결정)
+        compression (str, optional): Parquet 코덱(zstd, snappy, gzip, none) / CSV 는 gzip
+                                     (기본값: 확장자로 결정)
+        row_group_size (int): Parquet 행 그룹 크기
+        chunk_size (int, optional): DB 에서 한 번에 받을 행 수 (기본값: DB_STREAM_CHUNK_SIZE)
+        labels (bool): 재해석 라벨(reinterpretation) 컬럼 추가
+        bom (bool): CSV 앞에 UTF-8 BOM 추가
+        log (callable | None): 진행 상황 출력 함수
+
+    Returns:
+        dict: path, format, rows, bytes, seconds, rows_per_sec
+
+    Raises:
+        Exception: 조회 또는 파일 쓰기에 실패한 경우 (출력 파일은 만들어지지 않음)
+    """
+    log = log or (lambda message: None)
+    inferred_fmt, inferred_compression = infer_format(path) if fmt is None else (fmt, None)
+    fmt = fmt or inferred_fmt
+    compression = compression if compression is not None else inferred_compression
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    if fmt == 'parquet' and compression is None:
+        compression = PARQUET_COMPRESSION
+
+    SQL, params = select_query(start, end)
+    tmp_path = f"{path}.tmp"
+    sink, rows = None, 0
+    started = last_log = time.perf_counter()
+    try:
+        for batch in handle_sql.iter_batches(SQL, params, chunk_size=chunk_size, schema=SCHEMA):
+            batch = _prepare(batch, labels)
+            if sink is None:
+                if fmt == 'parquet':
+                    sink = _ParquetSink(tmp_path, batch.schema, compression, row_group_size)
+                else:
+                    sink = _CsvSink(tmp_path, batch.schema, compression, bom)
+            sink.write(batch)
+            rows += batch.num_rows
+            now = time.perf_counter()
+            if now - last_log >= 1:
+                log(f"  … {rows:,}행 ({rows / (now - started):,.0f} rows/s)")
+                last_log = now
+        if sink is None:
+            # 조건에 맞는 행이 없어도 헤더(스키마)만 있는 파일을 만듦
+            import pyarrow as pa
+
+            empty = pa.RecordBatch.from_pylist([], schema=_empty_schema(labels))
+            sink = _ParquetSink(tmp_path, empty.schema, compression, row_group_size) if fmt == 'parquet' \
+                else _CsvSink(tmp_path, empty.schema, compression, bom)
+        sink.close()
+        sink = None
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if sink is not None:
+            try:
+                sink.close()
+            except Exception:
+                pass
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise Exception(f"내보내기 오류: {e}")
+
+    seconds = time.perf_counter() - started
+    return {
+        'path': path, 'format': fmt, 'rows': rows, 'bytes': os.path.getsize(path),
+        'seconds': seconds, 'rows_per_sec': rows / seconds if seconds else 0.0,
+    }
+
+def _empty_schema(labels):
+    import pyarrow as pa
+
+    fields = [
+        ('id', pa.int64()), ('date', pa.date32()), ('time', pa.time32('s')), ('category', pa.string()),
+        ('reason', pa.string()), ('cost', pa.int64()), ('memo', pa.string()),
+    ]
+    if labels:
+        fields.append(('reinterpretation', pa.dictionary(pa.int8(), pa.string())))
+    return pa.schema(fields)
+
+def main():
+    parser = argparse.ArgumentParser(description="card 테이블을 CSV / Parquet 로 내보내기")
+    parser.add_argument('path', help="출력 파일 (.csv / .csv.gz / .parquet)")
+    parser.add_argument('--start', help="시작 날짜 (포함, YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료 날짜 (미포함, YYYY-MM-DD)")
+    parser.add_argument('--format', choices=FORMATS, help="형식 (기본값: 확장자로 결정)")
+    parser.add_argument('--compression', help="Parquet: zstd(기본값)/snappy/gzip/none, CSV: gzip")
+    parser.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE, help="Parquet 행 그룹 크기")
+    parser.add_argument('--chunk-size', type=int, help="DB 에서 한 번에 받을 행 수")
+    parser.add_argument('--labels', action='store_true', help="재해석 라벨 컬럼 추가")
+    parser.add_argument('--no-bom', action='store_true', help="CSV 앞에 BOM 을 붙이지 않음")
+    args = parser.parse_args()
+    if args.format is None:
+        try:
+            infer_format(args.path)
+        except ValueError as e:
+            parser.error(str(e))
+
+    report = export(
+        args.path, start=args.start, end=args.end, fmt=args.format, compression=args.compression,
+        row_group_size=args.row_group_size, chunk_size=args.chunk_size, labels=args.labels, bom=not args.no_bom
+    )
+    print(
+        f"✅ {report['path']} 내보내기 완료: {report['rows']:,}행, {report['bytes'] / 2**20:,.1f} MiB "
+        f"({report['seconds']:.2f}s, {report['rows_per_sec']:,.0f} rows/s)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,1237 @@
-import pymysql
+import time
+
+# 모듈 임포트 비용 측정 시작 (IMPORT_TIME_MS 참고)
+_IMPORT_STARTED = time.perf_counter()
+
+import numpy as np
 import pandas as pd
+import functools
 import os
-from dotenv import load_dotenv
+import re
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
 
-# 1. 환경 변수 로드
-load_dotenv()
+import utils.env as env
+import utils.trace as trace
 
 pd.options.display.float_format = '{:.2f}'.format
 
-# 2. 변수명 매칭 확인 (.env 파일의 키값과 동일하게)
-HOST = os.getenv('DB_HOST')
-PORT = int(os.getenv('DB_PORT', 3306))
-USER = os.getenv('DB_USER')
-PASSWD = os.getenv('DB_PASSWD')
-DB_NAME = os.getenv('DB_NAME')
-
-print(HOST, PORT, USER, PASSWD, DB_NAME)
-
-# 3. DB 연결
-try:
-    db = pymysql.connect(
-        user=USER,
-        password=PASSWD,
-        host=HOST,
-        port=PORT,
-        db=DB_NAME,
-        charset='utf8mb4'
-    )
-    print("연결 성공!")
-except Exception as e:
-    print(f"연결 실패: {e}")
-    db = None
+# 모듈 임포트 시점에는 .env 읽기(utils/env.py, 모듈 상수가 .env 값을 따르도록) 외의 I/O 는 하지 않는다.
+# DB 설정 해석과 첫 DB 연결은 처음 사용할 때 일어남.
+_config = None
+_config_lock = threading.Lock()
+_startup = {'import_ms': None, 'config_ms': None, 'first_connect_ms': None}
+
+def get_config():
+    """
+    DB 및 커넥션 풀 설정을 반환 (최초 호출 시 .env 를 읽어 한 번만 해석)
+
+    Returns:
+        dict: host, port, user, passwd, db_name, backend, sqlite_path 와 pool_* 설정값
+    """
+    global _config
+    if _config is not None:
+        return _config
+    with _config_lock:
+        if _config is None:
+            started = time.perf_counter()
+            # 1. 환경 변수 로드 (보통 모듈 상수를 읽을 때 이미 반영됨)
+            env.load()
+
+            # 2. 변수명 매칭 확인 (.env 파일의 키값과 동일하게)
+            _config = {
+                'host': os.getenv('DB_HOST'),
+                'port': int(os.getenv('DB_PORT', 3306)),
+                'user': os.getenv('DB_USER'),
+                'passwd': os.getenv('DB_PASSWD'),
+                'db_name': os.getenv('DB_NAME'),
+                # 저장소 백엔드: mysql (기본) 또는 sqlite (내장 엔진, 단일 사용자/테스트/벤치마크용)
+                'backend': os.getenv('DB_BACKEND', 'mysql').lower(),
+                'sqlite_path': os.getenv('DB_SQLITE_PATH', os.path.join('data', 'tungjang.db')),
+                # 커넥션 풀 설정 (.env 로 조정 가능)
+                'pool_min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+                'pool_max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+                'pool_recycle': float(os.getenv('DB_POOL_RECYCLE', 3600)),          # 초, 이보다 오래된 연결은 새로 맺음
+                'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),            # 초, 빈 연결을 기다리는 최대 시간
+                'pool_ping_interval': float(os.getenv('DB_POOL_PING_INTERVAL', 30)),  # 초, 이보다 오래 쉰 연결은 ping 으로 확인
+            }
+            _startup['config_ms'] = (time.perf_counter() - started) * 1000
+    return _config
 
 def get_connection():
     """
     새로운 DB 연결을 반환하는 함수
-    각 쿼리마다 새 연결을 사용하여 연결 끊김 문제 방지
+    커넥션 풀이 새 연결을 만들 때 사용하며, 풀을 거치지 않는 단발성 작업에도 쓸 수 있음
+
+    읽기 쿼리가 스냅샷 트랜잭션을 붙잡고 있지 않도록 autocommit 으로 연결하고,
+    쓰기 작업은 conn.begin() 으로 트랜잭션을 명시적으로 연다.
     """
+    config = get_config()
     try:
+        import pymysql
+
+        started = time.perf_counter()
         conn = pymysql.connect(
-            user=USER,
-            password=PASSWD,
-            host=HOST,
-            port=PORT,
-            db=DB_NAME,
-            charset='utf8mb4'
+            user=config['user'],
+            password=config['passwd'],
+            host=config['host'],
+            port=config['port'],
+            db=config['db_name'],
+            charset='utf8mb4',
+            autocommit=True
         )
+        if _startup['first_connect_ms'] is None:
+            _startup['first_connect_ms'] = (time.perf_counter() - started) * 1000
         return conn
     except Exception as e:
         raise Exception(f"DB 연결 실패: {e}")
 
-def get_data(SQL: str):
+class ConnectionPool:
+    """
+    크기가 제한된 스레드 안전 커넥션 풀
+
+    Streamlit 은 세션마다 별도 스레드에서 스크립트를 실행하므로, 모든 세션이
+    하나의 풀을 공유하고 체크아웃한 연결은 반납 전까지 한 스레드만 사용한다.
+
+    - 최대 max_size 개까지 연결을 만들고, 모두 사용 중이면 timeout 초까지 대기
+    - ping_interval 초 이상 쉬었던 연결은 ping 으로 살아있는지 확인 후 재사용
+    - recycle 초보다 오래된 연결은 닫고 새로 맺음
+    - 반납된 유휴 연결은 min_size 개 이상 유지
+
+    Example:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            ...
+    """
+
+    def __init__(self, creator, min_size=1, max_size=10, recycle=3600, timeout=10, ping_interval=30):
+        if max_size < 1:
+            raise ValueError("max_size 는 1 이상이어야 합니다.")
+        self._creator = creator
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.recycle = recycle
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()      # (conn, created_at, last_used)
+        self._created_at = {}     # id(conn) -> 생성 시각 (사용 중인 연결 포함)
+        self._size = 0            # 열려 있는 연결 수 (유휴 + 사용 중)
+        self._warmed = False
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'creates': 0,
+            'recycles': 0,
+            'ping_failures': 0,
+            'discards': 0,
+            'max_in_use': 0,
+        }
+
+    def _create(self):
+        conn = self._creator()
+        with self._cond:
+            self._stats['creates'] += 1
+            self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _close(self, conn):
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _warmup(self):
+        """최초 체크아웃 시 min_size 개까지 연결을 미리 채움"""
+        with self._cond:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = max(0, self.min_size - self._size - 1)
+            self._size += missing
+        for _ in range(missing):
+            try:
+                conn = self._create()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                continue
+            now = time.monotonic()
+            with self._cond:
+                self._idle.append((conn, now, now))
+                self._cond.notify()
+
+    def _validate(self, conn, created_at, last_used):
+        """재사용할 유휴 연결을 점검. 쓸 수 없으면 None 반환"""
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            with self._cond:
+                self._stats['recycles'] += 1
+            return None
+        if self.ping_interval is not None and now - last_used > self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._stats['ping_failures'] += 1
+                return None
+        return conn
+
+    def acquire(self):
+        """
+        풀에서 연결을 하나 체크아웃
+
+        Returns:
+            pymysql.connections.Connection: 사용 가능한 연결
+
+        Raises:
+            Exception: timeout 초 안에 연결을 얻지 못했거나 새 연결 생성에 실패한 경우
+        """
+        if not self._warmed:
+            self._warmup()
+
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        wait_started = None
+        while True:
+            candidate = None
+            create = False
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    if not waited:
+                        waited = True
+                        wait_started = time.monotonic()
+                        self._stats['waits'] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        self._stats['wait_time'] += time.monotonic() - wait_started
+                        raise Exception(f"DB 연결 대기 시간 초과 ({self.timeout}초, 최대 {self.max_size}개 사용 중)")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    candidate = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            if create:
+                try:
+                    conn = self._create()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                conn = self._validate(*candidate)
+                if conn is None:
+                    # 죽었거나 오래된 연결은 버리고 같은 자리에 새 연결을 만듦
+                    self._close(candidate[0])
+                    try:
+                        conn = self._create()
+                    except Exception:
+                        with self._cond:
+                            self._size -= 1
+                            self._cond.notify()
+                        raise
+
+            with self._cond:
+                self._stats['checkouts'] += 1
+                if waited:
+                    self._stats['wait_time'] += time.monotonic() - wait_started
+                in_use = self._size - len(self._idle)
+                if in_use > self._stats['max_in_use']:
+                    self._stats['max_in_use'] = in_use
+            return conn
+
+    def release(self, conn, discard=False):
+        """
+        체크아웃한 연결을 풀에 반납
+
+        Args:
+            conn: acquire() 로 얻은 연결
+            discard (bool): True 면 재사용하지 않고 닫음 (오류가 난 연결 등)
+        """
+        if not discard and not conn.open:
+            discard = True
+        if discard:
+            self._close(conn)
+            with self._cond:
+                self._size -= 1
+                self._stats['discards'] += 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            created_at = self._created_at.get(id(conn), time.monotonic())
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        with 블록 동안 연결을 빌려주는 컨텍스트 매니저
+        블록 안에서 예외가 나면 연결을 재사용하지 않고 폐기
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self):
+        """
+        풀 크기 산정을 위한 통계
+
+        Returns:
+            dict: size, idle, in_use 와 누적 checkouts, waits, wait_time, timeouts,
+                  creates, recycles, ping_failures, discards, max_in_use
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['min_size'] = self.min_size
+            stats['max_size'] = self.max_size
+        return stats
+
+    def close_all(self):
+        """유휴 연결을 모두 닫음 (사용 중인 연결은 반납 시 정상 처리)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._warmed = False
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    프로세스 공용 커넥션 풀을 반환 (최초 호출 시 생성, 연결은 첫 체크아웃 때 맺음)
+
+    Returns:
+        ConnectionPool: 공용 커넥션 풀
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            config = get_config()
+            _pool = ConnectionPool(
+                get_connection,
+                min_size=config['pool_min_size'],
+                max_size=config['pool_max_size'],
+                recycle=config['pool_recycle'],
+                timeout=config['pool_timeout'],
+                ping_interval=config['pool_ping_interval']
+            )
+    return _pool
+
+# ==========================================
+# 저장소 백엔드 / SQL 방언
+# ==========================================
+# 페이지들은 MySQL 문법(%s 파라미터, DATE_FORMAT, CURDATE, UPDATE ... LIMIT 1 등)으로
+# 쿼리를 작성한다. 각 백엔드의 Dialect 가 이를 자신의 엔진에 맞게 변환한다.
+
+class MySQLDialect:
+    """MySQL 방언: 페이지의 쿼리를 그대로 사용"""
+    name = 'mysql'
+
+    def translate(self, query, params=None):
+        return query
+
+class SQLiteDialect:
+    """
+    MySQL 문법의 쿼리를 SQLite 에서 실행할 수 있게 변환하는 방언
+
+    - %s 파라미터 -> ?  (파라미터가 있을 때만, %% 는 % 로)
+    - CURDATE() / NOW() -> date('now', 'localtime') / datetime('now', 'localtime')
+    - DATE_FORMAT(expr, fmt) -> strftime(fmt, expr)
+    - UPDATE / DELETE 끝의 LIMIT n 제거 (SQLite 기본 빌드는 지원하지 않음)
+    - INSERT ... ON DUPLICATE KEY UPDATE col = VALUES(col)
+      -> INSERT ... ON CONFLICT DO UPDATE SET col = excluded.col
+    - INSERT ... ON DUPLICATE KEY UPDATE id = id (중복이면 아무것도 하지 않는 관용구)
+      -> INSERT ... ON CONFLICT DO NOTHING  (두 엔진 모두 건너뛴 행은 영향받은 행 수에서 빠짐)
+    - SELECT ... FOR UPDATE 의 FOR UPDATE 제거 (SQLite 는 쓰기 트랜잭션이 직렬화됨)
+    - TIME(x) 는 SQLite 의 time(x) 와 같으므로 그대로 둠
+    """
+    name = 'sqlite'
+
+    _PARAM = re.compile(r"%(s|%)")
+    _CURDATE = re.compile(r"\bCURDATE\(\s*\)", re.IGNORECASE)
+    _NOW = re.compile(r"\bNOW\(\s*\)", re.IGNORECASE)
+    _DATE_FORMAT = re.compile(r"\bDATE_FORMAT\(\s*(.+?)\s*,\s*('[^']*')\s*\)", re.IGNORECASE)
+    _WRITE_LIMIT = re.compile(r"^(\s*(?:UPDATE|DELETE)\b.*?)\s+LIMIT\s+\d+\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+    _UPSERT_NOOP = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\s+(\w+)\s*=\s*\1\s*;?\s*$", re.IGNORECASE)
+    _UPSERT = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", re.IGNORECASE | re.DOTALL)
+    _UPSERT_VALUES = re.compile(r"\bVALUES\(\s*(\w+)\s*\)", re.IGNORECASE)
+    _FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\s*;?\s*$", re.IGNORECASE)
+    # MySQL DATE_FORMAT 지정자 중 SQLite strftime 과 다른 것
+    _FORMAT_MAP = {'%i': '%M', '%s': '%S', '%T': '%H:%M:%S'}
+
+    def _date_format(self, match):
+        fmt = match.group(2)
+        for mysql_spec, sqlite_spec in self._FORMAT_MAP.items():
+            fmt = fmt.replace(mysql_spec, sqlite_spec)
+        return f"strftime({fmt}, {match.group(1)})"
+
+    def translate(self, query, params=None):
+        return self._translate(query, params is not None)
+
+    @functools.lru_cache(maxsize=256)
+    def _translate(self, query, has_params):
+        # 같은 쿼리 문자열은 반복 실행되므로 (대량 INSERT 의 긴 다중 행 문장 포함) 변환 결과를 캐시
+        # DATE_FORMAT 은 CURDATE() 를 인자로 받는 경우가 많으므로 먼저 변환
+        query = self._DATE_FORMAT.sub(self._date_format, query)
+        query = self._CURDATE.sub("date('now', 'localtime')", query)
+        query = self._NOW.sub("datetime('now', 'localtime')", query)
+        query = self._WRITE_LIMIT.sub(r"\1", query)
+        query = self._UPSERT_NOOP.sub("ON CONFLICT DO NOTHING", query)
+        query = self._UPSERT.sub(
+            lambda m: "ON CONFLICT DO UPDATE SET" + self._UPSERT_VALUES.sub(r"excluded.\1", m.group(1)),
+            query
+        )
+        query = self._FOR_UPDATE.sub("", query)
+        if has_params:
+            query = self._PARAM.sub(lambda m: '?' if m.group(1) == 's' else '%', query)
+        return query
+
+class Cursor:
+    """
+    백엔드 커서를 감싸 방언 변환을 적용하는 얇은 래퍼
+    execute / executemany 는 두 엔진 모두 영향받은 행 수를 반환
+
+    문장마다 실행/수신 시간과 행 수를 쿼리 계측에 기록한다 (다음 execute 나 close() 때 확정).
+    connect_ms 를 주면 첫 문장의 연결 대기 시간으로 기록한다.
+    """
+
+    def __init__(self, raw_cursor, dialect, connect_ms=0.0):
+        self._cursor = raw_cursor
+        self.dialect = dialect
+        self._connect_ms = connect_ms
+        self._probe = None
+
+    def _begin(self, query, params, kind):
+        self._finish()
+        probe = _QueryProbe(query, params, kind)
+        if self._connect_ms:
+            probe.times['connect'] = self._connect_ms / 1000
+            self._connect_ms = 0.0
+        self._probe = probe
+        return probe
+
+    def _finish(self, error=None):
+        if self._probe is not None:
+            self._probe.finish(error=error)
+            self._probe = None
+
+    def execute(self, query, params=None):
+        probe = self._begin(query, params, 'write')
+        query = self.dialect.translate(query, params)
+        try:
+            if params is None:
+                self._cursor.execute(query)
+            else:
+                self._cursor.execute(query, params)
+        except Exception as e:
+            self._finish(e)
+            raise
+        probe.mark('execute')
+        if self._cursor.description is not None:
+            probe.kind = 'select'   # 행 수는 fetch* 에서 셈
+        else:
+            probe.rows = max(self._cursor.rowcount, 0)
+        return self._cursor.rowcount
+
+    def executemany(self, query, data_list):
+        probe = self._begin(query, None, 'many')
+        query = self.dialect.translate(query, data_list)
+        try:
+            self._cursor.executemany(query, data_list)
+        except Exception as e:
+            self._finish(e)
+            raise
+        probe.mark('execute')
+        probe.rows = max(self._cursor.rowcount, 0)
+        return self._cursor.rowcount
+
+    def _fetch(self, fetch, *args, single=False):
+        probe = self._probe
+        if probe is None:
+            return fetch(*args)
+        probe.resume()
+        result = fetch(*args)
+        probe.mark('fetch')
+        if single:
+            probe.rows += result is not None
+        else:
+            probe.rows += len(result)
+        return result
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone, single=True)
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        # description / lastrowid / rowcount 등은 원래 커서로 위임
+        return getattr(self._cursor, name)
+
+class MySQLBackend:
+    """PyMySQL + ConnectionPool 기반 MySQL 백엔드"""
+    name = 'mysql'
+
+    def __init__(self):
+        self.dialect = MySQLDialect()
+
+    @contextmanager
+    def connection(self):
+        with get_pool().connection() as conn:
+            yield conn
+
+    def begin(self, conn):
+        conn.begin()
+
+    def stream_cursor(self, conn):
+        """결과를 서버에 두고 fetchmany() 로 조금씩 받는 비버퍼 커서"""
+        import pymysql.cursors
+
+        return conn.cursor(pymysql.cursors.SSCursor)
+
+    def stats(self):
+        return get_pool().stats()
+
+# SQLite 연결별 페이지 캐시 (KiB). 기본값(2 MiB)은 인덱스가 큰 표에 무작위 키(행 지문 등)를
+# 넣을 때 페이지를 계속 다시 읽게 되므로 넉넉히 잡음 (실제로 쓴 만큼만 메모리를 차지)
+SQLITE_CACHE_KB = int(env.get('DB_SQLITE_CACHE_KB', 65536))
+
+class SQLiteBackend:
+    """
+    내장 SQLite 백엔드 (DB_BACKEND=sqlite)
+
+    네트워크 왕복이 없는 로컬 엔진으로, 단일 사용자 설치나 테스트/벤치마크에 사용.
+    sqlite3 연결은 스레드 간에 공유할 수 없으므로 스레드마다 하나씩 열어 재사용한다.
+    날짜와 시간은 'YYYY-MM-DD', 'HH:MM:SS' 문자열로 저장된다.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.dialect = SQLiteDialect()
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'connects': 0, 'checkouts': 0}
+
+    def _connect(self):
+        import sqlite3
+
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+        # isolation_level=None: MySQL 백엔드와 같이 autocommit, 쓰기는 begin() 으로 트랜잭션 시작
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+        with self._lock:
+            self._stats['connects'] += 1
+            if _startup['first_connect_ms'] is None:
+                _startup['first_connect_ms'] = (time.perf_counter() - started) * 1000
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        with self._lock:
+            self._stats['checkouts'] += 1
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def begin(self, conn):
+        conn.execute("BEGIN")
+
+    def stream_cursor(self, conn):
+        # sqlite3 커서는 원래 fetchmany() 만큼만 단계 실행하므로 일반 커서로 충분
+        return conn.cursor()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+# 데이터 버전: 이 프로세스에서 쓰기 트랜잭션이 커밋될 때마다 1 씩 증가.
+# 캐시(utils/ledger_cache.py)는 이 값을 키에 포함시켜 쓰기 직후 자동으로 새 데이터를 읽는다.
+_data_version = 0
+_data_version_lock = threading.Lock()
+
+def get_data_version():
+    """
+    현재 데이터 버전을 반환
+
+    Returns:
+        int: 쓰기가 커밋될 때마다 증가하는 값
+    """
+    return _data_version
+
+def bump_data_version():
+    """
+    데이터 버전을 올려 버전 기반 캐시를 무효화 (외부에서 DB 를 직접 수정한 경우 등)
+
+    Returns:
+        int: 증가된 데이터 버전
+    """
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+        return _data_version
+
+def _register_sqlite_adapters():
+    """date / time 파라미터를 MySQL 과 같은 ISO 문자열로 저장"""
+    import sqlite3
+    from datetime import date, datetime, time as dt_time, timedelta
+
+    sqlite3.register_adapter(date, lambda v: v.isoformat())
+    sqlite3.register_adapter(datetime, lambda v: v.isoformat(sep=' '))
+    sqlite3.register_adapter(dt_time, lambda v: v.strftime('%H:%M:%S'))
+    sqlite3.register_adapter(
+        timedelta,
+        lambda v: f"{int(v.total_seconds()) // 3600:02d}:{int(v.total_seconds()) % 3600 // 60:02d}:{int(v.total_seconds()) % 60:02d}"
+    )
+
+def get_backend():
+    """
+    설정(DB_BACKEND)에 따라 선택된 저장소 백엔드를 반환 (최초 호출 시 생성)
+
+    Returns:
+        MySQLBackend | SQLiteBackend: 공용 백엔드
+    """
+    global _backend
+    if _backend is not None:
+        return _backend
+    with _backend_lock:
+        if _backend is None:
+            config = get_config()
+            if config['backend'] == 'sqlite':
+                _register_sqlite_adapters()
+                _backend = SQLiteBackend(config['sqlite_path'])
+            elif config['backend'] == 'mysql':
+                _backend = MySQLBackend()
+            else:
+                raise Exception(f"지원하지 않는 DB_BACKEND 입니다: {config['backend']}")
+    return _backend
+
+@contextmanager
+def transaction():
+    """
+    쓰기 트랜잭션 컨텍스트 매니저
+
+    방언 변환이 적용된 Cursor 를 yield 하며, 블록이 정상 종료되면 commit 후
+    데이터 버전을 올리고, 예외가 발생하면 rollback 한다.
+
+    Example:
+        with transaction() as cursor:
+            cursor.execute("UPDATE card SET memo = %s WHERE id = %s", ("메모", 1))
+    """
+    backend = get_backend()
+    started = time.perf_counter()
+    with backend.connection() as conn:
+        backend.begin(conn)
+        cursor = Cursor(conn.cursor(), backend.dialect, connect_ms=(time.perf_counter() - started) * 1000)
+        try:
+            yield cursor
+            conn.commit()
+            bump_data_version()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def get_pool_stats():
+    """
+    커넥션 풀(백엔드) 통계를 반환
+
+    Returns:
+        dict: MySQL 은 ConnectionPool.stats(), SQLite 는 connects/checkouts
+    """
+    return get_backend().stats()
+
+def get_startup_stats():
+    """
+    지연 초기화 단계별 소요 시간(ms)을 반환
+
+    Returns:
+        dict: import_ms (모듈 임포트), config_ms (.env 로드 및 설정 해석),
+              first_connect_ms (첫 DB 연결). 아직 일어나지 않은 단계는 None
+    """
+    return dict(_startup)
+
+# ==========================================
+# 쿼리 계측
+# ==========================================
+# 모든 조회/쓰기 호출마다 연결 대기(connect), 실행(execute), 결과 수신(fetch) 시간과
+# 행 수, 대략적인 결과 바이트 수를 정규화한 쿼리 지문(fingerprint) 단위로 기록한다.
+#   - 최근 QUERY_LOG_SIZE 건은 프로세스 안의 링 버퍼에 (get_query_log)
+#   - 지문별 누적 통계는 get_query_stats() 로 (utils/debug_panel.py 의 사이드바 패널)
+#   - SLOW_QUERY_MS 이상 걸린 호출은 SLOW_QUERY_LOG(JSONL)에 한 줄씩,
+#     SLOW_QUERY_EXPLAIN=1 이면 느린 SELECT 의 실행 계획도 함께 남김 (지문마다 EXPLAIN_INTERVAL 초에 한 번)
+# 로그에는 파라미터 값(메모 등)을 남기지 않는다.
+
+QUERY_LOG_SIZE = int(env.get('DB_QUERY_LOG_SIZE', 500))
+SLOW_QUERY_MS = float(env.get('DB_SLOW_QUERY_MS', 500))
+SLOW_QUERY_LOG = env.get('DB_SLOW_QUERY_LOG', os.path.join('data', 'slow_queries.jsonl'))
+SLOW_QUERY_EXPLAIN = env.get('DB_SLOW_QUERY_EXPLAIN', '0') == '1'
+EXPLAIN_INTERVAL = 600
+
+# 지문별 누적 통계를 보관할 최대 지문 수 (넘으면 가장 적게 쓰인 것부터 버림)
+_MAX_FINGERPRINTS = 1000
+
+_query_log = deque(maxlen=QUERY_LOG_SIZE)
+_query_stats = {}                    # 지문 -> 누적 통계
+_query_lock = threading.Lock()
+_slow_log_lock = threading.Lock()
+_explained = {}                      # 지문 -> 마지막 EXPLAIN 시각
+
+_FP_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_FP_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_FP_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_FP_PARAM = re.compile(r"%s|\?")
+_FP_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_FP_ROWS = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_FP_SPACE = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=512)
+def fingerprint_query(SQL):
+    """
+    쿼리를 지문으로 정규화 (리터럴/파라미터 -> ?, IN 목록/다중 행 VALUES 는 하나로, 공백 정리)
+
+    Example:
+        fingerprint_query("SELECT * FROM card WHERE id IN (%s, %s) AND cost > 100")
+        -> "SELECT * FROM card WHERE id IN (...) AND cost > ?"
+    """
+    text = _FP_COMMENT.sub(" ", SQL)
+    text = _FP_STRING.sub("?", text)
+    text = _FP_NUMBER.sub("?", text)
+    text = _FP_PARAM.sub("?", text)
+    text = _FP_ROWS.sub(r"\1, ...", text)
+    text = _FP_LIST.sub("(...)", text)
+    return _FP_SPACE.sub(" ", text).strip()
+
+def _frame_bytes(df):
+    """DataFrame 의 대략적인 크기 (object 컬럼은 앞 100개 값의 평균 크기로 추정)"""
+    import sys
+
+    total = 0
+    for name in df.columns:
+        values = df[name]
+        if values.dtype == object and len(values):
+            sample = values.iloc[:100]
+            total += int(sum(sys.getsizeof(value) for value in sample) / len(sample) * len(values))
+        else:
+            total += int(values.memory_usage(index=False))
+    return total
+
+class _QueryProbe:
+    """
+    쿼리 한 번의 단계별 시간 측정
+
+    mark('connect' | 'execute' | 'fetch') 는 직전 mark 이후 걸린 시간을 그 단계에 더하고,
+    finish() 가 기록을 남긴다 (두 번 불러도 한 번만 기록).
+    진행 중인 trace 가 있으면 시작부터 finish() 까지를 'sql.<kind>' span 으로도 남긴다.
+    """
+
+    __slots__ = ('SQL', 'params', 'kind', '_t0', '_last', 'times', 'rows', 'nbytes', '_done')
+
+    def __init__(self, SQL, params=None, kind='select'):
+        self.SQL = SQL
+        self.params = params
+        self.kind = kind
+        self._t0 = self._last = time.perf_counter()
+        self.times = {'connect': 0.0, 'execute': 0.0, 'fetch': 0.0}
+        self.rows = 0
+        self.nbytes = 0
+        self._done = False
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.times[stage] += now - self._last
+        self._last = now
+
+    def resume(self):
+        """다음 mark() 가 지금부터 잰 시간만 더하도록 (호출한 쪽이 쓴 시간은 빼기)"""
+        self._last = time.perf_counter()
+
+    def finish(self, rows=None, nbytes=None, error=None):
+        if self._done:
+            return
+        self._done = True
+        if rows is not None:
+            self.rows = rows
+        if nbytes is not None:
+            self.nbytes = nbytes
+        _record_query(self, error)
+
+def _record_query(probe, error=None):
+    fingerprint = fingerprint_query(probe.SQL)
+    record = {
+        'at': time.time(),
+        'fingerprint': fingerprint,
+        'kind': probe.kind,
+        'connect_ms': probe.times['connect'] * 1000,
+        'execute_ms': probe.times['execute'] * 1000,
+        'fetch_ms': probe.times['fetch'] * 1000,
+        'total_ms': sum(probe.times.values()) * 1000,
+        'rows': int(probe.rows or 0),
+        'bytes': int(probe.nbytes or 0),
+        'error': None if error is None else str(error),
+    }
+    with _query_lock:
+        _query_log.append(record)
+        stats = _query_stats.get(fingerprint)
+        if stats is None:
+            if len(_query_stats) >= _MAX_FINGERPRINTS:
+                del _query_stats[min(_query_stats, key=lambda key: _query_stats[key]['calls'])]
+            stats = _query_stats[fingerprint] = {
+                'fingerprint': fingerprint, 'kind': probe.kind, 'calls': 0, 'errors': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'connect_ms': 0.0, 'execute_ms': 0.0, 'fetch_ms': 0.0,
+                'rows': 0, 'bytes': 0, 'slow': 0,
+            }
+        stats['calls'] += 1
+        stats['errors'] += error is not None
+        stats['max_ms'] = max(stats['max_ms'], record['total_ms'])
+        for key in ('total_ms', 'connect_ms', 'execute_ms', 'fetch_ms', 'rows', 'bytes'):
+            stats[key] += record[key]
+        slow = record['total_ms'] >= SLOW_QUERY_MS
+        stats['slow'] += slow
+    trace.add_span(
+        f"sql.{probe.kind}", probe._t0, time.perf_counter(), query=fingerprint, rows=record['rows'],
+        connect_ms=round(record['connect_ms'], 3), execute_ms=round(record['execute_ms'], 3),
+        fetch_ms=round(record['fetch_ms'], 3), error=record['error'],
+    )
+    if slow:
+        _log_slow_query(record, probe)
+
+def _explain(SQL, params):
+    """SELECT 의 실행 계획 (계측하지 않는 별도 커서로 실행)"""
+    backend = get_backend()
+    prefix = "EXPLAIN QUERY PLAN" if backend.dialect.name == 'sqlite' else "EXPLAIN"
+    query = backend.dialect.translate(f"{prefix} {SQL}", params)
+    with backend.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if params is None:
+                cursor.execute(query)
+            else:
+                cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [
+                {name: None if value is None else str(value) for name, value in zip(columns, row)}
+                for row in cursor.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+def _log_slow_query(record, probe):
+    entry = dict(record)
+    if SLOW_QUERY_EXPLAIN and probe.kind in ('select', 'stream') and record['error'] is None:
+        now = time.monotonic()
+        with _query_lock:
+            due = now - _explained.get(record['fingerprint'], -EXPLAIN_INTERVAL) >= EXPLAIN_INTERVAL
+            if due:
+                _explained[record['fingerprint']] = now
+        if due:
+            try:
+                entry['plan'] = _explain(probe.SQL, probe.params)
+            except Exception as e:
+                entry['plan_error'] = str(e)
+    if not SLOW_QUERY_LOG:
+        return
+    try:
+        import json
+
+        directory = os.path.dirname(SLOW_QUERY_LOG)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with _slow_log_lock, open(SLOW_QUERY_LOG, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"느린 쿼리 로그 기록 실패: {e}")
+
+def get_query_log(limit=None):
+    """
+    최근 쿼리 기록 (링 버퍼, 오래된 것부터)
+
+    Args:
+        limit (int, optional): 최근 limit 건만
+
+    Returns:
+        list[dict]: at, fingerprint, kind, connect_ms, execute_ms, fetch_ms, total_ms, rows, bytes, error
+    """
+    with _query_lock:
+        records = list(_query_log)
+    return records[-limit:] if limit else records
+
+def get_query_stats(top=None, sort_by='total_ms'):
+    """
+    쿼리 지문별 누적 통계 (프로세스 시작 이후)
+
+    Args:
+        top (int, optional): 상위 top 개만
+        sort_by (str): 정렬 기준 (total_ms, calls, max_ms, rows, bytes 등)
+
+    Returns:
+        list[dict]: fingerprint, kind, calls, errors, slow, total_ms, mean_ms, max_ms,
+                    connect_ms, execute_ms, fetch_ms, rows, bytes (sort_by 내림차순)
+    """
+    with _query_lock:
+        stats = [dict(entry) for entry in _query_stats.values()]
+    for entry in stats:
+        entry['mean_ms'] = entry['total_ms'] / entry['calls']
+    stats.sort(key=lambda entry: entry[sort_by], reverse=True)
+    return stats[:top] if top else stats
+
+def reset_query_stats():
+    """링 버퍼와 누적 통계를 비움"""
+    with _query_lock:
+        _query_log.clear()
+        _query_stats.clear()
+        _explained.clear()
+
+def get_data(SQL: str, params=None):
     """
     SELECT 쿼리를 실행하고 DataFrame으로 반환
     
     Args:
-        SQL (str): 실행할 SELECT 쿼리
+        SQL (str): 실행할 SELECT 쿼리 (MySQL 문법, 백엔드에 맞게 변환됨)
+        params (tuple, optional): 쿼리 파라미터
     
     Returns:
         pd.DataFrame: 조회 결과
     """
-    conn = None
+    probe = _QueryProbe(SQL, params)
     try:
-        conn = get_connection()
-        df = pd.read_sql(SQL, conn)
+        backend = get_backend()
+        query = backend.dialect.translate(SQL, params)
+        with backend.connection() as conn:
+            probe.mark('connect')
+            # pd.read_sql(DBAPI 연결) 과 같은 변환을 직접 해서 실행/수신 시간을 나눠 잼
+            cursor = conn.cursor()
+            try:
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+                probe.mark('execute')
+                columns = [column[0] for column in cursor.description]
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        probe.mark('fetch')
+        probe.finish(rows=len(df), nbytes=_frame_bytes(df))
         return df
     except Exception as e:
+        probe.finish(error=e)
+        raise Exception(f"데이터 조회 오류: {e}")
+
+# ==========================================
+# Arrow 조회 (선언된 스키마로 열 단위 변환)
+# ==========================================
+# pd.read_sql 은 DBAPI 행을 파이썬 객체 그대로 object 컬럼에 담는다
+# (SUM() 은 decimal.Decimal, DATE 는 datetime.date, TIME 은 timedelta).
+# fetch_arrow() 는 결과를 컬럼별로 한 번에 Arrow 배열로 변환하고 타입을 고정한다.
+#   int64 / float64 / string / category(사전 인코딩) / date(date32) / time(하루 중 초, int64) / timestamp
+
+# MySQL 결과 컬럼 타입 코드 (pymysql.constants.FIELD_TYPE) -> 변환 타입
+_MYSQL_FIELD_TYPES = {
+    0: 'decimal', 246: 'decimal',                                         # DECIMAL, NEWDECIMAL (SUM 결과 포함)
+    1: 'int64', 2: 'int64', 3: 'int64', 8: 'int64', 9: 'int64', 13: 'int64',  # TINY ~ LONGLONG, INT24, YEAR
+    4: 'float64', 5: 'float64',                                           # FLOAT, DOUBLE
+    10: 'date', 14: 'date',                                               # DATE, NEWDATE
+    11: 'time',                                                           # TIME
+    7: 'timestamp', 12: 'timestamp',                                      # TIMESTAMP, DATETIME
+}
+
+# 컬럼 타입 정보가 없는 SQLite 결과에서 이름으로 추정하는 타입
+_COLUMN_HINTS = {'date': 'date', 'day': 'date', 'time': 'time'}
+
+def _column_kind(column, schema, dialect_name):
+    """description 한 항목과 선언된 schema 로 변환 타입을 결정 (모르면 None: Arrow 추론)"""
+    name, type_code = column[0], column[1]
+    if schema and name in schema:
+        return schema[name]
+    if dialect_name == 'mysql' and type_code in _MYSQL_FIELD_TYPES:
+        kind = _MYSQL_FIELD_TYPES[type_code]
+        if kind == 'decimal':
+            # 소수 자릿수가 0 인 DECIMAL(SUM(정수) 등)은 정수로
+            return 'int64' if not column[5] else 'float64'
+        return kind
+    return _COLUMN_HINTS.get(name)
+
+def _seconds_from_text(array):
+    """'HH:MM' / 'HH:MM:SS' 문자열 배열을 하루 중 초(int64)로 변환"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    short = pc.equal(pc.count_substring(array, ':'), 1)
+    text = pc.if_else(short, pc.binary_join_element_wise(array, ':00', ''), array)
+    stamp = pc.strptime(
+        pc.binary_join_element_wise('1970-01-01 ', text, ''), '%Y-%m-%d %H:%M:%S', 's', error_is_null=True
+    )
+    return stamp.cast(pa.int64())
+
+def _arrow_column(values, kind):
+    """
+    한 컬럼의 파이썬 값 목록을 kind 타입의 Arrow 배열로 변환
+
+    Args:
+        values (Sequence): DBAPI 가 돌려준 한 컬럼의 값들
+        kind (str | None): ARROW 변환 타입 (None 이면 Arrow 가 추론)
+
+    Returns:
+        pa.Array
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if kind in ('string', 'category'):
+        try:
+            array = pa.array(values, type=pa.string())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            array = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+        return array.dictionary_encode() if kind == 'category' else array
+
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite 처럼 한 컬럼에 여러 타입이 섞인 경우는 문자열로 받은 뒤 변환
+        array = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+    if kind is None:
+        return array
+    if kind == 'int64':
+        return array.cast(pa.int64())
+    if kind == 'float64':
+        return array.cast(pa.float64())
+    if kind == 'date':
+        if pa.types.is_string(array.type):
+            array = pc.utf8_slice_codeunits(array, 0, 10)
+        return array.cast(pa.date32())
+    if kind == 'time':
+        if pa.types.is_duration(array.type):
+            per_second = {'s': 1, 'ms': 1_000, 'us': 1_000_000, 'ns': 1_000_000_000}[array.type.unit]
+            return pc.divide(array.cast(pa.int64()), per_second)
+        if pa.types.is_string(array.type):
+            return _seconds_from_text(array)
+        return array.cast(pa.int64())
+    if kind == 'timestamp':
+        return array.cast(pa.timestamp('us'))
+    raise ValueError(f"알 수 없는 컬럼 타입: {kind}")
+
+def fetch_arrow(SQL: str, params=None, schema=None):
+    """
+    SELECT 쿼리를 실행하고 pyarrow.Table 로 반환
+
+    Args:
+        SQL (str): 실행할 SELECT 쿼리 (MySQL 문법, 백엔드에 맞게 변환됨)
+        params (tuple, optional): 쿼리 파라미터
+        schema (dict, optional): 컬럼명 -> 변환 타입
+                                 ('int64', 'float64', 'string', 'category', 'date', 'time', 'timestamp').
+                                 지정하지 않은 컬럼은 MySQL 컬럼 타입(또는 컬럼 이름)으로 정함
+
+    Returns:
+        pa.Table: 조회 결과
+
+    Raises:
+        Exception: 쿼리 실행 중 오류 발생 시
+    """
+    probe = _QueryProbe(SQL, params)
+    try:
+        backend = get_backend()
+        query = backend.dialect.translate(SQL, params)
+        with backend.connection() as conn:
+            probe.mark('connect')
+            cursor = conn.cursor()
+            try:
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+                probe.mark('execute')
+                description = cursor.description
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        table = _rows_to_table(rows, description, schema, backend.dialect.name)
+        probe.mark('fetch')
+        probe.finish(rows=table.num_rows, nbytes=table.nbytes)
+        return table
+    except Exception as e:
+        probe.finish(error=e)
+        raise Exception(f"데이터 조회 오류: {e}")
+
+def _rows_to_table(rows, description, schema, dialect_name):
+    """DBAPI 행 목록을 열 단위로 변환해 pa.Table 로 만듦"""
+    import pyarrow as pa
+
+    # 행(tuple) 목록을 2차원 object 배열로 한 번에 옮긴 뒤 열 단위로 잘라 변환
+    if rows:
+        matrix = np.empty((len(rows), len(description)), dtype=object)
+        matrix[:] = rows
+    else:
+        matrix = np.empty((0, len(description)), dtype=object)
+    arrays = [
+        _arrow_column(matrix[:, i], _column_kind(column, schema, dialect_name))
+        for i, column in enumerate(description)
+    ]
+    return pa.Table.from_arrays(arrays, names=[column[0] for column in description])
+
+def get_frame(SQL: str, params=None, schema=None, arrow_dtypes=False):
+    """
+    fetch_arrow() 결과를 DataFrame 으로 반환 (get_data 의 타입 고정 버전)
+
+    Args:
+        SQL (str): 실행할 SELECT 쿼리
+        params (tuple, optional): 쿼리 파라미터
+        schema (dict, optional): fetch_arrow() 참고
+        arrow_dtypes (bool): True 면 pd.ArrowDtype 컬럼 (Arrow 버퍼를 그대로 사용),
+                             False 면 NumPy 컬럼 (date 는 datetime64, category 는 범주형)
+
+    Returns:
+        pd.DataFrame: 조회 결과
+    """
+    table = fetch_arrow(SQL, params, schema)
+    if arrow_dtypes:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas(date_as_object=False)
+
+# ==========================================
+# 스트리밍 조회 (고정 크기 청크)
+# ==========================================
+# get_data / get_frame 은 결과 전체를 드라이버 버퍼와 DataFrame 에 두 번 올린다.
+# iter_frames / iter_batches 는 서버 측 커서(MySQL SSCursor, SQLite 는 fetchmany)로
+# chunk_size 행씩 가져와 변환하므로, 집계를 청크마다 누적하면 메모리가 청크 크기로 묶인다.
+
+STREAM_CHUNK_SIZE = int(env.get('DB_STREAM_CHUNK_SIZE', 50_000))
+
+def iter_batches(SQL: str, params=None, chunk_size=None, schema=None):
+    """
+    SELECT 결과를 chunk_size 행씩 pyarrow.RecordBatch 로 돌려주는 제너레이터
+
+    결과를 끝까지 읽는 동안 연결 하나를 점유한다. 중간에 멈추면(break / close())
+    남은 결과를 비우고 연결을 반납한다.
+
+    Args:
+        SQL (str): 실행할 SELECT 쿼리 (MySQL 문법, 백엔드에 맞게 변환됨)
+        params (tuple, optional): 쿼리 파라미터
+        chunk_size (int, optional): 청크당 행 수 (기본값: DB_STREAM_CHUNK_SIZE, 50,000)
+        schema (dict, optional): fetch_arrow() 참고
+
+    Yields:
+        pa.RecordBatch: 최대 chunk_size 행 (청크마다 같은 컬럼 타입)
+
+    Raises:
+        Exception: 쿼리 실행 중 오류 발생 시
+
+    Example:
+        total = 0
+        for batch in iter_batches("SELECT cost FROM card"):
+            total += pyarrow.compute.sum(batch.column('cost')).as_py() or 0
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    # fetch 시간은 청크를 받고 변환하는 시간만 (호출한 쪽이 청크를 처리하는 시간은 빼고) 더함
+    probe = _QueryProbe(SQL, params, 'stream')
+    try:
+        backend = get_backend()
+        query = backend.dialect.translate(SQL, params)
+        with backend.connection() as conn:
+            probe.mark('connect')
+            cursor = backend.stream_cursor(conn)
+            try:
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+                probe.mark('execute')
+                description = cursor.description
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    table = _rows_to_table(rows, description, schema, backend.dialect.name)
+                    del rows
+                    probe.mark('fetch')
+                    probe.rows += table.num_rows
+                    probe.nbytes += table.nbytes
+                    for batch in table.to_batches(max_chunksize=chunk_size):
+                        yield batch
+                    probe.resume()
+            finally:
+                cursor.close()
+        probe.finish()
+    except Exception as e:
+        probe.finish(error=e)
         raise Exception(f"데이터 조회 오류: {e}")
     finally:
-        if conn:
-            conn.close()
+        # 중간에 멈춘 경우(GeneratorExit)에도 읽은 만큼 기록
+        probe.finish()
+
+def iter_frames(SQL: str, params=None, chunk_size=None, schema=None, arrow_dtypes=False):
+    """
+    iter_batches() 의 DataFrame 버전
+
+    Args:
+        SQL (str): 실행할 SELECT 쿼리
+        params (tuple, optional): 쿼리 파라미터
+        chunk_size (int, optional): 청크당 행 수
+        schema (dict, optional): fetch_arrow() 참고
+        arrow_dtypes (bool): get_frame() 참고
+
+    Yields:
+        pd.DataFrame: 최대 chunk_size 행
+    """
+    for batch in iter_batches(SQL, params, chunk_size, schema):
+        if arrow_dtypes:
+            yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            yield batch.to_pandas(date_as_object=False)
 
 def execute_query(query, params=None):
     """
@@ -91,30 +1253,16 @@ def execute_query(query, params=None):
             ("2024년 예산", "2024-01-15", 50000)
         )
     """
-    conn = None
-    cursor = None
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        if params:
-            affected_rows = cursor.execute(query, params)
-        else:
-            affected_rows = cursor.execute(query)
-        
-        conn.commit()
+        with transaction() as cursor:
+            if params:
+                affected_rows = cursor.execute(query, params)
+            else:
+                affected_rows = cursor.execute(query)
         return affected_rows
         
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise Exception(f"쿼리 실행 오류: {e}")
-        
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 def execute_many(query, data_list):
     """
@@ -140,65 +1288,335 @@ def execute_many(query, data_list):
             data
         )
     """
-    conn = None
-    cursor = None
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        affected_rows = cursor.executemany(query, data_list)
-        conn.commit()
+        with transaction() as cursor:
+            affected_rows = cursor.executemany(query, data_list)
         return affected_rows
         
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise Exception(f"배치 쿼리 실행 오류: {e}")
-        
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+# ==========================================
+# 증분 동기화 (변경 워터마크)
+# ==========================================
+# card 에 updated_at 컬럼과 삭제 기록(card_tombstone) 테이블을 두고 (utils/migrate.py 003),
+# 마지막으로 읽은 시점 이후 바뀐 행만 가져와 보관 중인 DataFrame 에 병합한다.
+
+class IncrementalSnapshot:
+    """
+    card 테이블의 마지막 스냅샷을 보관하고 변경분만 가져와 병합하는 증분 조회
+
+    워터마크는 (마지막으로 본 최대 id, 최대 updated_at, 처리한 tombstone seq) 이다.
+    - 새로 추가/수정된 행: id > :max_id OR updated_at > :max_updated_at
+      (변경분은 id 로 중복 제거 후 병합되므로 같은 행을 다시 읽어도 안전)
+    - 삭제된 행: card_tombstone.seq > :tombstone_seq
+
+    워터마크와 같은 시각에 늦게 커밋된 수정처럼 드물게 놓칠 수 있는 변경에 대비해
+    full_resync 초마다 한 번은 전체 조회로 스냅샷을 다시 맞춘다.
+    스키마를 준비할 수 없는 환경(권한 부족 등)에서는 매번 전체 조회로 동작한다.
+
+    transform 을 주면 조회한 행(전체/변경분)을 병합 전에 변환한다 (예: utils.ledger.coerce).
+    이때 변경분 병합은 concat(프레임 목록) 으로 하고, sort_by 컬럼 기준으로 정렬한다.
+
+    Example:
+        snapshot = IncrementalSnapshot()
+        df = snapshot.refresh()   # 최초: 전체 조회, 이후: 변경분만
+    """
+
+    COLUMNS = ['id', 'date', 'time', 'category', 'reason', 'cost', 'memo']
+
+    def __init__(self, full_resync=600, transform=None, concat=None, sort_by=('date', 'time')):
+        self.full_resync = full_resync
+        self.transform = transform
+        self.concat = concat or (lambda frames: pd.concat(frames, ignore_index=True))
+        self.sort_by = list(sort_by)
+        self._full_loaded_at = 0.0
+        self._full_loaded_wall = 0.0
+        self._df = None
+        self._max_id = 0
+        self._max_updated_at = None
+        self._tombstone_seq = 0
+        self.incremental = None   # None: 아직 스키마 확인 전
+        self.last_stats = {}
+        self.totals = {'full_loads': 0, 'delta_loads': 0, 'rows_fetched': 0}
+
+    # 마지막 조회 이후 추가/수정된 행 (파라미터: max_id, max_updated_at)
+    DELTA_WHERE = "WHERE id > %s OR updated_at > %s"
+
+    @classmethod
+    def select_sql(cls, where=''):
+        return f"SELECT {', '.join(cls.COLUMNS)}, updated_at FROM card {where}"
+
+    def _sorted(self, df):
+        if df.empty:
+            return df.reset_index(drop=True)
+        return df.sort_values(self.sort_by, ascending=False, kind='stable').reset_index(drop=True)
+
+    def _transformed(self, df):
+        if self.transform is None or df.empty:
+            return df
+        return self.transform(df)
+
+    def _advance(self, df):
+        if df.empty:
+            return
+        self._max_id = max(self._max_id, int(df['id'].max()))
+        latest = df['updated_at'].max()
+        if hasattr(latest, 'to_pydatetime'):
+            latest = latest.to_pydatetime()
+        if self._max_updated_at is None or latest > self._max_updated_at:
+            self._max_updated_at = latest
+
+    def _full_load(self):
+        if self.incremental:
+            # 전체 조회 중 일어난 삭제를 놓치지 않도록 tombstone 위치를 먼저 기록
+            seq = get_frame("SELECT COALESCE(MAX(seq), 0) AS seq FROM card_tombstone")
+            self._tombstone_seq = int(seq['seq'].iloc[0])
+            df, rows = self._stream(self.select_sql())
+        else:
+            df, rows = self._stream(f"SELECT {', '.join(self.COLUMNS)} FROM card")
+        self._df = self._sorted(df)
+        self._full_loaded_at = time.monotonic()
+        self._full_loaded_wall = time.time()
+        self.totals['full_loads'] += 1
+        self.totals['rows_fetched'] += rows
+        self.last_stats = {'mode': 'full', 'rows': rows, 'deleted': 0}
+
+    def _stream(self, SQL):
+        """
+        전체 조회를 청크 단위로 읽어 워터마크 갱신과 변환을 청크마다 처리
+        (변환 전 원본 전체를 한꺼번에 메모리에 올리지 않음)
+
+        Returns:
+            tuple: (병합된 DataFrame, 읽은 행 수)
+        """
+        frames, rows = [], 0
+        for chunk in iter_frames(SQL):
+            if 'updated_at' in chunk:
+                self._advance(chunk)
+            rows += len(chunk)
+            frames.append(self._transformed(chunk))
+        if not frames:
+            return pd.DataFrame(), 0
+        return self.concat(frames), rows
+
+    def _delta_load(self):
+        if self._max_updated_at is None:
+            changed = get_frame(self.select_sql("WHERE id > %s"), (self._max_id,))
+        else:
+            changed = get_frame(
+                self.select_sql(self.DELTA_WHERE),
+                (self._max_id, self._max_updated_at)
+            )
+        tombstones = get_frame(
+            "SELECT seq, card_id FROM card_tombstone WHERE seq > %s ORDER BY seq",
+            (self._tombstone_seq,)
+        )
+
+        deleted_ids = set(tombstones['card_id'].tolist()) if not tombstones.empty else set()
+        df = self._df
+        if not changed.empty or deleted_ids:
+            stale = set(changed['id'].tolist()) | deleted_ids
+            if not df.empty:
+                df = df[~df['id'].isin(stale)]
+            if not changed.empty:
+                fresh = self._transformed(changed[~changed['id'].isin(deleted_ids)])
+                if not fresh.empty:
+                    df = self._sorted(self.concat([df, fresh]))
+            self._df = df
+        if not tombstones.empty:
+            self._tombstone_seq = int(tombstones['seq'].max())
+        self._advance(changed)
+
+        self.totals['delta_loads'] += 1
+        self.totals['rows_fetched'] += len(changed) + len(tombstones)
+        self.last_stats = {'mode': 'delta', 'rows': len(changed), 'deleted': len(deleted_ids)}
+
+    def refresh(self):
+        """
+        변경분을 반영한 최신 스냅샷을 반환
+
+        Returns:
+            pd.DataFrame: id, date, time, category, reason, cost, memo (+ updated_at) 컬럼,
+                          date DESC, time DESC 정렬 (transform 이 있으면 변환된 컬럼)
+        """
+        if self.incremental is None:
+            try:
+                import utils.migrate as migrate
+
+                migrate.require_migrated()
+                self.incremental = True
+            except Exception as e:
+                print(f"증분 동기화를 사용할 수 없어 전체 조회로 동작합니다: {e}")
+                self.incremental = False
+
+        with trace.span('snapshot.refresh') as attrs:
+            if self._df is None or not self.incremental or self.resync_due():
+                self._full_load()
+            else:
+                self._delta_load()
+            if attrs is not None:
+                attrs.update(self.last_stats)
+        return self._df
+
+    def resync_due(self):
+        """마지막 전체 조회 후 full_resync 초가 지났는지 (아직 읽은 적이 없으면 False)"""
+        if self._df is None or not self.full_resync:
+            return False
+        return time.monotonic() - self._full_loaded_at > self.full_resync
+
+    def watermark(self):
+        """
+        현재 워터마크 (seed() 로 다른 프로세스에서 이어 받을 수 있는 값)
+
+        Returns:
+            dict: max_id, max_updated_at, tombstone_seq, full_loaded_at (전체 조회 시각, epoch 초)
+        """
+        return {
+            'max_id': self._max_id,
+            'max_updated_at': self._max_updated_at,
+            'tombstone_seq': self._tombstone_seq,
+            'full_loaded_at': self._full_loaded_wall,
+        }
+
+    def seed(self, df, watermark):
+        """
+        이미 만들어진 스냅샷(df)과 그 워터마크로 시작 (이후 refresh() 는 변경분만 조회)
+
+        Args:
+            df (pd.DataFrame): refresh() 가 돌려주는 것과 같은 모양의 프레임
+            watermark (dict): watermark() 가 돌려준 값
+        """
+        self._df = df
+        self._max_id = int(watermark['max_id'])
+        self._max_updated_at = watermark['max_updated_at']
+        self._tombstone_seq = int(watermark['tombstone_seq'])
+        self._full_loaded_wall = float(watermark['full_loaded_at'])
+        self._full_loaded_at = time.monotonic() - max(0.0, time.time() - self._full_loaded_wall)
+        self.last_stats = {'mode': 'seed', 'rows': 0, 'deleted': 0}
+
+    def reset(self):
+        """보관 중인 스냅샷을 버려 다음 refresh() 가 전체 조회하도록 함"""
+        self._df = None
+        self._max_id = 0
+        self._max_updated_at = None
+        self._tombstone_seq = 0
+
+# ==========================================
+# 대시보드 요약 (main.py)
+# ==========================================
+
+# 교관이 '낭비(충동+게으름)'로 규정한 중분류
+WASTE_REASONS = (
+    '배달/야식', '카페/간식', '술/유흥', '패션/미용',
+    '가전/가구', '택시/호출', '데이트/모임', '영화/공연', '여행'
+)
+
+_WASTE_PLACEHOLDERS = ', '.join(['%s'] * len(WASTE_REASONS))
+
+# 한 달 중분류별 합계/낭비 합계/건수 (card_daily_rollup = utils/rollup.py ROLLUP_TABLE)
+# 파라미터: (*WASTE_REASONS, 시작일, 다음 달 1일)
+MONTH_SUMMARY_SQL = f"""
+    SELECT reason,
+           SUM(total_cost) AS total_cost,
+           SUM(CASE WHEN reason IN ({_WASTE_PLACEHOLDERS}) THEN total_cost ELSE 0 END) AS waste_cost,
+           SUM(cnt) AS row_count
+    FROM card_daily_rollup
+    WHERE day >= %s AND day < %s
+    GROUP BY reason
+"""
+
+# 롤업 테이블이 아직 없을 때(마이그레이션 전) card 를 직접 집계하는 같은 모양의 쿼리
+MONTH_SUMMARY_CARD_SQL = f"""
+    SELECT reason,
+           COALESCE(SUM(cost), 0) AS total_cost,
+           COALESCE(SUM(CASE WHEN reason IN ({_WASTE_PLACEHOLDERS}) THEN cost ELSE 0 END), 0) AS waste_cost,
+           COUNT(*) AS row_count
+    FROM card
+    WHERE date >= %s AND date < %s
+    GROUP BY reason
+"""
+
+# 데이터 버전은 이 프로세스의 쓰기만 반영하므로 다른 프로세스의 쓰기를 위해 TTL 도 둔다
+SUMMARY_CACHE_TTL = float(env.get('LEDGER_CACHE_TTL', 10))
+
+_summary_cache = OrderedDict()   # (month, data_version) -> (loaded_at, summary)
+_summary_lock = threading.Lock()
+_SUMMARY_CACHE_SIZE = 24
+
+def get_month_summary(month=None):
+    """
+    한 달의 소비 요약을 한 번의 쿼리로 조회 (월 + 데이터 버전 기준, SUMMARY_CACHE_TTL 초 캐시)
+
+    일별 롤업 테이블에서 중분류별 합계와 낭비 합계(조건부 집계), 건수를 함께 읽으므로
+    캐시가 비어 있어도 DB 왕복은 한 번, 캐시가 있으면 0 번이다.
+    스키마는 바꾸지 않는다: 스키마 버전상 롤업 테이블이 아직 없으면(python -m utils.migrate 전) card 를 직접 집계한다.
+
+    Args:
+        month (str, optional): 'YYYY-MM' (기본값: 이번 달)
+
+    Returns:
+        dict: month, total (총 소비), waste (낭비 소비), rows (건수),
+              by_reason (reason, total_cost, waste_cost, row_count 컬럼의 DataFrame)
+    """
+    if month is None:
+        month = datetime.now().strftime('%Y-%m')
+    key = (month, get_data_version())
+    with _summary_lock:
+        entry = _summary_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < SUMMARY_CACHE_TTL:
+            _summary_cache.move_to_end(key)
+            return entry[1]
+
+    year, mon = (int(part) for part in month.split('-'))
+    start = f"{year}-{mon:02d}-01"
+    end = f"{year + mon // 12}-{mon % 12 + 1:02d}-01"
+    params = (*WASTE_REASONS, start, end)
+    schema = {'total_cost': 'int64', 'waste_cost': 'int64', 'row_count': 'int64'}
+    import utils.migrate as migrate   # migrate 가 handle_sql 을 임포트하므로 지연 임포트
+
+    # 롤업 테이블 유무는 스키마 버전으로만 판단 (연결/권한 오류는 그대로 올려 보냄)
+    SQL = MONTH_SUMMARY_SQL if migrate.schema_version() >= migrate.ROLLUP_VERSION else MONTH_SUMMARY_CARD_SQL
+    by_reason = get_frame(SQL, params, schema=schema)
+    by_reason = by_reason[by_reason['row_count'] > 0].reset_index(drop=True)
+
+    summary = {
+        'month': month,
+        'total': int(by_reason['total_cost'].sum()),
+        'waste': int(by_reason['waste_cost'].sum()),
+        'rows': int(by_reason['row_count'].sum()),
+        'by_reason': by_reason,
+    }
+    with _summary_lock:
+        _summary_cache[key] = (time.monotonic(), summary)
+        _summary_cache.move_to_end(key)
+        while len(_summary_cache) > _SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    return summary
 
 def init_database():
     """
     데이터베이스 테이블 초기화 함수
-    sample 테이블이 없으면 생성
+    card 와 부속 테이블/인덱스를 최신 스키마 버전까지 마이그레이션 (utils/migrate.py)
+    페이지 요청 경로는 DDL 을 실행하지 않고 스키마 버전만 확인하므로(migrate.require_migrated)
+    배포 시 이 함수나 python -m utils.migrate 로 한 번 실행한다.
     """
-    conn = None
-    cursor = None
+    import utils.migrate as migrate
+
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # sample 테이블 생성
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sample (
-                id BIGINT AUTO_INCREMENT PRIMARY KEY,
-                date DATE,
-                time TIME,
-                category VARCHAR(50),
-                reason VARCHAR(50),
-                cost BIGINT,
-                memo VARCHAR(50),
-                INDEX idx_date (date)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-        ''')
-        
-        conn.commit()
-        print("✅ 데이터베이스 초기화 완료")
-        
+        applied = migrate.upgrade()
+        print(f"✅ 데이터베이스 초기화 완료 (적용한 마이그레이션: {len(applied)}개)")
+
     except Exception as e:
         print(f"❌ 데이터베이스 초기화 오류: {e}")
-        if conn:
-            conn.rollback()
-            
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # 모듈 임포트 시 테이블 자동 생성
-# init_database()  # 이미 테이블이 존재하므로 주석 처리
\ No newline at end of file
+# init_database()  # 이미 테이블이 존재하므로 주석 처리
+
+# 모듈 임포트 비용 (ms). 임포트 시점에는 I/O 가 없으므로 순수 파이썬/pandas 로딩 비용만 포함
+IMPORT_TIME_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+_startup['import_ms'] = IMPORT_TIME_MS
+
+if __name__ == "__main__":
+    # python -m utils.handle_sql : 임포트 비용 확인용
+    print(f"handle_sql import: {IMPORT_TIME_MS:.1f} ms")
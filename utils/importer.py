@@ -0,0 +1,370 @@
+import argparse
+import csv
+import functools
+import hashlib
+import itertools
+import os
+import re
+import sqlite3
+import time
+from datetime import date as _date
+
+import utils.env as env
+import utils.dedupe as dedupe
+import utils.handle_sql as handle_sql
+import utils.migrate as migrate
+import utils.rollup as rollup
+
+# 카드사/가계부 내보내기 CSV 를 card 테이블로 대량 가져오기.
+#
+#   python -m utils.importer data/card.csv data/example_data.csv [--batch-size 20000] [--statement-rows 1000]
+#                            [--restart] [--dry-run] [--defer-indexes | --no-defer-indexes]
+#
+# - 영문 헤더(date, time, ...)와 한글 헤더(날짜, 시간, 카테고리(1차 카테고리), ...), BOM 을 모두 받는다.
+# - 파일을 한 줄씩 읽으며 정규화하고, batch-size 행마다 한 트랜잭션으로 다중 행 INSERT 를 실행한다.
+#   롤업(utils/rollup.py) 변화량과 진행 기록(import_progress)도 같은 트랜잭션에서 갱신하므로
+#   중간에 실패해도 마지막으로 커밋된 청크 다음부터 다시 시작할 수 있다.
+# - 행마다 지문(utils/dedupe.py)을 계산해 파일 안이나 card 에 이미 있는 내역은 건너뛴다
+#   (같은 명세서를 다시 가져와도 중복이 생기지 않음).
+# - 큰 파일은 보조 인덱스를 내리고 넣은 뒤 한 번에 다시 만든다 (행마다 인덱스를 갱신하는 것보다 빠름).
+
+CARD_COLUMNS = ('date', 'time', 'category', 'reason', 'cost', 'memo')
+INSERT_COLUMNS = CARD_COLUMNS + ('fingerprint',)
+REQUIRED_COLUMNS = ('date', 'category', 'reason', 'cost')
+
+# 정규화한 헤더 이름 -> card 컬럼 (괄호 안 설명과 공백은 정규화 단계에서 제거)
+HEADER_ALIASES = {
+    'date': 'date', '날짜': 'date', '일자': 'date', '거래일': 'date', '거래일자': 'date',
+    'time': 'time', '시간': 'time', '시각': 'time', '거래시간': 'time',
+    'category': 'category', '카테고리': 'category', '대분류': 'category', '1차카테고리': 'category',
+    'reason': 'reason', '사유': 'reason', '중분류': 'reason', '소분류': 'reason', '2차카테고리': 'reason',
+    'cost': 'cost', 'amount': 'cost', '비용': 'cost', '금액': 'cost', '이용금액': 'cost',
+    'memo': 'memo', '메모': 'memo', '가맹점': 'memo', '가맹점명': 'memo', '비고': 'memo',
+}
+
+BATCH_SIZE = int(env.get('IMPORT_BATCH_SIZE', 20000))
+STATEMENT_ROWS = 1000
+# 이보다 많은 행을 (기존 card 행 수 이상으로) 넣을 때는 보조 인덱스를 내렸다가 끝나고 다시 만든다
+DEFER_INDEX_ROWS = 200_000
+
+_HEADER_NOISE = re.compile(r"\(.*?\)|\s+")
+
+def normalize_header(name):
+    """헤더 이름에서 BOM, 괄호 설명, 공백을 지우고 소문자로 ('카테고리(1차 카테고리)' -> '카테고리')"""
+    return _HEADER_NOISE.sub('', name.lstrip('\ufeff')).lower()
+
+def resolve_columns(header):
+    """
+    CSV 헤더에서 card 컬럼별 위치를 찾음
+
+    Args:
+        header (list[str]): CSV 첫 줄
+
+    Returns:
+        list[int | None]: CARD_COLUMNS 순서의 열 번호 (없는 선택 컬럼은 None)
+
+    Raises:
+        ValueError: 필수 컬럼(date, category, reason, cost)이 없는 경우
+    """
+    positions = {}
+    for index, name in enumerate(header):
+        column = HEADER_ALIASES.get(normalize_header(name))
+        if column and column not in positions:
+            positions[column] = index
+    missing = [column for column in REQUIRED_COLUMNS if column not in positions]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)} (헤더: {header})")
+    return [positions.get(column) for column in CARD_COLUMNS]
+
+def _parse_date(text):
+    if len(text) != 10 or text[4] != '-':
+        text = text.strip()
+    if len(text) != 10 or text[4] != '-':
+        # '2025.1.5', '2025/01/05', '2025-01-05 12:00' 등
+        parts = re.split(r"[./-]", text.split()[0])
+        if len(parts) != 3:
+            raise ValueError(f"날짜 형식 오류: {text!r}")
+        text = f"{int(parts[0]):04d}-{int(parts[1]):02d}-{int(parts[2]):02d}"
+    _date.fromisoformat(text)   # 존재하지 않는 날짜 거부
+    return text
+
+# 'HH:MM' / 'H:MM' -> 'HH:MM:SS' (하루 1440가지뿐이므로 미리 만든 표로 바로 찾음)
+_MINUTES = {
+    f"{hour:{width}}:{minute:02d}": f"{hour:02d}:{minute:02d}:00"
+    for hour in range(24) for minute in range(60) for width in ('02d', 'd')
+}
+
+def _parse_time(text):
+    normalized = _MINUTES.get(text)
+    if normalized is not None:
+        return normalized
+    if len(text) == 8 and text[5] == ':' and text[:5] in _MINUTES and text[6:].isdigit() and text[6] < '6':
+        return text
+    text = text.strip()
+    if not text:
+        return None
+    parts = text.split(':')
+    if len(parts) == 2:
+        parts.append('0')
+    if len(parts) != 3:
+        raise ValueError(f"시간 형식 오류: {text!r}")
+    hours, minutes, seconds = (int(float(part)) for part in parts)
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        raise ValueError(f"시간 범위 오류: {text!r}")
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+def _parse_cost(text):
+    try:
+        return int(text)
+    except ValueError:
+        cleaned = text.replace(',', '').replace('원', '').strip()
+        return int(round(float(cleaned)))
+
+def normalize_row(values, positions):
+    """
+    CSV 한 줄을 card INSERT 값 튜플로 정규화
+
+    Args:
+        values (list[str]): CSV 한 줄
+        positions (list[int | None]): resolve_columns() 결과
+
+    Returns:
+        tuple: (date 'YYYY-MM-DD', time 'HH:MM:SS' | None, category, reason, cost int, memo)
+
+    Raises:
+        ValueError: 날짜/시간/금액을 해석할 수 없는 경우
+    """
+    date_i, time_i, category_i, reason_i, cost_i, memo_i = positions
+    return (
+        _parse_date(values[date_i]),
+        _parse_time(values[time_i]) if time_i is not None else None,
+        values[category_i].strip(),
+        values[reason_i].strip(),
+        _parse_cost(values[cost_i]),
+        values[memo_i].strip() if memo_i is not None and memo_i < len(values) else '',
+    )
+
+def source_key(path):
+    """
+    진행 기록 키: 파일 이름 + 내용 해시 (같은 내용이면 경로가 달라도 같은 원본으로 봄)
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(functools.partial(f.read, 1 << 20), b''):
+            digest.update(block)
+    return f"{os.path.basename(path)}:{digest.hexdigest()[:16]}"[:255]
+
+def _statement_rows(requested=None):
+    """한 INSERT 문에 넣을 행 수 (SQLite 는 바인딩 변수 개수 제한에 맞춤)"""
+    rows = requested or STATEMENT_ROWS
+    if handle_sql.get_backend().dialect.name == 'sqlite':
+        max_variables = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+        rows = min(rows, max_variables // len(INSERT_COLUMNS))
+    return max(rows, 1)
+
+@functools.lru_cache(maxsize=8)
+def _insert_sql(rows, dialect_name):
+    columns, values = list(INSERT_COLUMNS), ['%s'] * len(INSERT_COLUMNS)
+    if dialect_name == 'sqlite':
+        # updated_at 을 직접 채워 삽입 트리거가 행마다 UPDATE 하지 않게 함 (migrate 006, DB 시계 기준)
+        columns.append('updated_at')
+        values.append("strftime('%Y-%m-%d %H:%M:%f', 'now')")
+    placeholders = '(' + ', '.join(values) + ')'
+    return (
+        f"INSERT INTO card ({', '.join(columns)}) VALUES " + ', '.join([placeholders] * rows)
+        + " ON DUPLICATE KEY UPDATE id = id"
+    )
+
+def estimate_rows(path, sample_bytes=1 << 16):
+    """파일 앞부분의 평균 줄 길이로 데이터 행 수를 어림"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    lines = sample.count(b'\n')
+    if lines <= 1 or size <= len(sample):
+        return max(lines - 1, 0)
+    return int(size / (len(sample) / lines))
+
+def _card_rows():
+    return int(handle_sql.get_data("SELECT COUNT(*) AS n FROM card")['n'].iloc[0])
+
+_SAVE_PROGRESS = """
+    INSERT INTO import_progress (source, rows_done, inserted, finished)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE rows_done = VALUES(rows_done), inserted = VALUES(inserted), finished = VALUES(finished)
+"""
+
+def _load_progress(source):
+    df = handle_sql.get_data(
+        "SELECT rows_done, inserted, finished FROM import_progress WHERE source = %s", (source,)
+    )
+    if df.empty:
+        return 0, 0, False
+    row = df.iloc[0]
+    return int(row['rows_done']), int(row['inserted']), bool(row['finished'])
+
+def _write_chunk(batch, statement_rows, source, rows_done, inserted, finished):
+    """
+    한 청크를 한 트랜잭션으로: 중복 제외 + 다중 행 INSERT + 롤업 변화량 + 진행 기록
+
+    Returns:
+        int: 실제로 추가한 행 수 (청크 안 / card 에 이미 있는 지문은 제외)
+    """
+    unique = {}
+    for row in batch:
+        unique.setdefault(row[6], row)
+    with handle_sql.transaction() as cursor:
+        existing = dedupe.existing_fingerprints(cursor, list(unique))
+        rows = [row for fingerprint, row in unique.items() if fingerprint not in existing]
+        deltas = {}
+        for row in rows:
+            delta = deltas.get((row[0], row[2], row[3]))
+            if delta is None:
+                deltas[(row[0], row[2], row[3])] = [row[4], 1]
+            else:
+                delta[0] += row[4]
+                delta[1] += 1
+        added = 0
+        for start in range(0, len(rows), statement_rows):
+            part = rows[start:start + statement_rows]
+            added += cursor.execute(_insert_sql(len(part), cursor.dialect.name), list(itertools.chain.from_iterable(part)))
+        if added != len(rows):
+            # 확인과 INSERT 사이에 다른 쓰기가 같은 내역을 넣음: 롤업이 어긋나지 않도록 청크 전체를 되돌림
+            raise Exception("가져오는 동안 같은 내역이 다른 경로로 추가되었습니다. 다시 실행하면 이어서 진행합니다")
+        rollup.apply_deltas(cursor, deltas)
+        cursor.execute(_SAVE_PROGRESS, (source, rows_done, inserted + added, int(finished)))
+    return added
+
+def import_file(path, batch_size=None, statement_rows=None, restart=False, dry_run=False, defer_indexes=None,
+                encoding='utf-8-sig', log=print):
+    """
+    CSV 파일 하나를 card 테이블로 가져오기
+
+    Args:
+        path (str): CSV 경로 (card.csv / example_data.csv 형식)
+        batch_size (int, optional): 트랜잭션 하나에 넣을 행 수 (기본값: IMPORT_BATCH_SIZE)
+        statement_rows (int, optional): INSERT 문 하나에 넣을 행 수 (기본값: STATEMENT_ROWS)
+        restart (bool): 진행 기록을 무시하고 처음부터 (이미 들어간 행은 지문으로 건너뜀)
+        dry_run (bool): 읽기/정규화만 하고 DB 에 쓰지 않음
+        defer_indexes (bool, optional): 보조 인덱스를 내렸다가 끝나고 다시 만들지
+                                        (기본값: 추정 행 수가 DEFER_INDEX_ROWS 이상이고 기존 행 수 이상이면)
+        encoding (str): 파일 인코딩 (utf-8-sig 는 BOM 유무와 관계없이 동작)
+        log (callable | None): 진행 상황 출력 함수
+
+    Returns:
+        dict: source, read, inserted, duplicates, skipped, resumed_from, seconds, rows_per_sec,
+              errors (앞의 몇 건)
+
+    Raises:
+        Exception: 헤더를 해석할 수 없거나 DB 쓰기에 실패한 경우 (커밋된 청크까지는 유지됨)
+    """
+    log = log or (lambda message: None)
+    batch_size = batch_size or BATCH_SIZE
+    source = source_key(path)
+    report = {'source': source, 'read': 0, 'inserted': 0, 'duplicates': 0, 'skipped': 0, 'resumed_from': 0, 'errors': []}
+
+    rows_done, inserted, finished = 0, 0, False
+    if not dry_run:
+        migrate.ensure_migrated()
+        statement_rows = _statement_rows(statement_rows)
+        if not restart:
+            rows_done, inserted, finished = _load_progress(source)
+        if finished:
+            log(f"⏭️ {path}: 이미 가져온 파일입니다 ({inserted:,}행). 처음부터 다시 확인하려면 --restart")
+            report.update(seconds=0.0, rows_per_sec=0.0)
+            return report
+    report['resumed_from'] = rows_done
+    if rows_done:
+        log(f"↪️ {path}: {rows_done:,}번째 줄 다음부터 이어서 가져옵니다")
+
+    if not dry_run:
+        # 이전 가져오기가 인덱스를 내린 채 중단됐으면 먼저 복구
+        migrate.restore_card_indexes()
+        if defer_indexes is None:
+            pending = estimate_rows(path) - rows_done
+            defer_indexes = pending >= DEFER_INDEX_ROWS and pending >= _card_rows()
+        if defer_indexes:
+            dropped = migrate.drop_card_indexes()
+            log(f"  보조 인덱스를 내리고 적재합니다: {', '.join(dropped)}")
+
+    started = last_log = time.perf_counter()
+    try:
+        with open(path, newline='', encoding=encoding) as f:
+            reader = csv.reader(f)
+            positions = resolve_columns(next(reader))
+            width = max(position for position in positions if position is not None) + 1
+            line = rows_done
+            batch = []
+            for values in itertools.islice(reader, rows_done, None):
+                line += 1
+                if not values:
+                    continue
+                try:
+                    if len(values) < width:
+                        raise ValueError(f"컬럼 수 부족 ({len(values)}개)")
+                    row = normalize_row(values, positions)
+                    batch.append(row + (dedupe.fingerprint(*row),))
+                except ValueError as e:
+                    report['skipped'] += 1
+                    if len(report['errors']) < 10:
+                        report['errors'].append(f"{line + 1}번째 줄: {e}")
+                if len(batch) >= batch_size:
+                    report['read'] += len(batch)
+                    if not dry_run:
+                        added = _write_chunk(batch, statement_rows, source, line, inserted, False)
+                        inserted += added
+                        report['inserted'] += added
+                        report['duplicates'] += len(batch) - added
+                    batch = []
+                    now = time.perf_counter()
+                    if now - last_log >= 1:
+                        rate = (report['read'] + report['skipped']) / (now - started)
+                        log(f"  … {line:,}줄 처리 ({rate:,.0f} rows/s)")
+                        last_log = now
+            report['read'] += len(batch)
+            if not dry_run:
+                added = _write_chunk(batch, statement_rows, source, line, inserted, True)
+                inserted += added
+                report['inserted'] += added
+                report['duplicates'] += len(batch) - added
+    except ValueError as e:
+        raise Exception(f"가져오기 오류 ({path}): {e}")
+    except Exception as e:
+        raise Exception(f"가져오기 오류 ({path}, {report['inserted']:,}행까지 커밋됨): {e}")
+    finally:
+        if defer_indexes and not dry_run:
+            index_started = time.perf_counter()
+            migrate.restore_card_indexes()
+            log(f"  보조 인덱스 재생성: {time.perf_counter() - index_started:.2f}s")
+
+    report['seconds'] = time.perf_counter() - started
+    report['rows_per_sec'] = report['read'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV 소비 내역을 card 테이블로 대량 가져오기")
+    parser.add_argument('paths', nargs='+', help="CSV 파일 (영문/한글 헤더, BOM 허용)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="트랜잭션당 행 수")
+    parser.add_argument('--statement-rows', type=int, default=STATEMENT_ROWS, help="INSERT 문 하나의 행 수")
+    parser.add_argument('--restart', action='store_true', help="진행 기록을 무시하고 처음부터 가져오기")
+    parser.add_argument('--dry-run', action='store_true', help="읽기/검증만 하고 DB 에 쓰지 않음")
+    parser.add_argument('--defer-indexes', action=argparse.BooleanOptionalAction, default=None,
+                        help="보조 인덱스를 내렸다가 끝나고 다시 만들기 (기본값: 큰 파일이면 자동)")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        report = import_file(
+            path, batch_size=args.batch_size, statement_rows=args.statement_rows,
+            restart=args.restart, dry_run=args.dry_run, defer_indexes=args.defer_indexes
+        )
+        action = "검증" if args.dry_run else "가져오기"
+        print(
+            f"✅ {path} {action} 완료: {report['read']:,}행 읽음, {report['inserted']:,}행 추가, "
+            f"중복 {report['duplicates']:,}행, 오류 {report['skipped']:,}행 건너뜀 "
+            f"({report['seconds']:.2f}s, {report['rows_per_sec']:,.0f} rows/s)"
+        )
+        for error in report['errors']:
+            print(f"  ⚠️ {error}")
+
+if __name__ == "__main__":
+    main()
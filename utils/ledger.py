@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+import utils.reinterpret as reinterpret
+import utils.trace as trace
+
+# 모든 페이지가 같은 모양으로 쓰는 소비 내역 메모리 표현.
+# DB 에서 읽은 그대로의 object 컬럼(문자열/Decimal/timedelta) 대신 자료형을 한 번에 정해 둔다.
+#   - category / reason / memo : 범주형 (반복되는 문자열을 코드 + 사전으로 보관)
+#   - cost                     : int64
+#   - date                     : datetime64 (자정)
+#   - seconds                  : int32, 하루 중 초 (MySQL TIME / SQLite 'HH:MM:SS' 를 하나로)
+#   - hour / weekday           : int8 (히트맵 등에서 매번 파싱하지 않도록 미리 계산)
+#   - month                    : period[M]
+#   - reinterpretation         : 범주형, utils/reinterpret.py 의 LABELS
+
+WEEKDAY_LABELS = ["월", "화", "수", "목", "금", "토", "일"]
+
+CATEGORICAL_COLUMNS = ['category', 'reason', 'memo']
+
+def _to_seconds(values):
+    """시간 값(초 정수 / timedelta / 'HH:MM' / 'HH:MM:SS' / time 객체)을 하루 중 초(int32)로 변환"""
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_float_dtype(values):
+        # handle_sql.get_frame() 은 TIME 을 이미 하루 중 초로 돌려줌 (NULL 이 있으면 float)
+        return (values.fillna(0) % 86400).astype(np.int32)
+    if pd.api.types.is_timedelta64_dtype(values):
+        delta = values
+    else:
+        text = values.astype(str)
+        text = text.where(text.str.count(':') != 1, text + ':00')
+        delta = pd.to_timedelta(text, errors='coerce')
+    seconds = delta.dt.total_seconds().fillna(0) % 86400
+    return seconds.astype(np.int32)
+
+def _as_category(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    return values.astype('category')
+
+@trace.traced('ledger.coerce')
+def coerce(df):
+    """
+    DB 조회 결과(card / 롤업 행)를 Ledger 자료형으로 변환
+
+    날짜를 해석할 수 없는 행은 버린다. 금액이 NULL 인 행은 롤업(utils/rollup.py)과 같게
+    0 원으로 두고 건수에는 포함한다. 없는 컬럼(time, memo, id 등)은 건너뛴다.
+
+    Args:
+        df (pd.DataFrame): date, category, reason, cost 를 포함한 DataFrame
+                           (롤업 행이면 cnt 컬럼도 그대로 int64 로 유지)
+
+    Returns:
+        pd.DataFrame: Ledger 컬럼을 가진 새 DataFrame (index 0..n-1)
+    """
+    date = pd.to_datetime(df['date'], errors='coerce')
+    cost = pd.to_numeric(df['cost'], errors='coerce').fillna(0)
+    valid = date.notna().to_numpy()
+    if not valid.all():
+        df, date, cost = df[valid], date[valid], cost[valid]
+
+    out = {}
+    if 'id' in df:
+        out['id'] = df['id'].astype(np.int64).to_numpy()
+    out['date'] = date.dt.normalize().to_numpy()
+    if 'time' in df:
+        seconds = _to_seconds(df['time'])
+        out['seconds'] = seconds.to_numpy()
+        out['hour'] = (seconds // 3600).astype(np.int8).to_numpy()
+    out['weekday'] = date.dt.weekday.astype(np.int8).to_numpy()
+    out['month'] = date.dt.to_period('M').array
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            values = df[column]
+            if column == 'memo':
+                values = values.fillna('')
+            out[column] = _as_category(values).array
+    out['cost'] = cost.astype(np.int64).to_numpy()
+    if 'cnt' in df:
+        out['cnt'] = pd.to_numeric(df['cnt'], errors='coerce').fillna(0).astype(np.int64).to_numpy()
+
+    frame = pd.DataFrame(out)
+    frame['reinterpretation'] = reinterpret.reinterpret(frame['category'], frame['reason'])
+    return frame
+
+def concat(frames):
+    """
+    Ledger 프레임들을 이어 붙임
+
+    범주형 컬럼은 범주 집합이 서로 다르면 pd.concat 이 object 로 풀어 버리므로,
+    먼저 범주를 합집합으로 맞춘 뒤 붙인다.
+    """
+    frames = [frame for frame in frames if frame is not None and len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    frames = list(frames)
+    for column in frames[0].columns:
+        dtypes = [frame[column].dtype for frame in frames if column in frame]
+        if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        if all(dtype == dtypes[0] for dtype in dtypes):
+            continue
+        categories = pd.Index([])
+        for dtype in dtypes:
+            categories = categories.union(dtype.categories, sort=False)
+        dtype = pd.CategoricalDtype(categories)
+        frames = [
+            frame.assign(**{column: frame[column].astype(dtype)}) if column in frame else frame
+            for frame in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+class Ledger:
+    """
+    자료형이 고정된 소비 내역 (frame 은 세션 간 공유될 수 있으므로 값을 직접 수정하지 말 것)
+
+    Example:
+        ledger = Ledger.from_frame(handle_sql.get_data("SELECT * FROM card"))
+        month_df = ledger.for_month(ledger.months()[0])
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @classmethod
+    def from_frame(cls, df):
+        """DB 조회 결과로부터 Ledger 생성 (비어 있으면 빈 Ledger)"""
+        if df is None or df.empty:
+            return cls.empty()
+        return cls(coerce(df))
+
+    @classmethod
+    def empty(cls):
+        return cls(pd.DataFrame())
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def is_empty(self):
+        return self.frame.empty
+
+    def months(self):
+        """
+        Returns:
+            list[pd.Period]: 데이터가 있는 달 (최근 달부터)
+        """
+        if self.is_empty:
+            return []
+        return sorted(self.frame['month'].unique(), reverse=True)
+
+    def for_month(self, month):
+        """
+        Args:
+            month (pd.Period | str): 'YYYY-MM' 형식 문자열도 허용
+
+        Returns:
+            pd.DataFrame: 해당 달의 행
+        """
+        if self.is_empty:
+            return self.frame
+        return self.frame[self.frame['month'] == pd.Period(month, 'M')]
+
+    def memory_usage(self):
+        """
+        Returns:
+            int: frame 이 차지하는 바이트 수 (범주 사전 포함)
+        """
+        return int(self.frame.memory_usage(deep=True).sum())
@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import utils.env as env
+import utils.handle_sql as handle_sql
+import utils.ledger as ledger
+import utils.snapshot as snapshot
+import utils.trace as trace
+
+# 프로세스 전체(모든 세션)가 공유하는 소비 내역 캐시.
+# handle_sql 의 데이터 버전을 키로 사용하므로 execute_query / execute_many 로 쓰기가
+# 커밋되면 다음 읽기에서 자동으로 새 데이터를 가져온다.
+# 다른 프로세스에서 DB 를 수정한 경우를 대비해 LEDGER_CACHE_TTL 초가 지나면 다시 동기화한다.
+# 동기화는 handle_sql.IncrementalSnapshot 으로 마지막 조회 이후 바뀐 행만 가져온다.
+# 보관 형태는 utils/ledger.py 의 Ledger (범주형/정수형으로 자료형이 고정된 프레임) 이다.
+# 같은 서버의 다른 프로세스와는 utils/snapshot.py 의 Arrow 스냅샷 파일을 공유한다:
+# DB 상태 토큰이 파일과 같으면 DB 를 읽지 않고 파일을 memory-map 하고,
+# 직접 DB 에서 동기화했으면 백그라운드에서 파일을 새로 써서 다른 프로세스가 이어 받게 한다.
+
+LEDGER_CACHE_TTL = float(env.get('LEDGER_CACHE_TTL', 10))
+QUERY_CACHE_SIZE = int(env.get('QUERY_CACHE_SIZE', 128))
+
+class LedgerCache:
+    """
+    card 테이블 전체를 보관하는 캐시
+
+    여러 세션이 동시에 비어 있는 캐시를 읽어도 DB 조회는 한 번만 일어나도록
+    동기화 중에는 락을 잡는다.
+    """
+
+    def __init__(self, ttl=LEDGER_CACHE_TTL, snapshot_path=None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = handle_sql.IncrementalSnapshot(
+            transform=ledger.coerce, concat=ledger.concat, sort_by=('date', 'seconds')
+        )
+        self._df = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._stats = {'hits': 0, 'loads': 0, 'unchanged': 0, 'mapped': 0, 'published': 0}
+        # Arrow 스냅샷 파일 공유 (snapshot_path 가 비어 있으면 사용 안 함)
+        self._snapshot_path = snapshot.SNAPSHOT_PATH if snapshot_path is None else snapshot_path
+        self._state = None       # self._df 가 반영하는 DB 상태 토큰
+        self._mapped = False     # self._df 가 스냅샷 파일을 참조하는지
+        self._skip_mapped = False
+        self._publisher = None
+        self._publishing = None
+
+    def _is_fresh(self):
+        return (
+            self._df is not None
+            and self._version == handle_sql.get_data_version()
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def get(self):
+        """
+        캐시된 소비 내역을 반환 (오래되었으면 다시 조회)
+
+        Returns:
+            ledger.Ledger: 세션 간 공유되므로 frame 은 얕은 복사본 (값을 직접 수정하지 말 것)
+        """
+        with trace.span('ledger_cache.get') as attrs, self._lock:
+            if self._is_fresh():
+                self._stats['hits'] += 1
+                source = 'hit'
+            else:
+                version = handle_sql.get_data_version()
+                source = self._sync()
+                self._version = version
+                self._loaded_at = time.monotonic()
+            if attrs is not None:
+                attrs.update(source=source, rows=len(self._df))
+            return ledger.Ledger(self._df.copy(deep=False))
+
+    def _current_state(self):
+        """DB 상태 토큰 (스냅샷을 쓰지 않거나 조회할 수 없으면 None)"""
+        if not self._snapshot_path:
+            return None
+        try:
+            return snapshot.db_state()
+        except Exception as e:
+            print(f"스냅샷 공유를 사용할 수 없어 DB 로만 동기화합니다: {e}")
+            self._snapshot_path = ''
+            return None
+
+    def _map(self, state):
+        """상태가 state 인 스냅샷 파일이 있으면 매핑해서 사용 (성공하면 True)"""
+        try:
+            with trace.span('snapshot.map'):
+                loaded = snapshot.load(state, self._snapshot_path)
+        except Exception as e:
+            print(f"스냅샷 파일을 읽지 못했습니다: {e}")
+            return False
+        if loaded is None:
+            return False
+        frame, meta = loaded
+        self._snapshot.seed(frame, meta['watermark'])
+        self._df, self._state, self._mapped = frame, state, True
+        self._stats['mapped'] += 1
+        return True
+
+    def _sync(self):
+        """
+        DB 와 맞춤: 상태가 그대로면 아무것도 안 하고, 같은 상태의 스냅샷 파일이 있으면 매핑하고,
+        둘 다 아니면 DB 에서 변경분(또는 전체)을 읽은 뒤 스냅샷 파일을 새로 씀
+
+        Returns:
+            str: 'unchanged' | 'mapped' | 'db' (trace 기록용)
+        """
+        state = self._current_state()
+        if state is not None and not self._skip_mapped and not self._snapshot.resync_due():
+            if self._df is not None and state == self._state:
+                # DB 가 바뀌지 않음. 아직 자기 사본을 들고 있으면 다른 프로세스가 쓴 파일로 옮김
+                if not self._mapped:
+                    self._map(state)
+                self._stats['unchanged'] += 1
+                return 'unchanged'
+            if self._map(state):
+                return 'mapped'
+
+        self._df = self._snapshot.refresh()
+        self._state, self._mapped, self._skip_mapped = state, False, False
+        self._stats['loads'] += 1
+        if state is not None and not self._df.empty:
+            self._publish(self._df, state, self._snapshot.watermark())
+        return 'db'
+
+    def _publish(self, frame, state, watermark):
+        """스냅샷 파일을 백그라운드에서 새로 씀 (이미 쓰는 중이면 건너뜀)"""
+        if self._publishing is not None and not self._publishing.done():
+            return
+        if self._publisher is None:
+            self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ledger-snapshot')
+        self._publishing = self._publisher.submit(self._write_snapshot, frame, state, watermark)
+
+    def _write_snapshot(self, frame, state, watermark):
+        try:
+            meta = snapshot.read_meta(self._snapshot_path)
+            if meta is not None and meta['state'] == state and meta['source'] == snapshot.source_id():
+                return   # 다른 프로세스가 이미 씀
+            snapshot.write(frame, state, watermark, self._snapshot_path)
+        except Exception as e:
+            print(f"스냅샷 파일 쓰기 실패: {e}")
+            return
+        with self._lock:
+            self._stats['published'] += 1
+
+    def wait_published(self, timeout=None):
+        """진행 중인 스냅샷 쓰기가 끝날 때까지 기다림 (벤치마크/점검용)"""
+        if self._publishing is not None:
+            self._publishing.result(timeout)
+
+    def invalidate(self):
+        """다음 get() 에서 DB 를 처음부터 다시 읽도록 캐시를 비움 (스냅샷 파일도 다시 씀)"""
+        with self._lock:
+            self._df = None
+            self._state, self._mapped, self._skip_mapped = None, False, True
+            self._snapshot.reset()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['version'] = self._version
+            stats['rows'] = 0 if self._df is None else len(self._df)
+            stats['bytes'] = 0 if self._df is None else int(self._df.memory_usage(deep=True).sum())
+            stats['incremental'] = self._snapshot.incremental
+            stats['mapped_now'] = self._mapped
+            stats['state'] = self._state
+            stats['last_sync'] = dict(self._snapshot.last_stats)
+            stats.update(self._snapshot.totals)
+        return stats
+
+class QueryCache:
+    """
+    (쿼리, 파라미터, 데이터 버전) 을 키로 하는 크기 제한 LRU 캐시
+    쓰기가 커밋되면 데이터 버전이 바뀌므로 이전 결과는 자연히 쓰이지 않고 밀려난다.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE, ttl=LEDGER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (loaded_at, value)
+
+    def get_or_load(self, key, loader):
+        key = (key, handle_sql.get_data_version())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_ledger_cache = LedgerCache()
+_query_cache = QueryCache()
+
+def get_ledger():
+    """
+    모든 페이지가 공유하는 card 테이블 전체 데이터
+
+    Returns:
+        ledger.Ledger: id, date, seconds, hour, weekday, month, category, reason, memo, cost,
+                       reinterpretation 컬럼 (date DESC, seconds DESC 정렬)
+    """
+    return _ledger_cache.get()
+
+def cached_query(SQL, params=None):
+    """
+    handle_sql.get_frame 결과(타입이 고정된 DataFrame)를 데이터 버전 기준으로 캐시해서 반환
+
+    Args:
+        SQL (str): 실행할 SELECT 쿼리
+        params (tuple, optional): 쿼리 파라미터
+
+    Returns:
+        pd.DataFrame: 조회 결과 (공유 객체의 얕은 복사본)
+    """
+    key = (SQL, tuple(params) if params is not None else None)
+    with trace.span('query_cache.get', query=handle_sql.fingerprint_query(SQL)):
+        df = _query_cache.get_or_load(key, lambda: handle_sql.get_frame(SQL, params))
+    return df.copy(deep=False)
+
+def invalidate():
+    """
+    모든 캐시를 비움 ("데이터 강제 동기화" 버튼 등)
+    데이터 버전도 올려 버전 기반 캐시를 쓰는 다른 모듈도 새로 읽게 한다.
+    """
+    handle_sql.bump_data_version()
+    _ledger_cache.invalidate()
+    _query_cache.clear()
+
+def get_cache_stats():
+    """
+    Returns:
+        dict: 소비 내역 캐시의 hits, loads, unchanged, mapped, published, version, rows, bytes 와
+              증분 동기화 통계 (mapped_now: 지금 스냅샷 파일을 참조 중인지)
+    """
+    return _ledger_cache.stats()
+
+def wait_snapshot(timeout=None):
+    """백그라운드에서 쓰는 중인 스냅샷 파일이 있으면 끝날 때까지 기다림 (벤치마크/점검용)"""
+    _ledger_cache.wait_published(timeout)
@@ -0,0 +1,340 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+import utils.env as env
+
+# 동시 세션 부하 시험 (streamlit.testing AppTest).
+# 서버 하나에 훈련병이 몇 명까지 붙어도 재실행 지연이 버티는지 보기 위해, 한 프로세스 안에서
+# AppTest 세션 N 개를 스레드로 동시에 돌린다. 세션마다
+#   main.py 열기 -> "소비 기록" 에서 달 이동(◀/▶)과 내역 저장 -> "지금까지의 나" 에서 히트맵 유형 바꾸기
+#   -> "앞으로의 나" 열기
+# 를 --iterations 번 반복하며 재실행(run) 하나하나의 시간을 잰다. 쉬는 시간 없이 바로 다음 동작을 보내는
+# 닫힌 부하(closed loop)이며, 같은 seed 면 같은 동작 순서가 나온다.
+#
+#   python -m utils.loadtest [--sessions 1 4 16] [--iterations 5] [--rows 20000] [--db 기존.db] [--seed 0]
+#                            [--output data/bench/loadtest.json]
+#
+# - DB 는 SQLite 대역이다. --db 를 주면 그 파일을 복사해서, 아니면 utils.synth 합성 원장(최근 24개월)을
+#   utils.importer 로 가져와 만든다. 세션 수마다 원본을 새로 복사하므로 저장한 내역은 원본에 남지 않는다.
+# - 세션 수마다 별도 프로세스에서 실행하므로 최대 RSS, 연 DB 연결 수, 쿼리 수가 그 단계만의 값이다.
+# - 실제 서버처럼 세션들이 Runtime, 스크립트 바이트코드 캐시, 프로세스 캐시(utils/ledger_cache.py 등)를 공유한다.
+
+LOADTEST_OUTPUT = os.path.join('data', 'bench', 'loadtest.json')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    'main': 'main.py',
+    'expense': os.path.join('pages', '2-소비 기록.py'),
+    'analysis': os.path.join('pages', '3-지금까지의 나.py'),
+    'forecast': os.path.join('pages', '4-앞으로의 나.py'),
+}
+# 합성 원장 기간: 오늘이 속한 달까지 (캘린더 첫 화면에 내역이 보이도록)
+SYNTH_MONTHS = 24
+RUN_TIMEOUT = float(env.get('LOADTEST_RUN_TIMEOUT', 120))
+PERCENTILES = (50, 95, 99)
+
+_LEVEL_CHILD = """
+import json, sys
+import utils.loadtest as loadtest
+print(json.dumps(loadtest._run_level(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]))))
+"""
+
+_BUILD_CHILD = """
+import json, sys
+import utils.loadtest as loadtest
+print(json.dumps(loadtest._build_db(int(sys.argv[1]), int(sys.argv[2]))))
+"""
+
+def _peak_rss_mb():
+    # Linux 의 ru_maxrss 단위는 KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _synth_start(today=None):
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - (SYNTH_MONTHS - 1)
+    return date(month_index // 12, month_index % 12 + 1, 1).isoformat()
+
+def _build_db(rows, seed):
+    """(자식 프로세스) DB_SQLITE_PATH 에 합성 원장 DB 를 만듦"""
+    import utils.handle_sql as handle_sql
+    import utils.importer as importer
+    import utils.synth as synth
+
+    csv_path = f"{os.environ['DB_SQLITE_PATH']}.csv"
+    try:
+        synth.write_csv(csv_path, rows, start=_synth_start(), months=SYNTH_MONTHS, seed=seed, log=None)
+        handle_sql.init_database()
+        result = importer.import_file(csv_path, restart=True, log=None)
+    finally:
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+    return {'inserted': result['inserted'], 'seconds': result['seconds']}
+
+def _copy_db(source, target):
+    """SQLite 온라인 백업으로 복사 (WAL 에만 있는 변경까지 포함)"""
+    import sqlite3
+
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+def _share_runtime():
+    """
+    AppTest 를 여러 스레드에서 동시에 쓸 수 있게 함.
+
+    AppTest.run() 은 실행마다 가짜 Runtime 을 전역(Runtime._instance)에 넣었다가 None 으로 되돌리고
+    스크립트를 새 ScriptCache 로 다시 컴파일하므로, 동시에 돌리면 다른 세션의 Runtime 이 사라진다.
+    실제 서버처럼 Runtime 과 ScriptCache 를 하나씩 만들어 모든 세션이 공유하게 한다.
+    """
+    from unittest.mock import MagicMock
+
+    import streamlit.testing.v1.app_test as app_test
+    import streamlit.testing.v1.local_script_runner as local_script_runner
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+    # app_test 가 보는 이름만 바꿔, 실행마다 하는 Runtime._instance 대입이 공유 Runtime 을 건드리지 않게 함
+    class _SessionRuntime(Runtime):
+        pass
+
+    # 페이지 스크립트도 미리 한 번씩 컴파일해 둠 (Python 3.11 의 ast.parse 는 여러 스레드에서 동시에 부르면
+    # "AST constructor recursion depth mismatch" 로 실패할 수 있음)
+    script_cache = ScriptCache()
+    for page in PAGES.values():
+        script_cache.get_bytecode(os.path.join(ROOT, page))
+    app_test.Runtime = _SessionRuntime
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+class Session:
+    """시뮬레이션 세션 하나 (페이지별 AppTest 와 재실행 기록)"""
+
+    def __init__(self, index, iterations, seed):
+        self.index = index
+        self.iterations = iterations
+        self.random = random.Random(seed * 1_000_003 + index)
+        self.samples = []     # (action, ms)
+        self.errors = []
+
+    def _run(self, action, target):
+        started = time.perf_counter()
+        try:
+            app = target.run(timeout=RUN_TIMEOUT)
+        except Exception as e:
+            self.errors.append({'action': action, 'error': f"{type(e).__name__}: {e}"})
+            return None
+        self.samples.append((action, (time.perf_counter() - started) * 1000))
+        for exception in app.exception:
+            self.errors.append({'action': action, 'error': exception.value})
+        return app
+
+    def _open(self, page, action):
+        from streamlit.testing.v1 import AppTest
+
+        return self._run(action, AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=RUN_TIMEOUT))
+
+    def _button(self, app, label):
+        return next(button for button in app.button if button.label == label)
+
+    def play(self):
+        import utils.reinterpret as reinterpret
+
+        self._open('main', 'main.open')
+        expense = self._open('expense', 'expense.open')
+        analysis = self._open('analysis', 'analysis.open')
+        forecast = self._open('forecast', 'forecast.open')
+        heatmap_types = [label for label in reinterpret.LABELS if label != reinterpret.DEFAULT_LABEL]
+
+        for step in range(self.iterations):
+            if expense is not None:
+                # 달 이동: 대부분 지난 달 쪽으로 (합성 원장은 오늘이 속한 달까지)
+                label = "◀ 지난 달" if self.random.random() < 0.7 else "다음 달 ▶"
+                expense = self._run('calendar.month', self._button(expense, label).click()) or expense
+
+                category = self.random.choice(list(reinterpret.CATEGORY_STRUCTURE))
+                expense.selectbox(key="current_category").set_value(category)
+                expense = self._run('expense.form', expense) or expense
+                expense.selectbox(key="current_reason").set_value(
+                    self.random.choice(reinterpret.CATEGORY_STRUCTURE[category])
+                )
+                expense.number_input(key="current_cost").set_value(self.random.randrange(1_000, 50_000, 100))
+                expense.text_input(key="current_memo").set_value(f"loadtest-{self.index}-{step}")
+                expense = self._run('expense.submit', self._button(expense, "💾 저장").click()) or expense
+
+            if analysis is not None and analysis.multiselect:
+                selected = self.random.sample(heatmap_types, self.random.randint(1, len(heatmap_types)))
+                analysis = self._run('heatmap.filter', analysis.multiselect[0].set_value(selected)) or analysis
+
+            if forecast is not None and step == self.iterations - 1:
+                self._run('forecast.rerun', forecast)
+
+def _percentiles(values):
+    import numpy as np
+
+    if not values:
+        return {f"p{p}": None for p in PERCENTILES}
+    result = np.percentile(values, PERCENTILES)
+    return {f"p{p}": float(value) for p, value in zip(PERCENTILES, result)}
+
+def _run_level(sessions, iterations, seed):
+    """
+    (자식 프로세스) 세션 sessions 개를 동시에 돌리고 재실행 지연/자원 사용량을 모음
+
+    Returns:
+        dict: sessions, reruns, errors, wall_s, reruns_per_sec, p50/p95/p99 (ms), actions,
+              db_connections, db_checkouts, queries, peak_rss_mb
+    """
+    from streamlit.testing.v1.util import patch_config_options
+
+    import utils.handle_sql as handle_sql
+
+    _share_runtime()
+    players = [Session(index, iterations, seed) for index in range(sessions)]
+    barrier = threading.Barrier(sessions)
+
+    def play(player):
+        barrier.wait()
+        try:
+            player.play()
+        except Exception as e:
+            player.errors.append({'action': 'session', 'error': f"{type(e).__name__}: {e}"})
+
+    # AppTest 가 실행마다 설정을 바꿨다가 되돌리므로 전체 구간에서 미리 켜 두어 세션끼리 엇갈리지 않게 함
+    with patch_config_options({"global.appTest": True}):
+        started = time.perf_counter()
+        threads = [threading.Thread(target=play, args=(player,), name=f"session-{player.index}") for player in players]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+    samples = [sample for player in players for sample in player.samples]
+    errors = [error for player in players for error in player.errors]
+    actions = {}
+    for action, ms in samples:
+        actions.setdefault(action, []).append(ms)
+    backend = handle_sql.get_pool_stats()
+    return {
+        'sessions': sessions,
+        'reruns': len(samples),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'wall_s': wall,
+        'reruns_per_sec': len(samples) / wall if wall else None,
+        **_percentiles([ms for _, ms in samples]),
+        'actions': {
+            action: {'count': len(values), **_percentiles(values)} for action, values in sorted(actions.items())
+        },
+        # SQLite 는 스레드마다 연결을 열고(connects), MySQL 풀은 새로 맺은 연결 수(creates)
+        'db_connections': backend.get('connects', backend.get('creates')),
+        'db_checkouts': backend.get('checkouts'),
+        'queries': sum(entry['calls'] for entry in handle_sql.get_query_stats()),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def _child_env(path):
+    return dict(
+        os.environ, DB_BACKEND='sqlite', DB_SQLITE_PATH=path, LEDGER_SNAPSHOT_PATH='', TRACE='0',
+        DB_SLOW_QUERY_LOG='', OPENAI_API_KEY=os.getenv('OPENAI_API_KEY') or 'loadtest',
+        PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))
+    )
+
+def _child(code, args, path):
+    out = subprocess.run(
+        [sys.executable, '-c', code, *map(str, args)], env=_child_env(path), cwd=ROOT, capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        raise Exception(f"부하 시험 프로세스 오류:\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def run(sessions_list, iterations=5, rows=20_000, db=None, seed=0):
+    """
+    세션 수마다 새 프로세스에서 부하 시험을 실행
+
+    Args:
+        sessions_list (list[int]): 동시 세션 수 목록
+        iterations (int): 세션마다 (달 이동, 내역 저장, 히트맵 필터) 반복 횟수
+        rows (int): 합성 원장 행 수 (db 가 없을 때)
+        db (str, optional): 복사해서 쓸 기존 SQLite DB
+        seed (int): 합성 원장/동작 순서 seed
+
+    Returns:
+        dict: meta, levels (세션 수별 _run_level 결과)
+    """
+    levels = []
+    with tempfile.TemporaryDirectory() as workdir:
+        base = os.path.join(workdir, 'base.db')
+        if db:
+            _copy_db(db, base)
+        else:
+            built = _child(_BUILD_CHILD, (rows, seed), base)
+            print(f"합성 원장 DB: {built['inserted']:,}행 ({built['seconds']:.1f}s)")
+        for sessions in sessions_list:
+            path = os.path.join(workdir, f"sessions-{sessions}.db")
+            _copy_db(base, path)
+            level = _child(_LEVEL_CHILD, (sessions, iterations, seed), path)
+            levels.append(level)
+            print(
+                f"세션 {sessions:>3}: 재실행 {level['reruns']:>4}회, p50 {level['p50']:8.1f} / p95 {level['p95']:8.1f} / "
+                f"p99 {level['p99']:8.1f} ms, {level['reruns_per_sec']:5.1f}회/s, DB 연결 {level['db_connections']}개, "
+                f"쿼리 {level['queries']}개, 최대 RSS {level['peak_rss_mb']:.0f} MiB, 오류 {level['errors']}"
+            )
+            for error in level['error_samples']:
+                print(f"    ⚠️ {error['action']}: {error['error']}")
+
+    import streamlit
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'), 'streamlit': streamlit.__version__,
+            'python': sys.version.split()[0], 'iterations': iterations, 'seed': seed,
+            'db': db or f"synthetic:{rows}", 'cpus': os.cpu_count(),
+        },
+        'levels': levels,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 세션 부하 시험 (AppTest)")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16], help="동시 세션 수 목록")
+    parser.add_argument('--iterations', type=int, default=5, help="세션마다 동작 반복 횟수")
+    parser.add_argument('--rows', type=int, default=20_000, help="합성 원장 행 수 (--db 가 없을 때)")
+    parser.add_argument('--db', help="복사해서 쓸 기존 SQLite DB")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=LOADTEST_OUTPUT)
+    args = parser.parse_args()
+
+    report = run(args.sessions, args.iterations, args.rows, args.db, args.seed)
+    for level in report['levels']:
+        print(f"\n세션 {level['sessions']}: 동작별 지연 (ms)")
+        for action, entry in level['actions'].items():
+            print(f"  {action:<16} {entry['count']:>4}회  p50 {entry['p50']:8.1f}  p95 {entry['p95']:8.1f}  p99 {entry['p99']:8.1f}")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ {args.output}")
+
+if __name__ == "__main__":
+    main()
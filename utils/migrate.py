@@ -0,0 +1,652 @@
+import argparse
+import re
+import threading
+
+import utils.handle_sql as handle_sql
+
+# card 테이블과 부속 테이블의 버전 관리 마이그레이션.
+# 적용된 버전은 schema_version 테이블에 기록되고, 각 단계는 여러 번 실행해도 안전하다
+# (MySQL DDL 은 트랜잭션으로 묶이지 않으므로 중간에 실패해도 다시 실행하면 이어서 진행).
+#
+#   python -m utils.migrate             # 남은 마이그레이션 적용 후 인덱스 사용 확인(EXPLAIN)
+#   python -m utils.migrate status      # 현재 버전과 남은 단계
+#   python -m utils.migrate verify [--strict]
+
+VERSION_TABLE = 'schema_version'
+
+_VERSION_SCHEMA = {
+    'mysql': f"""
+        CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    'sqlite': f"""
+        CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+}
+
+# ==========================================
+# 단계별 DDL 도우미
+# ==========================================
+
+def _table_exists(cursor, table):
+    if cursor.dialect.name == 'mysql':
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table,)
+        )
+    else:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+    return cursor.fetchone()[0] > 0
+
+def _columns(cursor, table):
+    cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+    return [d[0] for d in cursor.description]
+
+def _index_exists(cursor, table, name):
+    if cursor.dialect.name == 'mysql':
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+            (table, name)
+        )
+    else:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = %s", (name,))
+    return cursor.fetchone()[0] > 0
+
+def _create_index(cursor, table, name, columns):
+    if not _index_exists(cursor, table, name):
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+def _drop_index(cursor, table, name):
+    if _index_exists(cursor, table, name):
+        if cursor.dialect.name == 'mysql':
+            cursor.execute(f"DROP INDEX {name} ON {table}")
+        else:
+            cursor.execute(f"DROP INDEX {name}")
+
+def _trigger_exists(cursor, name):
+    if cursor.dialect.name == 'mysql':
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s",
+            (name,)
+        )
+    else:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = %s", (name,))
+    return cursor.fetchone()[0] > 0
+
+# ==========================================
+# 마이그레이션
+# ==========================================
+
+# card 의 접근 경로에 맞춘 인덱스
+#   (date, time)             : 캘린더 하루 항목 (WHERE date = ? ORDER BY time), id 없는 수정/삭제
+#   (date, reason)           : 기간별 중분류 합계 (롤업 재계산, 월 요약)
+CARD_INDEXES = {
+    'idx_card_date_time': ('date', 'time'),
+    'idx_card_date_reason': ('date', 'reason'),
+}
+
+# 쓰는 쿼리가 없어 내린 인덱스 (8번 단계)
+UNUSED_CARD_INDEXES = ('idx_card_category_reason_date',)
+
+def _create_card(cursor):
+    if cursor.dialect.name == 'mysql':
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS card (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                date DATE,
+                time TIME,
+                category VARCHAR(50),
+                reason VARCHAR(50),
+                cost BIGINT,
+                memo VARCHAR(50)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS card (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT,
+                time TEXT,
+                category TEXT,
+                reason TEXT,
+                cost INTEGER,
+                memo TEXT
+            )
+        """)
+
+def _card_indexes(cursor):
+    for name, columns in CARD_INDEXES.items():
+        _create_index(cursor, 'card', name, columns)
+    # (date) 단일 인덱스는 (date, time) 이 앞부분으로 대신하므로 정리 (쓰기 비용 절감)
+    _drop_index(cursor, 'card', 'idx_date')
+
+def _drop_unused_indexes(cursor):
+    """(category, reason, date) 인덱스는 이를 쓰는 화면 쿼리가 없어 쓰기 비용만 늘리므로 정리"""
+    for name in UNUSED_CARD_INDEXES:
+        _drop_index(cursor, 'card', name)
+
+def _sync_schema(cursor):
+    """증분 동기화(handle_sql.IncrementalSnapshot)용 updated_at 컬럼과 삭제 기록(tombstone)"""
+    mysql = cursor.dialect.name == 'mysql'
+    if 'updated_at' not in _columns(cursor, 'card'):
+        if mysql:
+            cursor.execute(
+                "ALTER TABLE card ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+                "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"
+            )
+        else:
+            # SQLite 는 ADD COLUMN 에 CURRENT_TIMESTAMP 기본값을 쓸 수 없어 트리거로 채움
+            cursor.execute("ALTER TABLE card ADD COLUMN updated_at TEXT")
+            cursor.execute("UPDATE card SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE updated_at IS NULL")
+    _create_index(cursor, 'card', 'idx_updated_at', ('updated_at',))
+
+    if mysql:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS card_tombstone (
+                seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+                card_id BIGINT NOT NULL,
+                deleted_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        triggers = {
+            'card_after_delete': """
+                CREATE TRIGGER card_after_delete AFTER DELETE ON card
+                FOR EACH ROW INSERT INTO card_tombstone (card_id) VALUES (OLD.id)
+            """,
+        }
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS card_tombstone (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                card_id INTEGER NOT NULL,
+                deleted_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+            )
+        """)
+        triggers = {
+            'card_after_insert': """
+                CREATE TRIGGER card_after_insert AFTER INSERT ON card
+                BEGIN
+                    UPDATE card SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id;
+                END
+            """,
+            'card_after_update': """
+                CREATE TRIGGER card_after_update AFTER UPDATE ON card
+                WHEN NEW.updated_at IS OLD.updated_at
+                BEGIN
+                    UPDATE card SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id;
+                END
+            """,
+            'card_after_delete': """
+                CREATE TRIGGER card_after_delete AFTER DELETE ON card
+                BEGIN
+                    INSERT INTO card_tombstone (card_id) VALUES (OLD.id);
+                END
+            """,
+        }
+    for name, statement in triggers.items():
+        if not _trigger_exists(cursor, name):
+            cursor.execute(statement)
+
+def _daily_rollup(cursor):
+    """일 × 대분류 × 중분류 롤업 테이블 (utils/rollup.py). 새로 만든 경우에만 card 로 백필"""
+    import utils.rollup as rollup   # rollup 이 migrate 를 임포트하므로 지연 임포트
+
+    if _table_exists(cursor, 'card_daily_rollup'):
+        return
+    if cursor.dialect.name == 'mysql':
+        cursor.execute("""
+            CREATE TABLE card_daily_rollup (
+                day DATE NOT NULL,
+                category VARCHAR(50) NOT NULL,
+                reason VARCHAR(50) NOT NULL,
+                total_cost BIGINT NOT NULL DEFAULT 0,
+                cnt INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, category, reason)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE card_daily_rollup (
+                day TEXT NOT NULL,
+                category TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                total_cost INTEGER NOT NULL DEFAULT 0,
+                cnt INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, category, reason)
+            )
+        """)
+    rollup.rebuild()
+
+def _import_progress(cursor):
+    """대량 가져오기(utils/importer.py) 재개 지점. 원본 파일별로 커밋된 행 수를 청크와 같은 트랜잭션에서 기록"""
+    if cursor.dialect.name == 'mysql':
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_progress (
+                source VARCHAR(255) PRIMARY KEY,
+                rows_done BIGINT NOT NULL DEFAULT 0,
+                inserted BIGINT NOT NULL DEFAULT 0,
+                finished TINYINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_progress (
+                source TEXT PRIMARY KEY,
+                rows_done INTEGER NOT NULL DEFAULT 0,
+                inserted INTEGER NOT NULL DEFAULT 0,
+                finished INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+def _insert_trigger_when_null(cursor):
+    """SQLite 삽입 트리거는 updated_at 을 직접 채운 행(대량 가져오기)에는 행마다 UPDATE 를 하지 않도록"""
+    if cursor.dialect.name != 'sqlite':
+        return
+    cursor.execute("DROP TRIGGER IF EXISTS card_after_insert")
+    cursor.execute("""
+        CREATE TRIGGER card_after_insert AFTER INSERT ON card
+        WHEN NEW.updated_at IS NULL
+        BEGIN
+            UPDATE card SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id;
+        END
+    """)
+
+def _fingerprint(cursor):
+    """
+    행 지문 컬럼 + 유니크 인덱스 (utils/dedupe.py)
+
+    기존 행은 id 순으로 지문을 채운 뒤, 같은 지문의 두 번째 이후 행은 NULL 로 되돌린다
+    (유니크 인덱스는 NULL 을 여러 개 허용). 남은 중복은 `python -m utils.dedupe fix` 로 정리한다.
+    """
+    import utils.dedupe as dedupe   # dedupe 가 rollup -> migrate 를 임포트하므로 지연 임포트
+
+    if 'fingerprint' not in _columns(cursor, 'card'):
+        column_type = 'CHAR(40) NULL' if cursor.dialect.name == 'mysql' else 'TEXT'
+        cursor.execute(f"ALTER TABLE card ADD COLUMN fingerprint {column_type}")
+    if _index_exists(cursor, 'card', dedupe.FINGERPRINT_INDEX):
+        return
+
+    for rows in dedupe.iter_unfingerprinted(cursor):
+        cursor.executemany(
+            "UPDATE card SET fingerprint = %s WHERE id = %s",
+            [(dedupe.fingerprint(*row[1:]), row[0]) for row in rows]
+        )
+    # MySQL 은 UPDATE 대상 테이블을 서브쿼리에서 바로 읽을 수 없어 파생 테이블로 한 번 감쌈
+    cursor.execute("""
+        UPDATE card SET fingerprint = NULL
+        WHERE fingerprint IS NOT NULL AND id NOT IN (
+            SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM card GROUP BY fingerprint) AS keep
+        )
+    """)
+    cursor.execute(f"CREATE UNIQUE INDEX {dedupe.FINGERPRINT_INDEX} ON card (fingerprint)")
+
+# (버전, 이름, 단계 함수). 새 단계는 끝에만 추가하고 이미 배포된 단계는 고치지 않는다.
+MIGRATIONS = [
+    (1, 'card 테이블', _create_card),
+    (2, 'card 접근 경로 인덱스', _card_indexes),
+    (3, '증분 동기화 (updated_at, card_tombstone)', _sync_schema),
+    (4, '일별 롤업 테이블', _daily_rollup),
+    (5, '대량 가져오기 진행 기록', _import_progress),
+    (6, 'SQLite 삽입 트리거: updated_at 이 비어 있을 때만', _insert_trigger_when_null),
+    (7, '행 지문 (중복 방지 유니크 인덱스)', _fingerprint),
+    (8, '쓰지 않는 card 인덱스 정리', _drop_unused_indexes),
+]
+
+# ==========================================
+# 실행기
+# ==========================================
+
+_migrated = False
+_migrate_lock = threading.Lock()
+
+def _with_cursor(func):
+    backend = handle_sql.get_backend()
+    with backend.connection() as conn:
+        cursor = handle_sql.Cursor(conn.cursor(), backend.dialect)
+        try:
+            return func(cursor)
+        finally:
+            cursor.close()
+
+def _applied_versions(cursor):
+    cursor.execute(_VERSION_SCHEMA[cursor.dialect.name])
+    cursor.execute(f"SELECT version FROM {VERSION_TABLE}")
+    return {row[0] for row in cursor.fetchall()}
+
+def current_version():
+    """
+    Returns:
+        int: 적용된 가장 높은 마이그레이션 버전 (없으면 0)
+    """
+    return max(_with_cursor(_applied_versions), default=0)
+
+def upgrade(target=None, verbose=False):
+    """
+    아직 적용되지 않은 마이그레이션을 순서대로 적용
+
+    Args:
+        target (int, optional): 이 버전까지만 적용 (기본값: 전부)
+        verbose (bool): 단계마다 진행 상황 출력
+
+    Returns:
+        list[int]: 이번에 적용한 버전
+
+    Raises:
+        Exception: 스키마 변경 권한이 없거나 DDL 실행에 실패한 경우
+    """
+    backend = handle_sql.get_backend()
+    applied_now = []
+    try:
+        with backend.connection() as conn:
+            cursor = handle_sql.Cursor(conn.cursor(), backend.dialect)
+            try:
+                applied = _applied_versions(cursor)
+                for version, name, step in MIGRATIONS:
+                    if version in applied or (target is not None and version > target):
+                        continue
+                    if verbose:
+                        print(f"  → {version:03d} {name}")
+                    step(cursor)
+                    cursor.execute(
+                        f"INSERT INTO {VERSION_TABLE} (version, name) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE name = VALUES(name)",
+                        (version, name)
+                    )
+                    applied_now.append(version)
+            finally:
+                cursor.close()
+    except Exception as e:
+        raise Exception(f"마이그레이션 오류: {e}")
+    if applied_now:
+        handle_sql.bump_data_version()
+    return applied_now
+
+def ensure_migrated():
+    """
+    이 프로세스에서 처음 호출될 때 한 번 upgrade() 를 실행 (여러 번 호출해도 안전)
+
+    Raises:
+        Exception: 마이그레이션에 실패한 경우 (다음 호출에서 다시 시도)
+    """
+    global _migrated
+    if _migrated:
+        return
+    with _migrate_lock:
+        if not _migrated:
+            upgrade()
+            _migrated = True
+
+# 일별 롤업 테이블이 생기는 버전 (utils/handle_sql.py get_month_summary 가 card 집계로 대신할지 판단)
+ROLLUP_VERSION = next(version for version, _, step in MIGRATIONS if step is _daily_rollup)
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+_known_version = 0   # 이 프로세스에서 확인한 스키마 버전 (최신이면 다시 묻지 않음)
+
+def schema_version():
+    """
+    적용된 가장 높은 마이그레이션 버전을 읽기 전용으로 조회 (schema_version 테이블을 만들지 않음)
+
+    최신 버전이 확인되면 이 프로세스에서는 다시 조회하지 않는다.
+
+    Returns:
+        int: 버전 (schema_version 테이블이 없으면 0)
+    """
+    global _known_version
+    if _known_version >= LATEST_VERSION:
+        return _known_version
+
+    def read(cursor):
+        if not _table_exists(cursor, VERSION_TABLE):
+            return 0
+        cursor.execute(f"SELECT MAX(version) FROM {VERSION_TABLE}")
+        return cursor.fetchone()[0] or 0
+
+    _known_version = max(_known_version, int(_with_cursor(read)))
+    return _known_version
+
+def require_migrated():
+    """
+    페이지/요청 경로용 스키마 확인 (DDL 을 실행하지 않으므로 행 읽기/쓰기 권한만 있는 계정에서도 안전)
+
+    Raises:
+        Exception: 남은 마이그레이션이 있는 경우 (python -m utils.migrate 로 먼저 적용해야 함)
+    """
+    version = schema_version()
+    if version < LATEST_VERSION:
+        raise Exception(
+            f"DB 스키마가 최신이 아닙니다 (현재 {version}, 필요 {LATEST_VERSION}). "
+            "`python -m utils.migrate` 를 먼저 실행하세요."
+        )
+
+# ==========================================
+# 대량 적재용 보조 인덱스 내리기/다시 만들기
+# ==========================================
+# 수십만 행 이상을 넣을 때는 행마다 보조 인덱스를 갱신하는 것보다
+# 인덱스를 내렸다가 적재 후 한 번에 정렬해 만드는 편이 빠르다 (utils/importer.py).
+
+DEFERRABLE_INDEXES = {**CARD_INDEXES, 'idx_updated_at': ('updated_at',)}
+
+def drop_card_indexes():
+    """
+    card 의 보조 인덱스(DEFERRABLE_INDEXES)를 내림. 끝나면 반드시 restore_card_indexes() 호출
+
+    Returns:
+        list[str]: 내린 인덱스 이름
+    """
+    def drop(cursor):
+        dropped = []
+        for name in DEFERRABLE_INDEXES:
+            if _index_exists(cursor, 'card', name):
+                _drop_index(cursor, 'card', name)
+                dropped.append(name)
+        return dropped
+
+    try:
+        return _with_cursor(drop)
+    except Exception as e:
+        raise Exception(f"인덱스 삭제 오류: {e}")
+
+def restore_card_indexes():
+    """
+    빠진 보조 인덱스를 다시 만듦 (중단된 대량 적재 복구 포함, 여러 번 호출해도 안전)
+
+    Returns:
+        list[str]: 새로 만든 인덱스 이름
+    """
+    def restore(cursor):
+        created = []
+        for name, columns in DEFERRABLE_INDEXES.items():
+            if not _index_exists(cursor, 'card', name):
+                _create_index(cursor, 'card', name, columns)
+                created.append(name)
+        return created
+
+    try:
+        return _with_cursor(restore)
+    except Exception as e:
+        raise Exception(f"인덱스 생성 오류: {e}")
+
+# ==========================================
+# 인덱스 사용 확인 (EXPLAIN)
+# ==========================================
+
+def access_paths():
+    """
+    주요 화면/도구의 쿼리와 기대하는 인덱스
+
+    쿼리 문자열은 실제로 실행하는 모듈의 상수/쿼리 빌더에서 가져온다 (그 모듈들이
+    이 모듈을 임포트하므로 지연 임포트). PRIMARY 는 기본 키 (SQLite 의 rowid / sqlite_autoindex_* 포함)
+
+    Returns:
+        list[tuple]: (화면, 쿼리, 예시 파라미터, 사용해야 하는 인덱스 후보)
+    """
+    import utils.calendar_view as calendar_view
+    import utils.dedupe as dedupe
+    import utils.expenses as expenses
+    import utils.export as export
+    import utils.rollup as rollup
+
+    month = ('2026-01-01', '2026-02-01')
+    return [
+        (
+            "main.py: 이번 달 요약 (롤업)",
+            handle_sql.MONTH_SUMMARY_SQL,
+            (*handle_sql.WASTE_REASONS, *month),
+            ('PRIMARY',),
+        ),
+        (
+            "main.py: 이번 달 요약 (롤업 테이블이 없을 때 card 집계)",
+            handle_sql.MONTH_SUMMARY_CARD_SQL,
+            (*handle_sql.WASTE_REASONS, *month),
+            ('idx_card_date_reason', 'idx_card_date_time'),
+        ),
+        (
+            "롤업: 기간 재계산",
+            rollup.REBUILD_SELECT_SQL.format(where="WHERE date >= %s AND date < %s"),
+            month,
+            ('idx_card_date_reason', 'idx_card_date_time'),
+        ),
+        (
+            "2-소비 기록: 캘린더 일별 합계 (롤업)",
+            calendar_view.MONTH_DAILY_SQL,
+            month,
+            ('PRIMARY',),
+        ),
+        (
+            "2-소비 기록: 선택한 날짜 항목",
+            calendar_view.DAY_ITEMS_SQL,
+            ('2026-01-21',),
+            ('idx_card_date_time',),
+        ),
+        (
+            "2-소비 기록: id 없는 수정",
+            expenses.FIND_ROW_SQL.format(where=expenses.UPDATE_MATCH_WHERE),
+            ('2026-01-21', '19:54:00', '식비', '카페/간식'),
+            ('idx_card_date_time', 'idx_card_date_reason'),
+        ),
+        (
+            "2-소비 기록: id 없는 삭제",
+            expenses.FIND_ROW_SQL.format(where=expenses.DELETE_MATCH_WHERE),
+            ('2026-01-21', '19:54:00', '식비', '카페/간식', 4500),
+            ('idx_card_date_time', 'idx_card_date_reason'),
+        ),
+        (
+            "3-지금까지의 나: 증분 동기화",
+            handle_sql.IncrementalSnapshot.select_sql(handle_sql.IncrementalSnapshot.DELTA_WHERE),
+            (1000000, '2999-01-01 00:00:00'),
+            ('PRIMARY', 'idx_updated_at'),
+        ),
+        (
+            "내보내기: 기간 스트리밍 (utils/export.py)",
+            *export.select_query(*month),
+            ('idx_card_date_time',),
+        ),
+        (
+            "2-소비 기록 / 가져오기: 중복 확인 (행 지문)",
+            dedupe.FINGERPRINT_LOOKUP_SQL.format(placeholders='%s, %s'),
+            ('0' * 40, 'f' * 40),
+            (dedupe.FINGERPRINT_INDEX,),
+        ),
+        (
+            "3-지금까지의 나 / 4-앞으로의 나: 일별 롤업",
+            *rollup.rollup_query(),
+            ('PRIMARY',),
+        ),
+    ]
+
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)|USING (INTEGER PRIMARY KEY)")
+
+def explain_indexes(SQL, params=None):
+    """
+    쿼리 실행 계획에서 사용하는 인덱스 이름 목록
+
+    Returns:
+        list[str]: 인덱스 이름 (기본 키는 'PRIMARY')
+    """
+    backend = handle_sql.get_backend()
+    if backend.dialect.name == 'mysql':
+        plan = handle_sql.get_data(f"EXPLAIN {SQL}", params)
+        names = []
+        for key in plan['key'].dropna():
+            names.extend(str(key).split(','))
+        return names
+
+    plan = handle_sql.get_data(f"EXPLAIN QUERY PLAN {SQL}", params)
+    names = []
+    for detail in plan['detail']:
+        for match in _SQLITE_INDEX.finditer(detail):
+            name = match.group(1) or 'PRIMARY'
+            names.append('PRIMARY' if name.startswith('sqlite_autoindex_') else name)
+    return names
+
+def verify(paths=None):
+    """
+    주요 화면 쿼리가 기대한 인덱스를 쓰는지 EXPLAIN 으로 확인
+
+    Args:
+        paths (list[tuple], optional): access_paths() 형식 (기본값: access_paths())
+
+    Returns:
+        list[dict]: name, used (사용 인덱스), expected, ok
+    """
+    if paths is None:
+        paths = access_paths()
+    results = []
+    for name, SQL, params, expected in paths:
+        try:
+            used = explain_indexes(SQL, params)
+        except Exception as e:
+            used = [f"오류: {e}"]
+        results.append({
+            'name': name,
+            'used': used,
+            'expected': list(expected),
+            'ok': any(index in expected for index in used),
+        })
+    return results
+
+def _print_verify(results):
+    for result in results:
+        mark = '✅' if result['ok'] else '⚠️'
+        used = ', '.join(result['used']) or '전체 스캔'
+        print(f"  {mark} {result['name']}: {used}")
+    return all(result['ok'] for result in results)
+
+def main():
+    parser = argparse.ArgumentParser(description="card 테이블 스키마 마이그레이션")
+    sub = parser.add_subparsers(dest='command')
+    p_upgrade = sub.add_parser('upgrade', help="남은 마이그레이션 적용 후 인덱스 사용 확인 (기본값)")
+    p_upgrade.add_argument('--target', type=int, help="이 버전까지만 적용")
+    sub.add_parser('status', help="현재 스키마 버전과 남은 단계")
+    p_verify = sub.add_parser('verify', help="주요 쿼리의 인덱스 사용 확인 (EXPLAIN)")
+    p_verify.add_argument('--strict', action='store_true', help="인덱스를 쓰지 않는 쿼리가 있으면 종료 코드 1")
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        version = current_version()
+        print(f"현재 스키마 버전: {version}")
+        for number, name, _ in MIGRATIONS:
+            print(f"  {'✅' if number <= version else '⏳'} {number:03d} {name}")
+        return
+
+    if args.command in (None, 'upgrade'):
+        applied = upgrade(getattr(args, 'target', None), verbose=True)
+        print(f"✅ 마이그레이션 완료: {len(applied)}단계 적용, 현재 버전 {current_version()}")
+
+    print("인덱스 사용 확인 (EXPLAIN):")
+    ok = _print_verify(verify())
+    if not ok and getattr(args, 'strict', False):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# (대분류, 소분류) 조합으로 소비 성격을 재해석하는 공용 엔진.
+# mapping_rules 를 (대분류 코드, 소분류 코드) -> 재해석 코드 표로 한 번 컴파일해 두고,
+# 행마다 파이썬 함수를 부르는 대신 NumPy 인덱싱 한 번으로 전체 행에 라벨을 붙인다.
+
+# 대분류 -> 중분류 목록 ("2-소비 기록" 입력 폼, utils/synth.py 합성 원장)
+CATEGORY_STRUCTURE = {
+    "식비": ["식자재/장보기", "외식", "배달/야식", "카페/간식", "술/유흥"],
+    "주거/통신": ["월세/관리비", "공과금", "통신비", "구독/OTT"],
+    "생활/쇼핑": ["생활용품", "패션/미용", "가전/가구", "반려동물"],
+    "교통/차량": ["대중교통", "택시/호출", "자차/주유"],
+    "건강/운동": ["병원/약국", "운동/헬스"],
+    "교육/계발": ["도서/문구", "강의/수강"],
+    "관계": ["경조사/선물", "데이트/모임"],
+    "문화/취미": ["영화/공연", "여행"],
+    "금융": ["보험/세금", "저축/투자"]
+}
+
+MAPPING_RULES = {
+    ("식비", "배달/야식"): "게으름",
+    ("식비", "카페/간식"): "충동",
+    ("식비", "술/유흥"): "충동",
+    ("주거/통신", "월세/관리비"): "호흡",
+    ("주거/통신", "공과금"): "호흡",
+    ("주거/통신", "통신비"): "호흡",
+    ("주거/통신", "구독/OTT"): "호흡",
+    ("생활/쇼핑", "패션/미용"): "충동",
+    ("생활/쇼핑", "가전/가구"): "충동",
+    ("생활/쇼핑", "반려동물"): "호흡",
+    ("교통/차량", "대중교통"): "호흡",
+    ("교통/차량", "자차/주유"): "호흡",
+    ("교통/차량", "택시/호출"): "게으름",
+    ("건강/운동", "운동/헬스"): "성장",
+    ("교육/계발", "도서/문구"): "성장",
+    ("교육/계발", "강의/수강"): "성장",
+    ("관계", "데이트/모임"): "충동",
+    ("문화/취미", "영화/공연"): "충동",
+    ("문화/취미", "여행"): "충동",
+    ("금융", "보험/세금"): "호흡",
+    ("금융", "저축/투자"): "성장"
+}
+
+DEFAULT_LABEL = "중립"
+LABELS = ["충동", "게으름", "호흡", "성장", DEFAULT_LABEL]
+WASTE_LABELS = ["충동", "게으름"]
+
+def _compile(rules):
+    """
+    규칙을 코드 표로 컴파일
+
+    표의 마지막 행/열은 규칙에 없는 대분류/소분류(코드 -1) 자리로, 기본 라벨로 채워진다.
+    pd.Categorical 의 미지정 값 코드가 -1 이므로 table[-1] 로 바로 떨어진다.
+    """
+    categories = sorted({category for category, _ in rules})
+    reasons = sorted({reason for _, reason in rules})
+    label_code = {label: code for code, label in enumerate(LABELS)}
+
+    table = np.full((len(categories) + 1, len(reasons) + 1), label_code[DEFAULT_LABEL], dtype=np.int8)
+    category_index = {value: i for i, value in enumerate(categories)}
+    reason_index = {value: i for i, value in enumerate(reasons)}
+    for (category, reason), label in rules.items():
+        table[category_index[category], reason_index[reason]] = label_code[label]
+    return pd.Index(categories), pd.Index(reasons), table
+
+_CATEGORIES, _REASONS, _CODE_TABLE = _compile(MAPPING_RULES)
+
+def _codes(values, categories):
+    """문자열/범주형 값을 규칙 표의 코드(int, 없는 값은 -1)로 변환"""
+    if isinstance(values, pd.Series):
+        values = values.array
+    return pd.Categorical(values, categories=categories).codes
+
+def reinterpret_codes(category, reason):
+    """
+    재해석 라벨 코드 배열 (LABELS 의 인덱스)
+
+    Args:
+        category: 대분류 값들 (Series / 배열 / 범주형)
+        reason: 소분류 값들
+
+    Returns:
+        np.ndarray: int8 코드 배열
+    """
+    return _CODE_TABLE[_codes(category, _CATEGORIES), _codes(reason, _REASONS)]
+
+def reinterpret(category, reason):
+    """
+    (대분류, 소분류) 조합의 재해석 라벨
+
+    Returns:
+        pd.Categorical: LABELS 를 범주로 가지는 라벨
+    """
+    return pd.Categorical.from_codes(reinterpret_codes(category, reason), categories=LABELS)
+
+def apply_reinterpretation(df, category_col='category', reason_col='reason', out_col='재해석'):
+    """
+    DataFrame 에 재해석 컬럼을 붙여 반환 (원본은 수정하지 않음)
+
+    Args:
+        df (pd.DataFrame): 소비 내역
+        category_col (str): 대분류 컬럼명
+        reason_col (str): 소분류 컬럼명
+        out_col (str): 결과 컬럼명
+
+    Returns:
+        pd.DataFrame: out_col 이 추가된 복사본 (범주형)
+    """
+    df = df.copy(deep=False)
+    df[out_col] = reinterpret(df[category_col], df[reason_col])
+    return df
+
+def apply_reinterpretation_rowwise(df, category_col='category', reason_col='reason', out_col='재해석'):
+    """
+    기존 페이지의 행 단위(df.apply) 구현. 벤치마크 비교용으로만 남겨 둠
+    """
+    df = df.copy()
+
+    def get_category(row):
+        return MAPPING_RULES.get((row[category_col], row[reason_col]), DEFAULT_LABEL)
+
+    df[out_col] = df.apply(get_category, axis=1)
+    return df
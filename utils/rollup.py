@@ -0,0 +1,160 @@
+import argparse
+
+import utils.handle_sql as handle_sql
+import utils.ledger_cache as ledger_cache
+import utils.migrate as migrate
+
+# 일 × 대분류 × 중분류 단위로 미리 집계해 둔 롤업 테이블.
+# 대시보드(main.py, 지금까지의 나, 앞으로의 나)는 card 를 훑는 대신 이 테이블의
+# 수백 행을 읽는다. card 에 쓰는 모든 경로(utils/expenses.py)는 같은 트랜잭션 안에서
+# apply_delta() 로 롤업을 함께 갱신한다.
+#
+# 백필/복구: python -m utils.rollup rebuild [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+
+ROLLUP_TABLE = 'card_daily_rollup'
+
+_UPSERT_DELTA = f"""
+    INSERT INTO {ROLLUP_TABLE} (day, category, reason, total_cost, cnt)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE total_cost = total_cost + VALUES(total_cost), cnt = cnt + VALUES(cnt)
+"""
+
+# card 로부터 (날짜, 대분류, 중분류) 칸을 다시 계산하는 SELECT ({where}: 날짜 조건)
+REBUILD_SELECT_SQL = """
+    SELECT date, category, reason, COALESCE(SUM(cost), 0), COUNT(*)
+    FROM card
+    {where}
+    GROUP BY date, category, reason
+"""
+
+def ensure_schema():
+    """
+    롤업 테이블이 준비되도록 마이그레이션을 적용 (여러 번 호출해도 안전, CLI 전용)
+
+    테이블 생성과 card 전체 백필은 utils/migrate.py 의 마이그레이션 단계가 담당한다.
+    """
+    migrate.ensure_migrated()
+
+def require_schema():
+    """
+    페이지/요청 경로에서 롤업 테이블이 있는지 읽기 전용으로 확인 (DDL 은 실행하지 않음)
+
+    Raises:
+        Exception: 마이그레이션이 남아 있는 경우 (python -m utils.migrate 안내)
+    """
+    migrate.require_migrated()
+
+def apply_delta(cursor, day, category, reason, cost, count):
+    """
+    롤업 한 칸에 금액/건수 변화량을 더함 (card 쓰기와 같은 트랜잭션에서 호출)
+
+    Args:
+        cursor: handle_sql.transaction() 이 돌려준 커서
+        day (str | date): 날짜
+        category (str): 대분류
+        reason (str): 중분류
+        cost (int): 금액 변화량 (삭제 시 음수)
+        count (int): 건수 변화량 (+1 / -1)
+    """
+    cursor.execute(_UPSERT_DELTA, (str(day)[:10], category, reason, int(cost), int(count)))
+
+def apply_deltas(cursor, deltas):
+    """
+    여러 롤업 칸의 변화량을 한 번에 더함 (대량 가져오기 등)
+
+    Args:
+        cursor: handle_sql.transaction() 이 돌려준 커서
+        deltas (dict): (day, category, reason) -> [cost, count]
+
+    Returns:
+        int: 갱신한 칸 수
+    """
+    if not deltas:
+        return 0
+    cursor.executemany(
+        _UPSERT_DELTA,
+        [(str(day)[:10], category, reason, int(cost), int(count)) for (day, category, reason), (cost, count) in deltas.items()]
+    )
+    return len(deltas)
+
+def rebuild(start=None, end=None):
+    """
+    card 테이블로부터 롤업을 다시 계산 (백필/불일치 복구용)
+
+    Args:
+        start (str, optional): 시작 날짜 (포함, YYYY-MM-DD)
+        end (str, optional): 종료 날짜 (미포함, YYYY-MM-DD)
+
+    Returns:
+        int: 새로 채운 롤업 행 수
+    """
+    conditions, params = [], []
+    if start:
+        conditions.append("{col} >= %s")
+        params.append(start)
+    if end:
+        conditions.append("{col} < %s")
+        params.append(end)
+    where_day = ("WHERE " + " AND ".join(conditions)).format(col='day') if conditions else ""
+    where_date = ("WHERE " + " AND ".join(conditions)).format(col='date') if conditions else ""
+
+    try:
+        with handle_sql.transaction() as cursor:
+            cursor.execute(f"DELETE FROM {ROLLUP_TABLE} {where_day}", tuple(params) or None)
+            return cursor.execute(
+                f"INSERT INTO {ROLLUP_TABLE} (day, category, reason, total_cost, cnt) "
+                + REBUILD_SELECT_SQL.format(where=where_date),
+                tuple(params) or None
+            )
+    except Exception as e:
+        raise Exception(f"롤업 재계산 오류: {e}")
+
+def get_rollup(start=None, end=None):
+    """
+    롤업 행을 조회 (데이터 버전 기준 캐시)
+
+    Args:
+        start (str, optional): 시작 날짜 (포함, YYYY-MM-DD)
+        end (str, optional): 종료 날짜 (미포함, YYYY-MM-DD)
+
+    Returns:
+        pd.DataFrame: day, category, reason, total_cost, cnt 컬럼 (day 오름차순)
+    """
+    require_schema()
+    return ledger_cache.cached_query(*rollup_query(start, end))
+
+def rollup_query(start=None, end=None):
+    """
+    Returns:
+        tuple[str, tuple]: get_rollup() 이 실행하는 쿼리와 파라미터
+    """
+    conditions, params = ["cnt > 0"], []
+    if start:
+        conditions.append("day >= %s")
+        params.append(start)
+    if end:
+        conditions.append("day < %s")
+        params.append(end)
+    query = f"""
+        SELECT day, category, reason, total_cost, cnt
+        FROM {ROLLUP_TABLE}
+        WHERE {' AND '.join(conditions)}
+        ORDER BY day
+    """
+    return query, tuple(params)
+
+def main():
+    parser = argparse.ArgumentParser(description="소비 내역 롤업 테이블 관리")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rebuild_parser = sub.add_parser('rebuild', help="card 테이블로부터 롤업 재계산 (백필)")
+    rebuild_parser.add_argument('--start', help="시작 날짜 (포함, YYYY-MM-DD)")
+    rebuild_parser.add_argument('--end', help="종료 날짜 (미포함, YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        ensure_schema()
+        rows = rebuild(args.start, args.end)
+        print(f"✅ 롤업 재계산 완료: {rows}행")
+
+if __name__ == "__main__":
+    main()
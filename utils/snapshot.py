@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import utils.env as env
+import utils.handle_sql as handle_sql
+
+# 소비 내역(Ledger 프레임) 스냅샷 파일 (Arrow IPC).
+# 같은 서버에서 여러 Streamlit 프로세스를 띄우면 프로세스마다 card 전체를 조회하고 따로 들고 있게 된다.
+# 한 프로세스가 만든 Ledger 프레임(hour / weekday / month / 재해석 파생 컬럼 포함)을 파일로 써 두면
+# 다른 프로세스는 DB 대신 이 파일을 memory-map 해서 복사 없이 그대로 DataFrame 으로 쓴다.
+# 매핑된 페이지는 OS 페이지 캐시 하나를 모든 프로세스가 공유하므로 물리 메모리에는 한 벌만 올라간다.
+#
+# 파일에는 만들 당시의 DB 상태 토큰(db_state())과 증분 동기화 워터마크가 함께 기록된다.
+# 데이터가 바뀌면(토큰이 다르면) 새 파일을 임시 이름으로 쓴 뒤 os.replace 로 바꿔 단다.
+# 이미 옛 파일을 매핑한 프로세스는 그 매핑을 계속 쓰다가 다음 동기화 때 새 파일로 옮겨 간다.
+#
+#   python -m utils.snapshot build       # 지금 DB 로 스냅샷 파일을 새로 씀 (가져오기 직후 등)
+#   python -m utils.snapshot status      # 파일과 DB 상태 비교
+#
+# LEDGER_SNAPSHOT_PATH 를 빈 값으로 두면 사용하지 않는다 (utils/ledger_cache.py 는 DB 만 사용).
+
+SNAPSHOT_PATH = env.get('LEDGER_SNAPSHOT_PATH', os.path.join('data', 'ledger.arrow'))
+
+# 파일 형식(또는 ledger.coerce 의 결과)이 바뀌면 올려서 옛 파일을 무시하게 함
+FORMAT_VERSION = '2'
+
+_META_KEY = b'tungjang.snapshot'
+
+def enabled():
+    return bool(SNAPSHOT_PATH)
+
+def source_id():
+    """스냅샷을 만든 DB 식별자 (다른 DB 설정의 프로세스가 같은 파일을 쓰지 않도록)"""
+    config = handle_sql.get_config()
+    if config['backend'] == 'sqlite':
+        return f"sqlite:{os.path.abspath(config['sqlite_path'])}"
+    return f"mysql://{config['user']}@{config['host']}:{config['port']}/{config['db_name']}"
+
+def db_state():
+    """
+    card 의 현재 상태 토큰 (인덱스 세 번 조회)
+
+    행이 추가되면 MAX(id), 수정되면 MAX(updated_at), 삭제되면 card_tombstone 의 MAX(seq) 가 바뀐다.
+
+    Returns:
+        str: 'max_id|max_updated_at|max_seq'
+    """
+    df = handle_sql.get_data(
+        """
+        SELECT (SELECT MAX(id) FROM card) AS max_id,
+               (SELECT MAX(updated_at) FROM card) AS max_updated_at,
+               (SELECT MAX(seq) FROM card_tombstone) AS max_seq
+        """
+    )
+    return '|'.join('' if pd.isna(value) else str(value) for value in df.iloc[0].tolist())
+
+def _dump_watermark(watermark):
+    latest = watermark['max_updated_at']
+    if isinstance(latest, datetime):
+        latest = {'datetime': latest.isoformat(sep=' ')}
+    return {**watermark, 'max_updated_at': latest}
+
+def _load_watermark(watermark):
+    latest = watermark['max_updated_at']
+    if isinstance(latest, dict):
+        latest = datetime.fromisoformat(latest['datetime'])
+    return {**watermark, 'max_updated_at': latest}
+
+def to_table(frame, meta):
+    """
+    Ledger 프레임을 Arrow 테이블로 (컬럼마다 청크 하나, 범주형은 같은 코드 폭의 dictionary)
+
+    month(period[M])는 pandas 의 월 서수(int64)로 저장해 읽을 때 복사 없이 되돌린다.
+    """
+    import pyarrow as pa
+
+    arrays, fields = [], []
+    for name in frame.columns:
+        values = frame[name]
+        if isinstance(values.dtype, pd.PeriodDtype):
+            array = pa.array(values.array.asi8, type=pa.int64())
+            field = pa.field(name, pa.int64(), metadata={'pandas_dtype': str(values.dtype)})
+        else:
+            array = pa.Array.from_pandas(values)
+            field = pa.field(name, array.type)
+        arrays.append(array)
+        fields.append(field)
+    schema = pa.schema(fields, metadata={_META_KEY: json.dumps(meta, ensure_ascii=False)})
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def to_frame(table):
+    """
+    to_table() 로 쓴 테이블을 pandas 로 (숫자/날짜/범주 코드 모두 Arrow 버퍼를 그대로 참조)
+
+    Returns:
+        pd.DataFrame: 읽기 전용 배열로 된 Ledger 프레임
+    """
+    import pyarrow as pa
+
+    columns = {}
+    for field in table.schema:
+        column = table.column(field.name)
+        array = column.chunk(0) if column.num_chunks == 1 else pa.concat_arrays(column.chunks)
+        if pa.types.is_dictionary(field.type):
+            indices = array.indices
+            if indices.null_count:
+                # NULL 값(분류/메모 없음)은 pandas 의 결측 코드 -1 로 (이 컬럼만 코드 배열을 복사)
+                indices = indices.fill_null(-1)
+            columns[field.name] = pd.Categorical.from_codes(
+                indices.to_numpy(zero_copy_only=True),
+                categories=pd.Index(array.dictionary.to_pylist(), dtype=object),
+                ordered=field.type.ordered,
+                validate=False,
+            )
+        elif field.metadata and b'pandas_dtype' in field.metadata:
+            dtype = pd.api.types.pandas_dtype(field.metadata[b'pandas_dtype'].decode())
+            columns[field.name] = pd.arrays.PeriodArray(array.to_numpy(zero_copy_only=True), dtype=dtype)
+        else:
+            columns[field.name] = array.to_numpy(zero_copy_only=True)
+    return pd.DataFrame(columns, copy=False)
+
+def write(frame, state, watermark, path=None):
+    """
+    Ledger 프레임을 스냅샷 파일로 씀 (임시 파일에 쓴 뒤 os.replace 로 교체)
+
+    Args:
+        frame (pd.DataFrame): ledger_cache 가 보관하는 Ledger 프레임
+        state (str): 이 프레임이 반영하는 db_state() 토큰
+        watermark (dict): IncrementalSnapshot.watermark()
+        path (str, optional): 파일 경로 (기본값: LEDGER_SNAPSHOT_PATH)
+
+    Returns:
+        int: 쓴 바이트 수
+
+    Raises:
+        Exception: 파일 쓰기에 실패한 경우
+    """
+    import pyarrow as pa
+
+    path = path or SNAPSHOT_PATH
+    meta = {
+        'format': FORMAT_VERSION,
+        'source': source_id(),
+        'state': state,
+        'watermark': _dump_watermark(watermark),
+        'rows': len(frame),
+        'created_at': time.time(),
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        table = to_table(frame, meta)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise Exception(f"스냅샷 쓰기 오류: {e}")
+    return os.path.getsize(path)
+
+def _meta(reader):
+    metadata = reader.schema.metadata or {}
+    if _META_KEY not in metadata:
+        return None
+    meta = json.loads(metadata[_META_KEY])
+    if meta.get('format') != FORMAT_VERSION:
+        return None
+    meta['watermark'] = _load_watermark(meta['watermark'])
+    return meta
+
+def read_meta(path=None):
+    """
+    스냅샷 파일의 메타데이터만 읽음 (데이터는 읽지 않음)
+
+    Returns:
+        dict | None: format, source, state, watermark, rows, created_at (파일이 없거나 형식이 다르면 None)
+    """
+    import pyarrow as pa
+
+    path = path or SNAPSHOT_PATH
+    try:
+        with pa.memory_map(path, 'r') as source:
+            return _meta(pa.ipc.open_file(source))
+    except FileNotFoundError:
+        return None
+
+def load(state=None, path=None):
+    """
+    스냅샷 파일을 memory-map 해서 Ledger 프레임으로 (복사 없음)
+
+    Args:
+        state (str, optional): 주면 파일의 상태 토큰이 이 값과 같을 때만 읽음
+        path (str, optional): 파일 경로 (기본값: LEDGER_SNAPSHOT_PATH)
+
+    Returns:
+        tuple[pd.DataFrame, dict] | None: (프레임, 메타데이터). 파일이 없거나, 다른 DB 의 것이거나,
+                                           상태가 다르면 None
+    """
+    import pyarrow as pa
+
+    path = path or SNAPSHOT_PATH
+    try:
+        source = pa.memory_map(path, 'r')
+    except FileNotFoundError:
+        return None
+    # 매핑은 프레임이 참조하는 동안 유지되며 파일이 교체(삭제)되어도 유효함
+    reader = pa.ipc.open_file(source)
+    meta = _meta(reader)
+    if meta is None or meta['source'] != source_id() or (state is not None and meta['state'] != state):
+        source.close()
+        return None
+    return to_frame(reader.read_all()), meta
+
+def build(path=None):
+    """
+    지금 DB 의 card 전체로 스냅샷 파일을 새로 씀
+
+    Returns:
+        dict: rows, bytes, seconds, state
+    """
+    import utils.ledger as ledger
+
+    started = time.perf_counter()
+    state = db_state()
+    incremental = handle_sql.IncrementalSnapshot(
+        transform=ledger.coerce, concat=ledger.concat, sort_by=('date', 'seconds')
+    )
+    frame = incremental.refresh()
+    written = write(frame, state, incremental.watermark(), path)
+    return {'rows': len(frame), 'bytes': written, 'seconds': time.perf_counter() - started, 'state': state}
+
+def main():
+    parser = argparse.ArgumentParser(description="소비 내역 Arrow 스냅샷 파일 관리")
+    parser.add_argument('command', nargs='?', choices=['build', 'status'], default='status',
+                        help="build: 스냅샷 새로 쓰기, status: 파일과 DB 상태 비교 (기본값)")
+    parser.add_argument('--path', default=SNAPSHOT_PATH, help="스냅샷 파일 경로")
+    args = parser.parse_args()
+    if not args.path:
+        raise SystemExit("LEDGER_SNAPSHOT_PATH 가 비어 있어 스냅샷을 사용하지 않습니다.")
+
+    if args.command == 'build':
+        report = build(args.path)
+        print(
+            f"✅ {args.path}: {report['rows']:,}행, {report['bytes'] / 2**20:,.1f} MiB "
+            f"({report['seconds']:.2f}s, 상태 {report['state']})"
+        )
+        return
+
+    meta = read_meta(args.path)
+    state = db_state()
+    if meta is None:
+        print(f"스냅샷 없음: {args.path} (DB 상태 {state})")
+        return
+    started = time.perf_counter()
+    loaded = load(path=args.path)
+    load_ms = (time.perf_counter() - started) * 1000
+    age = time.time() - meta['created_at']
+    current = meta['source'] == source_id() and meta['state'] == state
+    print(f"{args.path}: {meta['rows']:,}행, {age:,.0f}초 전, 상태 {meta['state']}")
+    print(f"  DB 상태 {state} -> {'✅ 최신' if current else '⚠️ 오래됨 (다음 동기화 때 다시 씀)'}")
+    if loaded is not None:
+        frame, _ = loaded
+        print(f"  매핑 {load_ms:.1f} ms, 프레임 {int(frame.memory_usage(deep=False).sum()) / 2**20:,.1f} MiB (파일 참조)")
+
+if __name__ == "__main__":
+    main()
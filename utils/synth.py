@@ -0,0 +1,325 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import utils.reinterpret as reinterpret
+
+# 합성 소비 내역 생성기 (벤치마크 / 규모 시험용).
+# data/card.csv 와 example_data.csv 는 1~2천 행이라 규모 문제가 드러나지 않으므로
+# "2-소비 기록" 의 분류 체계(reinterpret.CATEGORY_STRUCTURE)로 1만 ~ 1천만 행짜리 원장을 만든다.
+#   - 중분류마다 빈도, 시간대 분포(점심/저녁, 출퇴근, 야식 등), 금액 분포(로그 정규)가 다르고
+#     주말에는 출퇴근이 줄고 술/모임이 는다
+#   - 가맹점(메모)은 중분류마다 자주 가는 곳 몇 군데에 몰리고(Zipf) 나머지는 긴 꼬리로 흩어진다
+#   - 월세, 통신비, 구독, 적금 같은 고정 지출은 매달 같은 날 같은 금액으로 반복된다
+# 같은 seed 면 같은 원장이 나오며, 메모리 사용량은 chunk_size 행 분량이다.
+#
+#   python -m utils.synth data/synthetic.csv --rows 1000000 [--seed 0] [--start 2023-01-01] [--months 36]
+#   python -m utils.synth data/synthetic.csv --rows 1000000 --import      # 만든 뒤 설정된 DB 로 가져오기
+#
+# 출력 CSV 는 utils/importer.py 가 읽는 영문 헤더(date, time, category, reason, cost, memo) 형식이다.
+
+START = '2023-01-01'
+MONTHS = 36
+CHUNK_SIZE = 100_000
+
+# 시간대 분포: (중심 시각, 폭(시간), 세기) 봉우리의 합 + 바닥값
+HOUR_PROFILES = {
+    'meal': [(12.3, 0.9, 1.0), (19.0, 1.3, 0.9)],
+    'cafe': [(10.0, 1.2, 0.6), (15.0, 2.0, 1.0)],
+    'commute': [(8.3, 0.8, 1.0), (18.7, 1.0, 0.9)],
+    'day': [(14.5, 3.5, 1.0)],
+    'evening': [(20.0, 2.0, 1.0)],
+    'late': [(22.5, 1.8, 1.0)],
+    'night': [(23.0, 1.5, 1.0)],
+}
+HOUR_FLOOR = 0.01
+
+# 주말(토/일) 빈도 배수
+WEEKEND_FACTOR = {'commute': 0.3, 'night': 1.8, 'evening': 1.3, 'late': 1.3, 'meal': 1.1}
+
+# (대분류, 중분류) -> (빈도 가중치, 시간대, 금액 중앙값, 금액 로그 표준편차, 자주 가는 가맹점)
+# 가중치 0 인 중분류는 RECURRING 의 고정 지출로만 나온다.
+SPENDING = {
+    ("식비", "식자재/장보기"): (8, 'day', 32000, 0.7, ["이마트", "홈플러스", "쿠팡 로켓프레시", "동네 마트", "마켓컬리", "롯데마트"]),
+    ("식비", "외식"): (12, 'meal', 11000, 0.5, ["김밥천국", "국밥집", "맥도날드", "한솥도시락", "백반집", "서브웨이", "본죽", "버거킹"]),
+    ("식비", "배달/야식"): (7, 'late', 23000, 0.35, ["배달의민족", "쿠팡이츠", "요기요"]),
+    ("식비", "카페/간식"): (14, 'cafe', 5200, 0.45, ["메가커피", "스타벅스", "GS25", "CU", "이디야", "빽다방", "투썸플레이스", "세븐일레븐"]),
+    ("식비", "술/유흥"): (4, 'night', 45000, 0.6, ["호프집", "이자카야", "포차", "와인바"]),
+    ("주거/통신", "월세/관리비"): (0, 'day', 0, 0.0, []),
+    ("주거/통신", "공과금"): (0.5, 'day', 40000, 0.4, ["한국전력", "도시가스", "수도요금"]),
+    ("주거/통신", "통신비"): (0, 'day', 0, 0.0, []),
+    ("주거/통신", "구독/OTT"): (0.3, 'evening', 9900, 0.4, ["멜론", "쿠팡 와우", "티빙", "밀리의 서재"]),
+    ("생활/쇼핑", "생활용품"): (5, 'day', 15000, 0.6, ["다이소", "올리브영", "쿠팡", "이마트24"]),
+    ("생활/쇼핑", "패션/미용"): (2.5, 'day', 48000, 0.7, ["무신사", "헤어샵", "유니클로", "지그재그"]),
+    ("생활/쇼핑", "가전/가구"): (0.5, 'day', 180000, 0.9, ["오늘의집", "하이마트", "이케아"]),
+    ("생활/쇼핑", "반려동물"): (1, 'day', 30000, 0.5, ["펫프렌즈", "동물병원"]),
+    ("교통/차량", "대중교통"): (14, 'commute', 1500, 0.2, ["지하철", "버스", "티머니 충전"]),
+    ("교통/차량", "택시/호출"): (3, 'late', 12000, 0.5, ["카카오T", "우버", "타다"]),
+    ("교통/차량", "자차/주유"): (1.5, 'day', 60000, 0.3, ["GS칼텍스", "SK에너지", "S-OIL", "공영주차장"]),
+    ("건강/운동", "병원/약국"): (1.5, 'day', 15000, 0.7, ["약국", "동네 의원", "치과"]),
+    ("건강/운동", "운동/헬스"): (1, 'evening', 15000, 0.8, ["클라이밍장", "필라테스", "수영장"]),
+    ("교육/계발", "도서/문구"): (1.2, 'day', 17000, 0.5, ["교보문고", "YES24", "알라딘"]),
+    ("교육/계발", "강의/수강"): (0.4, 'evening', 60000, 0.7, ["인프런", "클래스101", "패스트캠퍼스"]),
+    ("관계", "경조사/선물"): (0.8, 'day', 50000, 0.6, ["카카오 선물하기", "축의금", "꽃집"]),
+    ("관계", "데이트/모임"): (3, 'evening', 40000, 0.6, ["레스토랑", "방탈출카페", "보드게임카페", "파스타집"]),
+    ("문화/취미", "영화/공연"): (1.2, 'evening', 15000, 0.4, ["CGV", "메가박스", "롯데시네마", "인터파크 티켓"]),
+    ("문화/취미", "여행"): (0.4, 'day', 150000, 1.0, ["야놀자", "여기어때", "코레일", "대한항공"]),
+    ("금융", "보험/세금"): (0.2, 'day', 50000, 0.8, ["자동차세", "국민건강보험"]),
+    ("금융", "저축/투자"): (0.3, 'day', 100000, 0.8, ["증권 이체", "청약 저축"]),
+}
+
+# 매달 반복되는 고정 지출: (대분류, 중분류, 메모, 날짜, 금액, 시각). 날짜가 그 달에 없으면 말일
+RECURRING = [
+    ("주거/통신", "월세/관리비", "월세", 25, 550000, 9),
+    ("주거/통신", "월세/관리비", "관리비", 25, 120000, 9),
+    ("주거/통신", "통신비", "SKT", 21, 65000, 8),
+    ("주거/통신", "구독/OTT", "넷플릭스", 5, 17000, 3),
+    ("주거/통신", "구독/OTT", "유튜브 프리미엄", 12, 14900, 3),
+    ("금융", "보험/세금", "실손보험", 15, 38000, 10),
+    ("금융", "저축/투자", "적금 자동이체", 10, 300000, 7),
+    ("건강/운동", "운동/헬스", "헬스장 월회원", 1, 60000, 19),
+]
+
+# 자주 가는 가맹점이 아닌 긴 꼬리 가맹점의 비율과 수
+TAIL_SHARE = 0.12
+TAIL_MERCHANTS = 2000
+
+# 요일(월~일) 빈도 배수, 월급날 무렵(25~28일) 배수
+WEEKDAY_FACTOR = np.array([0.95, 0.95, 1.0, 1.0, 1.15, 1.25, 1.1])
+PAYDAY_FACTOR = 1.15
+
+def _hour_weights(peaks):
+    hours = np.arange(24) + 0.5
+    weights = np.full(24, HOUR_FLOOR)
+    for center, width, strength in peaks:
+        distance = np.abs(hours - center)
+        distance = np.minimum(distance, 24 - distance)   # 자정을 넘는 봉우리 (야식/술)
+        weights += strength * np.exp(-0.5 * (distance / width) ** 2)
+    return weights / weights.sum()
+
+class _Tables:
+    """SPENDING / RECURRING 을 NumPy 배열로 한 번 정리한 것 (seed 마다 가맹점별 가격대가 다름)"""
+
+    def __init__(self, seed):
+        rng = np.random.default_rng([seed, 0])
+        missing = [
+            (category, reason) for category, reasons in reinterpret.CATEGORY_STRUCTURE.items()
+            for reason in reasons if (category, reason) not in SPENDING
+        ]
+        if missing:
+            raise ValueError(f"SPENDING 에 없는 분류가 있습니다: {missing}")
+        self.pairs = list(SPENDING)
+        self.categories = np.array([category for category, _ in self.pairs], dtype=object)
+        self.reasons = np.array([reason for _, reason in self.pairs], dtype=object)
+        specs = [SPENDING[pair] for pair in self.pairs]
+        weights = np.array([spec[0] for spec in specs], dtype=float)
+        self.profile_names = list(HOUR_PROFILES)
+        self.profile = np.array([self.profile_names.index(spec[1]) for spec in specs])
+        self.hour_p = [_hour_weights(HOUR_PROFILES[name]) for name in self.profile_names]
+        weekend = weights * np.array([WEEKEND_FACTOR.get(spec[1], 1.0) for spec in specs])
+        self.pair_p = (weights / weights.sum(), weekend / weekend.sum())
+        self.median = np.array([spec[2] for spec in specs], dtype=float)
+        self.sigma = np.array([spec[3] for spec in specs])
+        # 가맹점: 중분류마다 Zipf 가중치, 가맹점마다 고정된 가격대 배수
+        self.merchants, self.merchant_p, self.merchant_factor = [], [], []
+        for spec in specs:
+            names = spec[4]
+            zipf = 1.0 / np.arange(1, len(names) + 1) ** 1.2
+            self.merchants.append(np.array(names, dtype=object))
+            self.merchant_p.append(zipf / zipf.sum() if len(names) else zipf)
+            self.merchant_factor.append(np.exp(rng.normal(0.0, 0.2, len(names))))
+        tail = 1.0 / np.arange(1, TAIL_MERCHANTS + 1) ** 1.1
+        self.tail_p = tail / tail.sum()
+        self.tail_names = np.array(
+            [f"{reason.split('/')[0]} 가맹점" for reason in self.reasons], dtype=object
+        )
+        self.times = _time_strings()
+
+def _time_strings():
+    seconds = np.arange(86400)
+    return np.array(
+        [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds.tolist()], dtype=object
+    )
+
+def _day_weights(days):
+    """날짜별 거래 빈도 (요일, 월급날 무렵, 완만한 증가 추세)"""
+    weights = WEEKDAY_FACTOR[days.weekday.to_numpy()]
+    weights = np.where(days.day.isin([25, 26, 27, 28]), weights * PAYDAY_FACTOR, weights)
+    return weights * np.linspace(0.9, 1.1, len(days))
+
+def _recurring(days):
+    """기간 안의 고정 지출 행: (날짜 인덱스, 분류 인덱스, 메모, 초, 금액)"""
+    index = {day: i for i, day in enumerate(days)}
+    pairs = list(SPENDING)
+    rows = []
+    for month in pd.period_range(days[0], days[-1], freq='M'):
+        for category, reason, memo, day, cost, hour in RECURRING:
+            when = month.start_time + pd.Timedelta(days=min(day, month.days_in_month) - 1)
+            if when in index:
+                rows.append((index[when], pairs.index((category, reason)), memo, hour * 3600, cost))
+    return rows
+
+def _chunk(rng, tables, day_strings, weekend, day_index, fixed):
+    """day_index(날짜 인덱스 배열)만큼 임의 거래 + fixed 고정 지출을 만들어 날짜/시간순 DataFrame 으로"""
+    n = len(day_index)
+    pair = np.empty(n, dtype=np.int64)
+    is_weekend = weekend[day_index]
+    for flag, p in ((False, tables.pair_p[0]), (True, tables.pair_p[1])):
+        mask = is_weekend == flag
+        pair[mask] = rng.choice(len(p), size=int(mask.sum()), p=p)
+
+    seconds = np.empty(n, dtype=np.int64)
+    profile = tables.profile[pair]
+    for code, p in enumerate(tables.hour_p):
+        mask = profile == code
+        count = int(mask.sum())
+        if count:
+            seconds[mask] = rng.choice(24, size=count, p=p) * 3600 + rng.integers(0, 3600, count)
+
+    memo = np.empty(n, dtype=object)
+    factor = np.ones(n)
+    tail = rng.random(n) < TAIL_SHARE
+    for code in np.unique(pair):
+        mask = pair == code
+        regular = mask & ~tail
+        count = int(regular.sum())
+        if count:
+            picks = rng.choice(len(tables.merchants[code]), size=count, p=tables.merchant_p[code])
+            memo[regular] = tables.merchants[code][picks]
+            factor[regular] = tables.merchant_factor[code][picks]
+        irregular = mask & tail
+        count = int(irregular.sum())
+        if count:
+            numbers = rng.choice(TAIL_MERCHANTS, size=count, p=tables.tail_p) + 1
+            memo[irregular] = tables.tail_names[code] + ' ' + numbers.astype(str).astype(object)
+
+    cost = tables.median[pair] * factor * rng.lognormal(0.0, tables.sigma[pair])
+    cost = np.maximum(np.round(cost / 100), 1).astype(np.int64) * 100
+
+    if fixed:
+        fixed_day, fixed_pair, fixed_memo, fixed_seconds, fixed_cost = (np.array(column) for column in zip(*fixed))
+        day_index = np.concatenate([day_index, fixed_day])
+        pair = np.concatenate([pair, fixed_pair])
+        memo = np.concatenate([memo, fixed_memo.astype(object)])
+        seconds = np.concatenate([seconds, fixed_seconds])
+        cost = np.concatenate([cost, fixed_cost.astype(np.int64)])
+
+    order = np.lexsort((seconds, day_index))
+    return pd.DataFrame({
+        'date': day_strings[day_index[order]],
+        'time': tables.times[seconds[order]],
+        'category': tables.categories[pair[order]],
+        'reason': tables.reasons[pair[order]],
+        'cost': cost[order],
+        'memo': memo[order],
+    })
+
+def iter_chunks(rows, start=START, months=MONTHS, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    합성 소비 내역을 날짜순 청크로 생성
+
+    Args:
+        rows (int): 전체 행 수 (고정 지출 포함)
+        start (str): 시작 날짜 (YYYY-MM-DD)
+        months (int): 기간 (개월)
+        seed (int): 난수 시드 (같은 값이면 같은 원장)
+        chunk_size (int): 청크당 대략적인 행 수
+
+    Yields:
+        pd.DataFrame: date ('YYYY-MM-DD'), time ('HH:MM:SS'), category, reason, cost (int64), memo
+    """
+    if rows <= 0:
+        return
+    tables = _Tables(seed)
+    rng = np.random.default_rng([seed, 1])
+    days = pd.date_range(start, pd.Timestamp(start) + pd.DateOffset(months=months), inclusive='left', freq='D')
+    day_strings = np.array(days.strftime('%Y-%m-%d'), dtype=object)
+    weekend = days.weekday.to_numpy() >= 5
+
+    fixed = _recurring(days)[:rows]
+    weights = _day_weights(days)
+    counts = rng.multinomial(rows - len(fixed), weights / weights.sum())
+    fixed_by_day = {}
+    for row in fixed:
+        fixed_by_day.setdefault(row[0], []).append(row)
+
+    first, pending = 0, 0
+    for last in range(len(days)):
+        pending += counts[last] + len(fixed_by_day.get(last, ()))
+        if pending < chunk_size and last < len(days) - 1:
+            continue
+        day_range = np.arange(first, last + 1)
+        day_index = np.repeat(day_range, counts[first:last + 1])
+        chunk_fixed = [row for day in day_range for row in fixed_by_day.get(day, ())]
+        if len(day_index) or chunk_fixed:
+            yield _chunk(rng, tables, day_strings, weekend, day_index, chunk_fixed)
+        first, pending = last + 1, 0
+
+def generate(rows, start=START, months=MONTHS, seed=0):
+    """
+    합성 소비 내역 전체를 DataFrame 하나로 (수십만 행 이하에서 사용, 컬럼은 iter_chunks 참고)
+    """
+    chunks = list(iter_chunks(rows, start, months, seed))
+    if not chunks:
+        return pd.DataFrame(columns=['date', 'time', 'category', 'reason', 'cost', 'memo'])
+    return pd.concat(chunks, ignore_index=True)
+
+def write_csv(path, rows, start=START, months=MONTHS, seed=0, log=print):
+    """
+    합성 소비 내역을 utils/importer.py 형식의 CSV 로 씀 (임시 파일에 쓴 뒤 바꿔 담)
+
+    Returns:
+        dict: path, rows, bytes, seconds
+
+    Raises:
+        Exception: 파일 쓰기에 실패한 경우
+    """
+    log = log or (lambda message: None)
+    tmp_path = f"{path}.tmp"
+    written = 0
+    started = last_log = time.perf_counter()
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for n, chunk in enumerate(iter_chunks(rows, start, months, seed)):
+                chunk.to_csv(f, header=n == 0, index=False)
+                written += len(chunk)
+                now = time.perf_counter()
+                if now - last_log >= 1:
+                    log(f"  … {written:,}행 ({written / (now - started):,.0f} rows/s)")
+                    last_log = now
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise Exception(f"합성 원장 쓰기 오류: {e}")
+    return {'path': path, 'rows': written, 'bytes': os.path.getsize(path), 'seconds': time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 소비 내역 CSV 생성")
+    parser.add_argument('path', help="출력 CSV 경로")
+    parser.add_argument('--rows', type=int, default=100_000, help="행 수 (고정 지출 포함)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', default=START, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--months', type=int, default=MONTHS, help="기간 (개월)")
+    parser.add_argument('--import', dest='do_import', action='store_true',
+                        help="만든 뒤 설정된 DB 로 가져오기 (utils.importer)")
+    args = parser.parse_args()
+
+    report = write_csv(args.path, args.rows, args.start, args.months, args.seed)
+    print(
+        f"✅ {report['path']}: {report['rows']:,}행, {report['bytes'] / 2**20:,.1f} MiB ({report['seconds']:.1f}s)"
+    )
+    if args.do_import:
+        import utils.importer as importer
+
+        result = importer.import_file(args.path, restart=True)
+        print(f"✅ 가져오기: {result['inserted']:,}행 추가, 중복 {result['duplicates']:,}행 ({result['seconds']:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import argparse
+import functools
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import utils.env as env
+
+# 가벼운 구간(span) 추적.
+# 한 번의 페이지 재실행(또는 fragment 만의 부분 재실행)을 trace 하나로 보고, 그 안의 DB 조회(handle_sql),
+# 분석 단계, 차트 생성/전송, OpenAI 호출을 span 으로 기록한다. 재실행이 끝나면
+#   - TRACE_DIR/spans.jsonl 에 span 을 한 줄씩 덧붙이고 (TRACE_SPANS_MAX_MB 를 넘으면 spans.jsonl.1 로 돌림)
+#   - TRACE_DIR/<시각>-<이름>-<id>.trace.json (Chrome trace 형식) 을 써서
+# chrome://tracing 이나 https://ui.perfetto.dev 에서 flame chart 로 열 수 있게 한다.
+#
+#   with trace.span("heatmap.pivot", rows=len(df)):
+#       ...
+#
+#   @trace.traced("ledger.coerce")
+#   def coerce(df): ...
+#
+#   python -m utils.trace list               # 최근 재실행 목록 (spans.jsonl)
+#   python -m utils.trace chrome TRACE_ID    # spans.jsonl 의 trace 하나를 Chrome trace 파일로
+#
+# TRACE=1 이거나 start(force=True) 로 시작한 스레드에서만 기록하며 (주소 파라미터로는 켜지 않음),
+# 진행 중인 trace 가 없으면 span() 은 아무것도 하지 않는다 (백그라운드 스레드 포함).
+
+TRACE_ENABLED = env.get('TRACE', '0') == '1'
+TRACE_DIR = env.get('TRACE_DIR', os.path.join('data', 'traces'))
+# 남겨 둘 Chrome trace 파일 수 (오래된 것부터 지움)
+TRACE_KEEP = int(env.get('TRACE_KEEP', 50))
+# spans.jsonl 이 이 크기(MiB)를 넘으면 spans.jsonl.1 로 바꾸고 새 파일에 씀 (이전 .1 은 지움)
+TRACE_SPANS_MAX_MB = float(env.get('TRACE_SPANS_MAX_MB', 20))
+
+SPANS_FILE = 'spans.jsonl'
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+class Trace:
+    """재실행 한 번의 span 모음"""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        self.spans = []       # dict: id, parent, name, start, end (perf_counter), attrs
+        self.stack = []       # 열려 있는 span id
+        self.status = 'ok'
+        self._next_id = 0
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    @property
+    def duration_ms(self):
+        if not self.spans:
+            return 0.0
+        return (max(span['end'] for span in self.spans) - self.started) * 1000
+
+def current():
+    """
+    Returns:
+        Trace | None: 이 스레드에서 진행 중인 trace
+    """
+    return getattr(_local, 'trace', None)
+
+def start(name, force=False):
+    """
+    이 스레드에서 새 trace 시작 (TRACE=1 또는 force 일 때만)
+
+    끝나지 않은 이전 trace(st.stop / st.rerun 으로 중단된 재실행 등)가 있으면 'interrupted' 로 내보낸다.
+
+    Args:
+        name (str): trace 이름 (페이지 이름 등)
+        force (bool): TRACE 설정과 관계없이 기록
+
+    Returns:
+        Trace | None
+    """
+    previous = current()
+    if previous is not None:
+        previous.status = 'interrupted'
+        finish(previous)
+    if not (TRACE_ENABLED or force):
+        return None
+    trace = Trace(name)
+    trace.spans.append({'id': 0, 'parent': None, 'name': name, 'start': trace.started, 'end': None, 'attrs': {}})
+    _local.trace = trace
+    return trace
+
+def finish(trace=None, export=True):
+    """
+    trace 를 끝내고 파일로 내보냄
+
+    Args:
+        trace (Trace, optional): 기본값은 이 스레드에서 진행 중인 trace
+        export (bool): spans.jsonl / Chrome trace 파일 쓰기 여부
+
+    Returns:
+        Trace | None: 끝낸 trace
+    """
+    trace = trace or current()
+    if trace is None:
+        return None
+    if current() is trace:
+        _local.trace = None
+    now = time.perf_counter()
+    for span in trace.spans:
+        if span['end'] is None:
+            span['end'] = now
+            if span['id'] != 0:
+                span['attrs']['unfinished'] = True
+    trace.spans[0]['attrs']['status'] = trace.status
+    if export:
+        try:
+            _export(trace)
+        except OSError as e:
+            print(f"trace 기록 실패: {e}")
+    return trace
+
+@contextmanager
+def span(name, **attrs):
+    """
+    구간 하나를 기록하는 컨텍스트 매니저 (진행 중인 trace 가 없으면 아무것도 하지 않음)
+
+    Args:
+        name (str): 구간 이름 ('단계.세부' 형태 권장, 예: 'plotly.render')
+        **attrs: 함께 남길 값 (행 수 등). yield 된 dict 에 나중에 더 넣을 수도 있다.
+
+    Yields:
+        dict | None: span 속성 dict
+    """
+    trace = current()
+    if trace is None:
+        yield None
+        return
+    record = {
+        'id': trace._new_id(), 'parent': trace.stack[-1] if trace.stack else 0,
+        'name': name, 'start': time.perf_counter(), 'end': None, 'attrs': attrs,
+    }
+    trace.spans.append(record)
+    trace.stack.append(record['id'])
+    try:
+        yield attrs
+    except Exception as e:
+        # st.rerun / st.stop 같은 제어 흐름 예외(BaseException)는 오류로 남기지 않음
+        attrs['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['end'] = time.perf_counter()
+        if trace.stack and trace.stack[-1] == record['id']:
+            trace.stack.pop()
+
+def traced(name=None):
+    """
+    함수 호출 전체를 span 으로 기록하는 데코레이터
+
+    Args:
+        name (str, optional): span 이름 (기본값: 모듈.함수)
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def add_span(name, start, end, **attrs):
+    """
+    이미 잰 구간(perf_counter 값)을 지금 열려 있는 span 의 자식으로 추가 (handle_sql 쿼리 계측 등)
+    """
+    trace = current()
+    if trace is None:
+        return
+    trace.spans.append({
+        'id': trace._new_id(), 'parent': trace.stack[-1] if trace.stack else 0,
+        'name': name, 'start': start, 'end': end, 'attrs': attrs,
+    })
+
+def _span_rows(trace):
+    thread = threading.current_thread().name
+    for span in trace.spans:
+        yield {
+            'trace_id': trace.id, 'trace': trace.name, 'at': trace.wall, 'thread': thread,
+            'span_id': span['id'], 'parent_id': span['parent'], 'name': span['name'],
+            'start_ms': (span['start'] - trace.started) * 1000,
+            'dur_ms': (span['end'] - span['start']) * 1000,
+            'attrs': span['attrs'],
+        }
+
+def to_chrome(rows):
+    """
+    span 행(spans.jsonl 형식)을 Chrome trace 이벤트 형식으로
+
+    Returns:
+        dict: {"traceEvents": [...], "displayTimeUnit": "ms"}
+    """
+    threads = {}
+    events = []
+    for row in rows:
+        tid = threads.setdefault(row['thread'], len(threads) + 1)
+        events.append({
+            'name': row['name'], 'cat': row['name'].split('.', 1)[0], 'ph': 'X',
+            'ts': round(row['start_ms'] * 1000, 3), 'dur': round(row['dur_ms'] * 1000, 3),
+            'pid': 1, 'tid': tid, 'args': row['attrs'],
+        })
+    for thread, tid in threads.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': thread}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def _export(trace):
+    rows = list(_span_rows(trace))
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    lines = ''.join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows)
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(trace.wall))
+    safe_name = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in trace.name)
+    chrome_path = os.path.join(TRACE_DIR, f"{stamp}-{safe_name}-{trace.id}.trace.json")
+    spans_path = os.path.join(TRACE_DIR, SPANS_FILE)
+    with _write_lock:
+        if os.path.exists(spans_path) and os.path.getsize(spans_path) >= TRACE_SPANS_MAX_MB * 1024 * 1024:
+            os.replace(spans_path, spans_path + '.1')
+        with open(spans_path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+        with open(chrome_path, 'w', encoding='utf-8') as f:
+            json.dump(to_chrome(rows), f, ensure_ascii=False, default=str)
+        old = sorted(glob.glob(os.path.join(TRACE_DIR, '*.trace.json')))[:-TRACE_KEEP or None]
+        for path in old:
+            os.remove(path)
+    trace.path = chrome_path
+
+def summarize(trace, top=10):
+    """
+    trace 의 span 을 이름별로 합산 (디버그 패널 표시용)
+
+    Returns:
+        list[dict]: name, calls, total_ms, max_ms (total_ms 내림차순, 루트 제외)
+    """
+    totals = {}
+    for span in trace.spans[1:]:
+        entry = totals.setdefault(span['name'], {'name': span['name'], 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        duration = ((span['end'] or time.perf_counter()) - span['start']) * 1000
+        entry['calls'] += 1
+        entry['total_ms'] += duration
+        entry['max_ms'] = max(entry['max_ms'], duration)
+    return sorted(totals.values(), key=lambda entry: entry['total_ms'], reverse=True)[:top]
+
+def _read_rows(path):
+    """spans.jsonl 의 행 (돌려 둔 spans.jsonl.1 이 있으면 그것부터, 오래된 순)"""
+    for part in (path + '.1', path):
+        if not os.path.exists(part):
+            continue
+        with open(part, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="재실행 trace 조회/변환")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_list = sub.add_parser('list', help="최근 trace 목록")
+    p_list.add_argument('--limit', type=int, default=20)
+    p_chrome = sub.add_parser('chrome', help="spans.jsonl 의 trace 하나를 Chrome trace 파일로")
+    p_chrome.add_argument('trace_id')
+    p_chrome.add_argument('-o', '--output', help="출력 파일 (기본값: <trace_id>.trace.json)")
+    args = parser.parse_args()
+
+    path = os.path.join(TRACE_DIR, SPANS_FILE)
+    if not os.path.exists(path):
+        raise SystemExit(f"{path} 가 없습니다. TRACE=1 로 앱을 실행해 보세요.")
+
+    if args.command == 'list':
+        traces = {}
+        for row in _read_rows(path):
+            if row['span_id'] == 0:
+                traces[row['trace_id']] = row
+        for row in list(traces.values())[-args.limit:]:
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['at']))
+            print(f"{row['trace_id']}  {stamp}  {row['dur_ms']:9.1f} ms  {row['attrs'].get('status', '')}  {row['trace']}")
+        return
+
+    rows = [row for row in _read_rows(path) if row['trace_id'] == args.trace_id]
+    if not rows:
+        raise SystemExit(f"trace 를 찾을 수 없습니다: {args.trace_id}")
+    output = args.output or f"{args.trace_id}.trace.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(to_chrome(rows), f, ensure_ascii=False, default=str)
+    print(f"✅ {output} ({len(rows)}개 구간) — chrome://tracing 또는 https://ui.perfetto.dev 에서 열기")
+
+if __name__ == "__main__":
+    main()